@@ -0,0 +1,105 @@
+#!/usr/bin/env python3
+"""
+Bulk Load Benchmark
+Measures SQLService.execute_batch throughput (rows/sec) per bulk mode
+
+Runs against the database configured for SQLService (POSTGRES_* variables
+for local PostgreSQL, SQL_CONNECTION_STRING for SQL Server). Each run loads
+into a scratch table that is dropped afterwards.
+
+Usage:
+    python scripts/benchmark_bulk_load.py
+    python scripts/benchmark_bulk_load.py --sizes 1000 100000 --modes copy executemany
+"""
+
+import argparse
+import os
+import sys
+import time
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from src.shared.storage.sql_service import SQLService
+
+TABLE = "bulk_load_benchmark"
+DEFAULT_SIZES = [1_000, 100_000, 1_000_000]
+DEFAULT_MODES = ["copy", "values", "executemany"]
+
+
+def generate_rows(count: int):
+    """Rows shaped like automation_scores"""
+    base = datetime.utcnow()
+    return [
+        (
+            f"doc-{i}",
+            (i % 100) / 100,
+            ((i * 7) % 100) / 100,
+            i % 3 != 0,
+            ((i * 13) % 100) / 100,
+            i % 5 == 0,
+            base - timedelta(seconds=i)
+        )
+        for i in range(count)
+    ]
+
+
+def reset_table(sql_service: SQLService):
+    """Drop and recreate the scratch table"""
+    bool_type = "BOOLEAN" if sql_service.use_postgres else "BIT"
+    time_type = "TIMESTAMP" if sql_service.use_postgres else "DATETIME2"
+    sql_service.execute_non_query(f"DROP TABLE IF EXISTS {TABLE}")
+    sql_service.execute_non_query(f"""
+        CREATE TABLE {TABLE} (
+            document_id VARCHAR(255) NOT NULL,
+            confidence_score FLOAT NOT NULL,
+            completeness_score FLOAT NOT NULL,
+            validation_pass {bool_type} NOT NULL,
+            automation_score FLOAT NOT NULL,
+            requires_review {bool_type} NOT NULL,
+            created_at {time_type} NOT NULL
+        )
+    """)
+
+
+def run(sizes, modes, chunk_size):
+    sql_service = SQLService(os.getenv("SQL_CONNECTION_STRING", ""))
+    if not sql_service.enabled and not sql_service.use_postgres:
+        print("No database configured (set POSTGRES_* or SQL_CONNECTION_STRING)")
+        return 1
+
+    insert_query = f"""
+        INSERT INTO {TABLE} (
+            document_id, confidence_score, completeness_score, validation_pass,
+            automation_score, requires_review, created_at
+        ) VALUES (?, ?, ?, ?, ?, ?, ?)
+    """
+
+    backend = "PostgreSQL" if sql_service.use_postgres else "SQL Server"
+    print(f"\nBulk load benchmark ({backend}, chunk_size={chunk_size})")
+    print(f"{'rows':>10}  {'mode':<12} {'seconds':>9}  {'rows/sec':>12}")
+    print("-" * 48)
+
+    try:
+        for size in sizes:
+            rows = generate_rows(size)
+            for mode in modes:
+                reset_table(sql_service)
+                start = time.perf_counter()
+                loaded = sql_service.execute_batch(insert_query, rows, mode=mode, chunk_size=chunk_size)
+                elapsed = time.perf_counter() - start
+                print(f"{size:>10,}  {mode:<12} {elapsed:>9.3f}  {loaded / elapsed:>12,.0f}")
+    finally:
+        sql_service.execute_non_query(f"DROP TABLE IF EXISTS {TABLE}")
+        sql_service.pool.close()
+    return 0
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark SQLService bulk load modes")
+    parser.add_argument("--sizes", type=int, nargs="+", default=DEFAULT_SIZES)
+    parser.add_argument("--modes", nargs="+", default=DEFAULT_MODES,
+                        choices=["auto", "copy", "values", "executemany"])
+    parser.add_argument("--chunk-size", type=int, default=10_000)
+    args = parser.parse_args()
+    sys.exit(run(args.sizes, args.modes, args.chunk_size))
@@ -0,0 +1,126 @@
+#!/usr/bin/env python3
+"""
+Keyword Matcher Benchmark
+Compares the single-pass KeywordMatcher with per-keyword scanning
+
+Builds OCR-like texts (invoice lines, addresses, noise tokens) of several
+sizes and times, per document:
+- per-keyword `in` scans (the previous FormRecognizerService heuristics)
+- per-pattern re.search (the previous vendor check in the router)
+- KeywordMatcher.count with the single-pass regex forced on
+- KeywordMatcher.count with its default strategy (per-keyword scans for
+  small dictionaries)
+
+for the default document-type dictionaries and for larger vendor
+dictionaries, and checks that every method finds the same keywords.
+
+Usage:
+    python scripts/benchmark_keyword_matcher.py
+    python scripts/benchmark_keyword_matcher.py --sizes 10000 200000 --vendors 50 500 --iterations 20
+"""
+
+import argparse
+import os
+import random
+import re
+import sys
+import time
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from src.shared.config.settings import HeuristicsConfig
+from src.shared.utils.keyword_matcher import KeywordMatcher
+
+NOISE = (
+    "qty unit price description item order ref page of net gross shipping address "
+    "customer account no. date 12/03/2024 $1,250.00 eur 19% ltd inc. street road suite "
+    "invoice total amount due payment terms net 30 thank you for your business"
+).split()
+
+
+def ocr_text(chars: int, seed: int = 7) -> str:
+    """Lowercased text shaped like OCR output of business documents"""
+    rng = random.Random(seed)
+    words, length = [], 0
+    while length < chars:
+        word = rng.choice(NOISE)
+        # OCR noise: dropped characters and split words
+        if rng.random() < 0.02 and len(word) > 3:
+            cut = rng.randrange(1, len(word) - 1)
+            word = word[:cut] + " " + word[cut + 1:]
+        words.append(word)
+        length += len(word) + 1
+        if rng.random() < 0.08:
+            words.append("\n")
+    return " ".join(words).lower()
+
+
+def vendor_names(count: int) -> list:
+    rng = random.Random(count)
+    syllables = ["ac", "me", "tron", "ix", "sol", "data", "corp", "net", "ware", "lo", "gis", "tech"]
+    names = ["amazon", "microsoft", "oracle", "salesforce", "adobe", "google", "ibm"]
+    while len(names) < count:
+        names.append("".join(rng.choice(syllables) for _ in range(rng.randint(2, 4))))
+    return list(dict.fromkeys(names))[:count]
+
+
+def per_keyword_in(text: str, dictionaries: dict) -> dict:
+    return {category: sum(1 for keyword in keywords if keyword in text) for category, keywords in dictionaries.items()}
+
+
+def per_pattern_search(text: str, dictionaries: dict) -> dict:
+    return {
+        category: sum(1 for keyword in keywords if re.search(re.escape(keyword), text, re.IGNORECASE))
+        for category, keywords in dictionaries.items()
+    }
+
+
+def timed(func, iterations: int) -> float:
+    """Best-of-iterations time in milliseconds"""
+    best = float("inf")
+    for _ in range(iterations):
+        start = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - start)
+    return best * 1000
+
+
+def run(label: str, dictionaries: dict, sizes: list, iterations: int):
+    compile_start = time.perf_counter()
+    single_pass = KeywordMatcher(dictionaries, scan_threshold=0)
+    compile_ms = (time.perf_counter() - compile_start) * 1000
+    matcher = KeywordMatcher(dictionaries)
+    keyword_count = sum(len(keywords) for keywords in dictionaries.values())
+    print(f"\n{label}: {keyword_count} keywords (compiled in {compile_ms:.1f} ms)")
+    print(
+        f"{'text size':>10} {'in-scans ms':>12} {'re.search ms':>13} "
+        f"{'single-pass ms':>15} {'matcher ms':>11} {'speedup':>8}"
+    )
+
+    for size in sizes:
+        text = ocr_text(size)
+        expected = per_keyword_in(text, dictionaries)
+        assert single_pass.count(text) == expected, "single-pass matcher disagrees with per-keyword scan"
+        assert matcher.count(text) == expected
+        assert per_pattern_search(text, dictionaries) == expected
+
+        scan_ms = timed(lambda: per_keyword_in(text, dictionaries), iterations)
+        search_ms = timed(lambda: per_pattern_search(text, dictionaries), iterations)
+        single_pass_ms = timed(lambda: single_pass.count(text), iterations)
+        matcher_ms = timed(lambda: matcher.count(text), iterations)
+        print(
+            f"{len(text):>10,} {scan_ms:>12.2f} {search_ms:>13.2f} {single_pass_ms:>15.2f} "
+            f"{matcher_ms:>11.2f} {min(scan_ms, search_ms) / matcher_ms:>7.1f}x"
+        )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark the single-pass keyword matcher")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[2_000, 20_000, 200_000])
+    parser.add_argument("--vendors", type=int, nargs="+", default=[7, 50, 100, 1000])
+    parser.add_argument("--iterations", type=int, default=10)
+    args = parser.parse_args()
+
+    run("Document type keywords", HeuristicsConfig().document_type_keywords, args.sizes, args.iterations)
+    for count in args.vendors:
+        run("Known vendors", {"vendor": vendor_names(count)}, args.sizes, args.iterations)
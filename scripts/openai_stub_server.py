@@ -0,0 +1,129 @@
+#!/usr/bin/env python3
+"""
+OpenAI Stub Server
+Minimal OpenAI-compatible endpoint for exercising OpenAIService locally
+
+Serves chat completions and embeddings (OpenAI and Azure URL layouts) with
+a configurable delay, and counts requests and embedding inputs so request
+coalescing and concurrency caps can be observed without an API key.
+
+Usage:
+    python scripts/openai_stub_server.py --port 8089 --latency-ms 200
+    OPENAI_BASE_URL=http://localhost:8089/v1 OPENAI_API_KEY=stub python -m uvicorn ...
+    curl http://localhost:8089/stats
+"""
+
+import argparse
+import hashlib
+import json
+import math
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+EMBEDDING_DIMENSIONS = 1536
+
+stats = {"chat_requests": 0, "embedding_requests": 0, "embedding_inputs": 0, "max_in_flight": 0}
+in_flight = 0
+lock = threading.Lock()
+
+
+def fake_embedding(text: str):
+    """Deterministic unit vector for a text"""
+    digest = hashlib.sha256(text.encode("utf-8")).digest()
+    vector = [math.sin(digest[i % len(digest)] + i) for i in range(EMBEDDING_DIMENSIONS)]
+    norm = math.sqrt(sum(v * v for v in vector))
+    return [v / norm for v in vector]
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    latency = 0.0
+
+    def do_GET(self):
+        if self.path.rstrip("/") == "/stats":
+            with lock:
+                self._send(200, dict(stats, in_flight=in_flight))
+        else:
+            self._send(404, {"error": {"message": "not found"}})
+
+    def do_POST(self):
+        global in_flight
+        length = int(self.headers.get("Content-Length", 0))
+        body = json.loads(self.rfile.read(length) or b"{}")
+        path = self.path.split("?", 1)[0]
+
+        with lock:
+            in_flight += 1
+            stats["max_in_flight"] = max(stats["max_in_flight"], in_flight)
+        try:
+            time.sleep(self.latency)
+            if path.endswith("/chat/completions"):
+                self._send(200, self._chat(body))
+            elif path.endswith("/embeddings"):
+                self._send(200, self._embeddings(body))
+            else:
+                self._send(404, {"error": {"message": f"unknown endpoint {path}"}})
+        finally:
+            with lock:
+                in_flight -= 1
+
+    def _chat(self, body):
+        with lock:
+            stats["chat_requests"] += 1
+        prompt = body.get("messages", [{}])[-1].get("content", "")
+        return {
+            "id": f"stub-{stats['chat_requests']}",
+            "object": "chat.completion",
+            "created": int(time.time()),
+            "model": body.get("model", "stub"),
+            "choices": [{
+                "index": 0,
+                "message": {"role": "assistant", "content": f"stub response ({len(prompt)} chars)"},
+                "finish_reason": "stop"
+            }],
+            "usage": {"prompt_tokens": len(prompt) // 4, "completion_tokens": 5, "total_tokens": len(prompt) // 4 + 5}
+        }
+
+    def _embeddings(self, body):
+        inputs = body.get("input", [])
+        if isinstance(inputs, str):
+            inputs = [inputs]
+        with lock:
+            stats["embedding_requests"] += 1
+            stats["embedding_inputs"] += len(inputs)
+        return {
+            "object": "list",
+            "model": body.get("model", "stub"),
+            "data": [
+                {"object": "embedding", "index": i, "embedding": fake_embedding(text)}
+                for i, text in enumerate(inputs)
+            ],
+            "usage": {"prompt_tokens": sum(len(t) // 4 for t in inputs), "total_tokens": sum(len(t) // 4 for t in inputs)}
+        }
+
+    def _send(self, status, payload):
+        data = json.dumps(payload).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, format, *args):
+        pass
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="OpenAI-compatible stub server")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8089)
+    parser.add_argument("--latency-ms", type=float, default=100)
+    args = parser.parse_args()
+
+    StubHandler.latency = args.latency_ms / 1000
+    server = ThreadingHTTPServer((args.host, args.port), StubHandler)
+    print(f"OpenAI stub listening on http://{args.host}:{args.port}/v1 (latency {args.latency_ms:.0f} ms)")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
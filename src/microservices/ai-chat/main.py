@@ -605,6 +605,7 @@ class DocumentContext(BaseModel):
 # Chat endpoints
 @app.post("/chat/message", response_model=ChatResponse)
 @handle_validation_error("chat message")
+@cache_invalidate(tags=[CacheKeys.USER_CONVERSATIONS])
 async def send_chat_message(
     chat_message: ChatMessage,
     user_id: str = Depends(get_current_user_id)
@@ -660,7 +661,7 @@ async def send_chat_message(
 
 @app.get("/chat/conversations", response_model=List[Conversation])
 @handle_validation_error("get conversations")
-@cache_result(ttl=600, key_prefix="user_conversations")  # Cache for 10 minutes
+@cache_result(ttl=600, key_prefix="user_conversations", tags=[CacheKeys.USER_CONVERSATIONS])  # Cache for 10 minutes
 async def get_user_conversations(
     user_id: str = Depends(get_current_user_id),
     limit: int = 20
@@ -694,6 +695,7 @@ async def get_conversation_messages(
 
 @app.delete("/chat/conversations/{conversation_id}")
 @handle_validation_error("delete conversation")
+@cache_invalidate(tags=[CacheKeys.USER_CONVERSATIONS])
 async def delete_conversation(
     conversation_id: str,
     user_id: str = Depends(get_current_user_id)
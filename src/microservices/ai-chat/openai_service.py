@@ -492,12 +492,14 @@ Azure Service: Azure OpenAI Service
 """
 
 import asyncio
+import hashlib
 import json
 import logging
 from typing import Dict, Any, List, Optional, Union
 from datetime import datetime
 import numpy as np
-from openai import AzureOpenAI, OpenAI
+from openai import AsyncAzureOpenAI, AsyncOpenAI
+from openai.types.chat import ChatCompletion
 
 try:
     from azure.core.credentials import AzureKeyCredential
@@ -517,6 +519,30 @@ import os
 from src.shared.config.settings import config_manager
 from src.shared.events.event_sourcing import DomainEvent, EventType, EventBus
 from src.shared.mocks.azure_mocks import MockOpenAI
+from src.shared.cache.batching import GetBatcher
+from src.shared.cache.llm_cache import LLMResponseCache
+
+# Shared connection pool (optional: needs httpx and the enhanced settings)
+try:
+    from src.shared.http import HTTPClientPool
+    HTTP_POOL_AVAILABLE = True
+except ImportError:
+    HTTP_POOL_AVAILABLE = False
+    HTTPClientPool = None
+
+# Dimension of text-embedding-ada-002 vectors (used for mock embeddings)
+EMBEDDING_DIMENSIONS = 1536
+
+
+def _parse_model_limits(spec: str) -> Dict[str, int]:
+    """Parse "model=limit,model=limit" into a dict"""
+    limits = {}
+    for item in spec.split(","):
+        if "=" in item:
+            model, limit = item.split("=", 1)
+            limits[model.strip()] = int(limit)
+    return limits
+
 
 class OpenAIService:
     """Hybrid OpenAI service supporting Azure OpenAI, standard OpenAI, and local mocks"""
@@ -534,16 +560,22 @@ class OpenAIService:
         self.client = None
         self.client_type = None
         self.mock_client = MockOpenAI()
+        # Compatible endpoint for the standard client (e.g. a local stub server)
+        self.base_url = os.getenv("OPENAI_BASE_URL") or None
+        self.http_client = None
         
         # Try to initialize OpenAI clients in order of preference
         if not self.use_mock:
+            self.http_client = http_client = self._shared_http_client()
+            
             # Try Azure OpenAI first (if configured)
             if self.azure_endpoint and hasattr(self.config, 'openai_api_key') and self.config.openai_api_key:
                 try:
-                    self.client = AzureOpenAI(
+                    self.client = AsyncAzureOpenAI(
                         api_key=self.config.openai_api_key,
                         api_version="2024-02-15-preview",
-                        azure_endpoint=self.azure_endpoint
+                        azure_endpoint=self.azure_endpoint,
+                        http_client=http_client
                     )
                     self.client_type = "azure"
                     self.logger.info("Using Azure OpenAI")
@@ -551,9 +583,13 @@ class OpenAIService:
                     self.logger.warning(f"Azure OpenAI init failed: {e}")
             
             # Fall back to standard OpenAI if Azure not available
-            if not self.client and self.openai_key and self.openai_key.startswith('sk-'):
+            if not self.client and self.openai_key and (self.openai_key.startswith('sk-') or self.base_url):
                 try:
-                    self.client = OpenAI(api_key=self.openai_key)
+                    self.client = AsyncOpenAI(
+                        api_key=self.openai_key,
+                        base_url=self.base_url,
+                        http_client=http_client
+                    )
                     self.client_type = "openai"
                     self.logger.info("Using standard OpenAI API")
                 except Exception as e:
@@ -584,6 +620,42 @@ class OpenAIService:
             "embedding": "text-embedding-ada-002",
             "davinci": "text-davinci-003"
         }
+        
+        # Per-model concurrency caps, e.g. OPENAI_MODEL_CONCURRENCY="gpt-4=8,text-embedding-ada-002=4";
+        # models not listed share the OPENAI_MAX_CONCURRENCY default
+        self.default_model_concurrency = int(os.getenv("OPENAI_MAX_CONCURRENCY", "16"))
+        self.model_concurrency = _parse_model_limits(os.getenv("OPENAI_MODEL_CONCURRENCY", ""))
+        self._model_semaphores: Dict[str, asyncio.Semaphore] = {}
+        self.call_stats = {"chat_requests": 0, "embedding_requests": 0, "embedding_inputs": 0}
+        
+        # Low-temperature (deterministic) completions are served from cache when repeated
+        self.response_cache = LLMResponseCache()
+        
+        # Concurrent single-text generate_embeddings calls are coalesced into
+        # one multi-input embeddings request
+        self._embedding_batcher = GetBatcher(
+            self._embed_many,
+            window=float(os.getenv("OPENAI_EMBEDDING_BATCH_WINDOW_MS", "5")) / 1000,
+            max_batch_size=int(os.getenv("OPENAI_EMBEDDING_BATCH_SIZE", "16"))
+        )
+    
+    def _shared_http_client(self):
+        """Platform HTTP connection pool (keep-alive, HTTP/2), or None for the SDK default"""
+        if not HTTP_POOL_AVAILABLE:
+            return None
+        try:
+            return HTTPClientPool.get_client()
+        except Exception as e:
+            self.logger.warning(f"Shared HTTP client pool unavailable, OpenAI uses its own: {e}")
+            return None
+    
+    def _model_slot(self, model: str) -> asyncio.Semaphore:
+        """Concurrency cap for a model"""
+        semaphore = self._model_semaphores.get(model)
+        if semaphore is None:
+            limit = self.model_concurrency.get(model, self.default_model_concurrency)
+            semaphore = self._model_semaphores[model] = asyncio.Semaphore(limit)
+        return semaphore
     
     async def generate_summary(self, text: str, max_length: int = 200) -> Dict[str, Any]:
         """Generate document summary using GPT-4"""
@@ -809,20 +881,55 @@ class OpenAIService:
             raise
     
     async def generate_embeddings(self, text: str) -> List[float]:
-        """Generate embeddings for text using Azure OpenAI"""
+        """Generate embeddings for text using Azure OpenAI (batched with concurrent calls)"""
         try:
-            response = await self._call_openai(
-                model=self.models["embedding"],
-                input=text,
-                encoding_format="float"
-            )
+            return await self._embedding_batcher.load(text)
             
-            return response.data[0].embedding
+        except Exception as e:
+            self.logger.error(f"Error generating embeddings: {str(e)}")
+            raise
+    
+    async def generate_embeddings_batch(self, texts: List[str]) -> List[List[float]]:
+        """Generate embeddings for many texts, in requests of up to the embedding batch size"""
+        try:
+            batch_size = self._embedding_batcher.max_batch_size
+            unique_texts = list(dict.fromkeys(texts))
+            batches = await asyncio.gather(*[
+                self._embed_many(unique_texts[i:i + batch_size])
+                for i in range(0, len(unique_texts), batch_size)
+            ])
+            embeddings = {}
+            for batch in batches:
+                embeddings.update(batch)
+            return [embeddings[text] for text in texts]
             
         except Exception as e:
             self.logger.error(f"Error generating embeddings: {str(e)}")
             raise
     
+    async def _embed_many(self, texts: List[str]) -> Dict[str, List[float]]:
+        """One embeddings request for several inputs"""
+        if not self.client:
+            return {text: self._mock_embedding(text) for text in texts}
+        
+        model = self.models["embedding"]
+        async with self._model_slot(model):
+            response = await self.client.embeddings.create(
+                model=model,
+                input=texts,
+                encoding_format="float"
+            )
+        self.call_stats["embedding_requests"] += 1
+        self.call_stats["embedding_inputs"] += len(texts)
+        return {texts[item.index]: item.embedding for item in response.data}
+    
+    @staticmethod
+    def _mock_embedding(text: str) -> List[float]:
+        """Deterministic unit vector derived from the text (mock mode)"""
+        seed = int.from_bytes(hashlib.sha256(text.encode("utf-8")).digest()[:8], "big")
+        vector = np.random.default_rng(seed).standard_normal(EMBEDDING_DIMENSIONS)
+        return (vector / np.linalg.norm(vector)).tolist()
+    
     async def semantic_search(self, query: str, top_k: int = 5) -> List[Dict[str, Any]]:
         """Perform semantic search using vector embeddings"""
         try:
@@ -885,18 +992,15 @@ class OpenAIService:
                 messages = kwargs.get('messages', [])
                 return self.mock_client.chat_completion(messages, model)
             
-            # If using real OpenAI (Azure or standard)
+            # If using real OpenAI (Azure or standard), through the response cache
             if self.client:
-                # Run the OpenAI call in a thread pool to avoid blocking
-                loop = asyncio.get_event_loop()
-                response = await loop.run_in_executor(
-                    None, 
-                    lambda: self.client.chat.completions.create(
-                        model=model,
-                        **kwargs
-                    )
+                return await self.response_cache.get_or_call(
+                    model,
+                    kwargs,
+                    lambda: self._request_completion(model, kwargs),
+                    serialize=lambda response: response.model_dump(),
+                    deserialize=ChatCompletion.model_validate
                 )
-                return response
             
             # Fallback to mock if client not initialized
             self.logger.warning("No OpenAI client available, using mock")
@@ -909,6 +1013,30 @@ class OpenAIService:
             messages = kwargs.get('messages', [])
             return self.mock_client.chat_completion(messages, model)
     
+    async def _request_completion(self, model: str, params: Dict[str, Any]) -> Any:
+        """Chat completion on the native async client (shared connection pool), capped per model"""
+        async with self._model_slot(model):
+            response = await self.client.chat.completions.create(
+                model=model,
+                **params
+            )
+        self.call_stats["chat_requests"] += 1
+        return response
+    
+    def get_client_stats(self) -> Dict[str, Any]:
+        """Get OpenAI client, concurrency and embedding batching statistics"""
+        return {
+            "client_type": self.client_type,
+            "shared_connection_pool": self.http_client is not None,
+            **self.call_stats,
+            "model_concurrency": {
+                model: self.model_concurrency.get(model, self.default_model_concurrency)
+                for model in self._model_semaphores
+            },
+            "embedding_batching": self._embedding_batcher.get_stats(),
+            "response_cache": self.response_cache.get_stats()
+        }
+    
     async def process_document_batch(self, documents: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
         """Process multiple documents in batch"""
         try:
@@ -0,0 +1,413 @@
+"""
+Batch Jobs
+Bounded-concurrency executor for /batch-process with streamed, resumable results
+
+A batch is accepted as a job and processed by a fixed number of workers
+(BATCH_MAX_CONCURRENCY) instead of one coroutine per document. Processing
+functions can additionally hold per-dependency budgets (e.g. "ai",
+"storage") so a large batch cannot flood a single downstream service.
+
+Each per-document result is appended to a JSONL journal under
+BATCH_JOB_DIR as soon as it completes. Clients can follow a job as NDJSON
+or Server-Sent Events, and jobs interrupted by a restart resume with only
+their unfinished documents.
+
+The process running a job holds an exclusive fcntl lock on
+<job_id>.lock for as long as the job runs; the kernel drops it when the
+process exits. With several uvicorn workers sharing BATCH_JOB_DIR, a job
+is only resumed by a worker that can take its lock, and a journal whose
+lock is held elsewhere is reported as running (streams follow it by
+polling the journal). BATCH_JOB_DIR must be on a local filesystem.
+
+Journal format (one JSON object per line):
+    {"type": "job", "job_id": ..., "user_id": ..., "document_ids": [...], ...}
+    {"type": "result", "document_id": ..., "status": "completed"|"failed", ...}
+    {"type": "resume", "resumed_at": ...}
+    {"type": "status", "status": "completed", "finished_at": ...}
+"""
+
+import asyncio
+import contextlib
+import fcntl
+import json
+import logging
+import os
+import uuid
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from datetime import datetime
+from pathlib import Path
+from typing import IO, Any, AsyncIterator, Awaitable, Callable, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+# Processing function: (document_id, user_id, processing_options) -> processing result
+ProcessFunc = Callable[[str, str, Dict[str, Any]], Awaitable[Dict[str, Any]]]
+
+
+@dataclass
+class BatchJob:
+    """A batch of documents and the results received so far"""
+    job_id: str
+    user_id: str
+    document_ids: List[str]
+    processing_options: Dict[str, Any] = field(default_factory=dict)
+    created_at: str = field(default_factory=lambda: datetime.utcnow().isoformat())
+    status: str = "running"  # running, completed, interrupted
+    finished_at: Optional[str] = None
+    resumed: int = 0
+    # Result records in completion order
+    records: List[Dict[str, Any]] = field(default_factory=list)
+    _completed_ids: set = field(default_factory=set, repr=False)
+    _updated: Optional[asyncio.Condition] = field(default=None, repr=False)
+
+    @property
+    def pending_ids(self) -> List[str]:
+        return [doc_id for doc_id in self.document_ids if doc_id not in self._completed_ids]
+
+    @property
+    def finished(self) -> bool:
+        return self.status != "running"
+
+    def add_record(self, record: Dict[str, Any]):
+        self.records.append(record)
+        self._completed_ids.add(record["document_id"])
+
+    def summary(self) -> Dict[str, Any]:
+        successful = sum(1 for record in self.records if record["status"] == "completed")
+        return {
+            "batch_id": self.job_id,
+            "status": self.status,
+            "total_documents": len(self.document_ids),
+            "processed": len(self.records),
+            "successful_processing": successful,
+            "failed_processing": len(self.records) - successful,
+            "created_at": self.created_at,
+            "finished_at": self.finished_at,
+            "resumed": self.resumed
+        }
+
+
+class BatchExecutor:
+    """Runs batch jobs with bounded concurrency and journals their progress"""
+
+    def __init__(
+        self,
+        process_func: ProcessFunc,
+        max_concurrency: Optional[int] = None,
+        dependency_limits: Optional[Dict[str, int]] = None,
+        state_dir: Optional[str] = None,
+        max_jobs_in_memory: Optional[int] = None,
+        poll_interval: Optional[float] = None
+    ):
+        """
+        Args:
+            process_func: Coroutine processing one document
+            max_concurrency: Documents processed at once per job (default: BATCH_MAX_CONCURRENCY or 10)
+            dependency_limits: Max concurrent holders per dependency name, across all jobs
+            state_dir: Directory for job journals (default: BATCH_JOB_DIR)
+            max_jobs_in_memory: Finished jobs kept in memory; older ones are reloaded from disk
+            poll_interval: Seconds between journal reads when streaming a job run by another worker
+        """
+        self.process_func = process_func
+        self.max_concurrency = max_concurrency or int(os.getenv("BATCH_MAX_CONCURRENCY", "10"))
+        self.dependency_limits = dependency_limits or {}
+        self.state_dir = Path(state_dir or os.getenv("BATCH_JOB_DIR", "/tmp/document_storage/batch_jobs"))
+        self.state_dir.mkdir(parents=True, exist_ok=True)
+        self.max_jobs_in_memory = max_jobs_in_memory or int(os.getenv("BATCH_MAX_JOBS_IN_MEMORY", "100"))
+        self.poll_interval = poll_interval or float(os.getenv("BATCH_STREAM_POLL_INTERVAL", "1.0"))
+
+        self._jobs: "OrderedDict[str, BatchJob]" = OrderedDict()
+        self._tasks: Dict[str, asyncio.Task] = {}
+        # Open lock files of the jobs this process runs
+        self._locks: Dict[str, IO] = {}
+        # Semaphores are created lazily so they bind to the running loop
+        self._budgets: Dict[str, asyncio.Semaphore] = {}
+
+    # ===== JOB LIFECYCLE =====
+
+    async def submit(
+        self,
+        user_id: str,
+        document_ids: List[str],
+        processing_options: Optional[Dict[str, Any]] = None
+    ) -> BatchJob:
+        """Create a job, journal it and start processing in the background"""
+        job = BatchJob(
+            job_id=str(uuid.uuid4()),
+            user_id=user_id,
+            # Duplicate ids would be processed twice; keep first occurrence
+            document_ids=list(dict.fromkeys(document_ids)),
+            processing_options=processing_options or {}
+        )
+        self._append(job.job_id, {
+            "type": "job",
+            "job_id": job.job_id,
+            "user_id": job.user_id,
+            "document_ids": job.document_ids,
+            "processing_options": job.processing_options,
+            "created_at": job.created_at
+        })
+        self._acquire(job.job_id)
+        self._remember(job)
+        self._start(job)
+        logger.info(f"Batch job {job.job_id} accepted with {len(job.document_ids)} documents")
+        return job
+
+    async def wait(self, job_id: str) -> Optional[BatchJob]:
+        """Wait for a job to finish"""
+        task = self._tasks.get(job_id)
+        if task is not None:
+            await asyncio.shield(task)
+        return self.get_job(job_id)
+
+    def get_job(self, job_id: str) -> Optional[BatchJob]:
+        """Get a job from memory or its journal"""
+        job = self._jobs.get(job_id)
+        # A running job this process does not own is re-read to pick up progress
+        if job is None or (not job.finished and job_id not in self._tasks):
+            job = self._load(job_id)
+            if job is not None:
+                self._remember(job)
+        return job
+
+    async def resume_incomplete(self) -> int:
+        """
+        Restart jobs whose journal has no final status (call on startup)
+
+        Jobs whose lock is held by another live worker are left alone.
+        """
+        resumed = 0
+        for path in self.state_dir.glob("*.jsonl"):
+            job_id = path.stem
+            if job_id in self._tasks or not self._acquire(job_id):
+                continue
+            job = self._load(job_id)
+            if job is None or job.status != "interrupted":
+                self._release(job_id)
+                continue
+            job.status = "running"
+            job.resumed += 1
+            self._append(job_id, {"type": "resume", "resumed_at": datetime.utcnow().isoformat()})
+            self._remember(job)
+            self._start(job)
+            resumed += 1
+            logger.info(f"Resuming batch job {job_id}: {len(job.pending_ids)} of {len(job.document_ids)} documents left")
+        return resumed
+
+    async def shutdown(self):
+        """Stop workers; unfinished jobs stay journaled and resume on next start"""
+        tasks = list(self._tasks.values())
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+    def _start(self, job: BatchJob):
+        job._updated = asyncio.Condition()
+        task = asyncio.create_task(self._run(job))
+        self._tasks[job.job_id] = task
+        task.add_done_callback(lambda _: self._finish_task(job.job_id))
+
+    def _finish_task(self, job_id: str):
+        self._tasks.pop(job_id, None)
+        self._release(job_id)
+
+    async def _run(self, job: BatchJob):
+        """Feed pending documents to a fixed set of workers"""
+        queue: asyncio.Queue = asyncio.Queue()
+        for document_id in job.pending_ids:
+            queue.put_nowait(document_id)
+
+        async def worker():
+            while True:
+                try:
+                    document_id = queue.get_nowait()
+                except asyncio.QueueEmpty:
+                    return
+                await self._process_one(job, document_id)
+
+        workers = min(self.max_concurrency, queue.qsize())
+        try:
+            await asyncio.gather(*[worker() for _ in range(workers)])
+        except asyncio.CancelledError:
+            # Leave the journal open-ended so the job resumes after restart
+            job.status = "interrupted"
+            await self._notify(job)
+            raise
+
+        job.status = "completed"
+        job.finished_at = datetime.utcnow().isoformat()
+        self._append(job.job_id, {"type": "status", "status": job.status, "finished_at": job.finished_at})
+        await self._notify(job)
+        summary = job.summary()
+        logger.info(
+            f"Batch job {job.job_id} completed. Success: {summary['successful_processing']}, "
+            f"Failed: {summary['failed_processing']}"
+        )
+
+    async def _process_one(self, job: BatchJob, document_id: str):
+        try:
+            result = await self.process_func(document_id, job.user_id, job.processing_options)
+            record = {"document_id": document_id, "status": "completed", "processing_result": result}
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            record = {"document_id": document_id, "status": "failed", "error": str(e)}
+        record["completed_at"] = datetime.utcnow().isoformat()
+
+        self._append(job.job_id, {"type": "result", **record})
+        job.add_record(record)
+        await self._notify(job)
+
+    # ===== DEPENDENCY BUDGETS =====
+
+    @contextlib.asynccontextmanager
+    async def limit(self, dependency: str):
+        """Hold one unit of a dependency's budget; unlimited if it has none"""
+        max_concurrent = self.dependency_limits.get(dependency)
+        if not max_concurrent:
+            yield
+            return
+        semaphore = self._budgets.get(dependency)
+        if semaphore is None:
+            semaphore = self._budgets[dependency] = asyncio.Semaphore(max_concurrent)
+        async with semaphore:
+            yield
+
+    # ===== STREAMING =====
+
+    async def stream(self, job: BatchJob, fmt: str = "ndjson") -> AsyncIterator[str]:
+        """
+        Yield result records as they complete, then a final summary
+
+        Records already finished are replayed first, so reconnecting clients
+        get the full history. Jobs run by another worker are followed by
+        re-reading their journal every poll_interval seconds.
+        """
+        index = 0
+        while True:
+            if index < len(job.records):
+                record = job.records[index]
+                index += 1
+                yield self._format_event("result", record, fmt)
+                continue
+            if job.finished:
+                break
+            if job._updated is None:
+                await asyncio.sleep(self.poll_interval)
+                job = self._load(job.job_id) or job
+                continue
+            async with job._updated:
+                await job._updated.wait_for(lambda: index < len(job.records) or job.finished)
+        yield self._format_event("summary", job.summary(), fmt)
+
+    @staticmethod
+    def _format_event(event_type: str, payload: Dict[str, Any], fmt: str) -> str:
+        if fmt == "sse":
+            return f"event: {event_type}\ndata: {json.dumps(payload, default=str)}\n\n"
+        return json.dumps({"type": event_type, **payload}, default=str) + "\n"
+
+    async def _notify(self, job: BatchJob):
+        if job._updated is not None:
+            async with job._updated:
+                job._updated.notify_all()
+
+    # ===== OWNERSHIP =====
+
+    def _lock_path(self, job_id: str) -> Path:
+        return self._journal_path(job_id).with_suffix(".lock")
+
+    def _acquire(self, job_id: str) -> bool:
+        """Take the job's lock without blocking; False if another process holds it"""
+        if job_id in self._locks:
+            return True
+        lock_file = open(self._lock_path(job_id), "a")
+        try:
+            fcntl.flock(lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except OSError:
+            lock_file.close()
+            return False
+        self._locks[job_id] = lock_file
+        return True
+
+    def _release(self, job_id: str):
+        lock_file = self._locks.pop(job_id, None)
+        if lock_file is not None:
+            fcntl.flock(lock_file, fcntl.LOCK_UN)
+            lock_file.close()
+
+    def _owned_elsewhere(self, job_id: str) -> bool:
+        """Whether another live process holds the job's lock"""
+        if job_id in self._locks or not self._lock_path(job_id).exists():
+            return False
+        if not self._acquire(job_id):
+            return True
+        self._release(job_id)
+        return False
+
+    # ===== JOURNAL =====
+
+    def _journal_path(self, job_id: str) -> Optional[Path]:
+        try:
+            # Job ids are UUIDs; anything else could escape the state dir
+            return self.state_dir / f"{uuid.UUID(job_id)}.jsonl"
+        except ValueError:
+            return None
+
+    def _append(self, job_id: str, entry: Dict[str, Any]):
+        with open(self._journal_path(job_id), "a") as f:
+            f.write(json.dumps(entry, default=str) + "\n")
+
+    def _load(self, job_id: str) -> Optional[BatchJob]:
+        path = self._journal_path(job_id)
+        if path is None or not path.exists():
+            return None
+
+        job = None
+        with open(path) as f:
+            for line in f:
+                try:
+                    entry = json.loads(line)
+                except json.JSONDecodeError:
+                    # Torn last line from a crash mid-write; that document is re-run
+                    logger.warning(f"Skipping corrupt line in batch journal {path.name}")
+                    continue
+                entry_type = entry.pop("type", None)
+                if entry_type == "job":
+                    job = BatchJob(
+                        job_id=entry["job_id"],
+                        user_id=entry["user_id"],
+                        document_ids=entry["document_ids"],
+                        processing_options=entry.get("processing_options", {}),
+                        created_at=entry.get("created_at"),
+                        status="interrupted"
+                    )
+                elif job is not None and entry_type == "result":
+                    job.add_record(entry)
+                elif job is not None and entry_type == "resume":
+                    job.resumed += 1
+                elif job is not None and entry_type == "status":
+                    job.status = entry["status"]
+                    job.finished_at = entry.get("finished_at")
+        if job is not None and job.status == "interrupted" and self._owned_elsewhere(job_id):
+            job.status = "running"
+        return job
+
+    def _remember(self, job: BatchJob):
+        self._jobs[job.job_id] = job
+        self._jobs.move_to_end(job.job_id)
+        # Evict finished jobs beyond the limit; they can be reloaded from disk
+        for job_id in list(self._jobs):
+            if len(self._jobs) <= self.max_jobs_in_memory:
+                break
+            if self._jobs[job_id].finished and job_id not in self._tasks:
+                del self._jobs[job_id]
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get executor statistics"""
+        return {
+            "running_jobs": len(self._tasks),
+            "jobs_in_memory": len(self._jobs),
+            "max_concurrency": self.max_concurrency,
+            "dependency_limits": self.dependency_limits
+        }
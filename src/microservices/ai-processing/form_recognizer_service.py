@@ -519,9 +519,11 @@ Azure Service: Form Recognizer (Document Intelligence)
 """
 
 import asyncio
+import hashlib
 import logging
+import os
 from typing import Dict, Any, List, Optional, Tuple
-from datetime import datetime
+from datetime import date, datetime, time
 import json
 
 # Azure imports (optional)
@@ -540,6 +542,21 @@ except ImportError:
 from src.shared.config.settings import config_manager
 from src.shared.events.event_sourcing import DomainEvent, EventType, EventBus
 from src.shared.rate_limiting import form_recognizer_rate_limit
+from src.shared.cache.local_cache import LocalCache, MISSING
+from src.shared.cache.redis_cache import cache_service, CacheKeys
+from src.shared.utils.keyword_matcher import KeywordMatcher
+
+
+def _json_default(obj: Any) -> str:
+    if isinstance(obj, (datetime, date, time)):
+        return obj.isoformat()
+    return str(obj)
+
+
+def _json_safe(result: Dict[str, Any]) -> Dict[str, Any]:
+    """Plain JSON types only, so cached and freshly analyzed results are identical"""
+    return json.loads(json.dumps(result, default=_json_default))
+
 
 class FormRecognizerService:
     """Azure Form Recognizer service for document analysis"""
@@ -572,12 +589,60 @@ class FormRecognizerService:
             "general": "prebuilt-document",
             "layout": "prebuilt-layout"
         }
+        
+        # Document type keyword dictionaries, compiled once for heuristic classification
+        self.keyword_matcher = KeywordMatcher(config_manager.get_heuristics_config().document_type_keywords)
+        
+        # Content-addressed result cache (content hash + model): identical bytes are
+        # only sent to the analyzer once. Memory tier per process, Redis tier shared.
+        self.result_cache = LocalCache(
+            max_size=int(os.getenv('FORM_RECOGNIZER_CACHE_SIZE', '256')),
+            max_ttl=float(os.getenv('FORM_RECOGNIZER_CACHE_TTL', '3600'))
+        )
+        self.shared_cache_ttl = int(os.getenv('FORM_RECOGNIZER_SHARED_CACHE_TTL', '604800'))
+        self.cache_stats = {
+            "lookups": 0,
+            "memory_hits": 0,
+            "shared_hits": 0,  # Redis hits and requests coalesced with an in-flight analysis
+            "analyzer_calls": 0
+        }
     
-    @form_recognizer_rate_limit
     async def analyze_document(self, document_content: bytes, 
                              model_type: str = "general") -> Dict[str, Any]:
         """
         Analyze document using specified model
+        Results are cached by content hash + model; the returned dict is shared
+        with the cache and must not be mutated. Results hold plain JSON types
+        only (dates as ISO strings), whether or not they came from the cache.
+        """
+        model = self.document_models.get(model_type, "prebuilt-document")
+        content_hash = hashlib.sha256(document_content).hexdigest()
+        cache_key = CacheKeys.FORM_RECOGNIZER_RESULT.format(model=model, content_hash=content_hash)
+        self.cache_stats["lookups"] += 1
+        
+        result = self.result_cache.get(cache_key)
+        if result is not MISSING:
+            self.cache_stats["memory_hits"] += 1
+            return result
+        
+        analyzed = False
+        
+        async def analyze():
+            nonlocal analyzed
+            analyzed = True
+            self.cache_stats["analyzer_calls"] += 1
+            return await self._analyze_with_service(document_content, model_type)
+        
+        result = await cache_service.get_or_set(cache_key, analyze, ttl=self.shared_cache_ttl)
+        if not analyzed:
+            self.cache_stats["shared_hits"] += 1
+        self.result_cache.set(cache_key, result)
+        return result
+    
+    @form_recognizer_rate_limit
+    async def _analyze_with_service(self, document_content: bytes, model_type: str) -> Dict[str, Any]:
+        """
+        Send a document to Form Recognizer (uncached)
         Rate limited to prevent quota exhaustion
         """
         try:
@@ -592,7 +657,7 @@ class FormRecognizerService:
             
             result = await loop.run_in_executor(None, lambda: poller.result())
             
-            return await self._process_analysis_result(result, model_type)
+            return _json_safe(await self._process_analysis_result(result, model_type))
             
         except ResourceNotFoundError as e:
             self.logger.error(f"Form Recognizer model not found: {str(e)}")
@@ -608,15 +673,7 @@ class FormRecognizerService:
         """Extract text from document"""
         try:
             result = await self.analyze_document(document_content, "general")
-            
-            return {
-                "text": result.get("content", ""),
-                "paragraphs": result.get("paragraphs", []),
-                "lines": result.get("lines", []),
-                "words": result.get("words", []),
-                "confidence": result.get("confidence", 0.0),
-                "page_count": result.get("page_count", 0)
-            }
+            return self._text_from_result(result)
             
         except Exception as e:
             self.logger.error(f"Error extracting text: {str(e)}")
@@ -625,30 +682,8 @@ class FormRecognizerService:
     async def extract_tables(self, document_content: bytes) -> List[Dict[str, Any]]:
         """Extract tables from document"""
         try:
-            result = await self.analyze_document(document_content, "layout")
-            
-            tables = []
-            for table in result.get("tables", []):
-                table_data = {
-                    "row_count": table.row_count,
-                    "column_count": table.column_count,
-                    "cells": [],
-                    "confidence": table.confidence
-                }
-                
-                for cell in table.cells:
-                    cell_data = {
-                        "content": cell.content,
-                        "row_index": cell.row_index,
-                        "column_index": cell.column_index,
-                        "confidence": cell.confidence,
-                        "is_header": cell.kind == "columnHeader" if hasattr(cell, 'kind') else False
-                    }
-                    table_data["cells"].append(cell_data)
-                
-                tables.append(table_data)
-            
-            return tables
+            result = await self.analyze_document(document_content, "general")
+            return self._tables_from_result(result)
             
         except Exception as e:
             self.logger.error(f"Error extracting tables: {str(e)}")
@@ -657,25 +692,43 @@ class FormRecognizerService:
     async def extract_key_value_pairs(self, document_content: bytes) -> List[Dict[str, Any]]:
         """Extract key-value pairs from document"""
         try:
-            result = await self.analyze_document(document_content, "layout")
-            
-            key_value_pairs = []
-            for kvp in result.get("key_value_pairs", []):
-                pair_data = {
-                    "key": kvp.key.content if kvp.key else "",
-                    "value": kvp.value.content if kvp.value else "",
-                    "confidence": kvp.confidence,
-                    "key_confidence": kvp.key.confidence if kvp.key else 0.0,
-                    "value_confidence": kvp.value.confidence if kvp.value else 0.0
-                }
-                key_value_pairs.append(pair_data)
-            
-            return key_value_pairs
+            result = await self.analyze_document(document_content, "general")
+            return self._key_value_pairs_from_result(result)
             
         except Exception as e:
             self.logger.error(f"Error extracting key-value pairs: {str(e)}")
             raise
     
+    @staticmethod
+    def _text_from_result(result: Dict[str, Any]) -> Dict[str, Any]:
+        return {
+            "text": result.get("content", ""),
+            "paragraphs": result.get("paragraphs", []),
+            "lines": result.get("lines", []),
+            "words": result.get("words", []),
+            "confidence": result.get("confidence", 0.0),
+            "page_count": result.get("page_count", 0)
+        }
+    
+    @staticmethod
+    def _tables_from_result(result: Dict[str, Any]) -> List[Dict[str, Any]]:
+        return result.get("tables", [])
+    
+    @staticmethod
+    def _key_value_pairs_from_result(result: Dict[str, Any]) -> List[Dict[str, Any]]:
+        return result.get("key_value_pairs", [])
+    
+    def get_cache_stats(self) -> Dict[str, Any]:
+        """Get analysis result cache statistics"""
+        lookups = self.cache_stats["lookups"]
+        saved = self.cache_stats["memory_hits"] + self.cache_stats["shared_hits"]
+        return {
+            **self.cache_stats,
+            "analyzer_calls_saved": saved,
+            "hit_rate": round(saved / lookups, 4) if lookups else 0.0,
+            "memory_tier": self.result_cache.get_stats()
+        }
+    
     async def analyze_invoice(self, document_content: bytes) -> Dict[str, Any]:
         """Analyze invoice document"""
         try:
@@ -864,49 +917,8 @@ class FormRecognizerService:
         Returns:
             (document_type, confidence)
         """
-        # Invoice keywords and patterns
-        invoice_keywords = [
-            "invoice", "bill to", "invoice number", "invoice date",
-            "amount due", "total amount", "subtotal", "tax amount",
-            "payment terms", "due date", "remittance", "vendor"
-        ]
-        
-        # Receipt keywords and patterns
-        receipt_keywords = [
-            "receipt", "thank you for your purchase", "cashier",
-            "transaction", "payment method", "card ending", "merchant",
-            "store #", "terminal", "cash"
-        ]
-        
-        # Business card keywords
-        business_card_keywords = [
-            "tel:", "phone:", "mobile:", "email:", "fax:",
-            "linkedin", "twitter", "website:", "www.",
-            "ceo", "manager", "director", "president", "vp"
-        ]
-        
-        # ID document keywords
-        id_keywords = [
-            "driver license", "driver's license", "passport",
-            "identification", "id number", "date of birth", "dob",
-            "nationality", "issued by", "expiration date", "expires"
-        ]
-        
-        # Tax document keywords
-        tax_keywords = [
-            "w-2", "w2", "form 1099", "1099", "tax year",
-            "employer identification", "ein", "social security",
-            "federal income", "state income", "irs"
-        ]
-        
-        # Count keyword matches for each type
-        scores = {
-            "invoice": self._count_keywords(text_content, invoice_keywords),
-            "receipt": self._count_keywords(text_content, receipt_keywords),
-            "business_card": self._count_keywords(text_content, business_card_keywords),
-            "id_document": self._count_keywords(text_content, id_keywords),
-            "tax_document": self._count_keywords(text_content, tax_keywords)
-        }
+        # Distinct keywords of each type found in the text (one pass over the text)
+        scores = self.keyword_matcher.count(text_content)
         
         # Additional heuristics based on document structure
         table_count = len(layout_result.get("tables", []))
@@ -946,14 +958,6 @@ class FormRecognizerService:
         
         return document_type, confidence
     
-    def _count_keywords(self, text: str, keywords: list[str]) -> int:
-        """Count how many keywords appear in text"""
-        count = 0
-        for keyword in keywords:
-            if keyword in text:
-                count += 1
-        return count
-    
     async def _process_analysis_result(self, result, model_type: str) -> Dict[str, Any]:
         """Process Form Recognizer analysis result"""
         try:
@@ -1035,7 +1039,8 @@ class FormRecognizerService:
                             "content": cell.content,
                             "row_index": cell.row_index,
                             "column_index": cell.column_index,
-                            "confidence": cell.confidence
+                            "confidence": cell.confidence,
+                            "is_header": cell.kind == "columnHeader" if hasattr(cell, 'kind') else False
                         }
                         table_data["cells"].append(cell_data)
                     
@@ -1047,7 +1052,9 @@ class FormRecognizerService:
                     kvp_data = {
                         "key": kvp.key.content if kvp.key else "",
                         "value": kvp.value.content if kvp.value else "",
-                        "confidence": kvp.confidence
+                        "confidence": kvp.confidence,
+                        "key_confidence": getattr(kvp.key, 'confidence', 0.0) if kvp.key else 0.0,
+                        "value_confidence": getattr(kvp.value, 'confidence', 0.0) if kvp.value else 0.0
                     }
                     processed_result["key_value_pairs"].append(kvp_data)
             
@@ -569,10 +569,14 @@ Service: AI Processing Microservice (Core Intelligence Engine)
 import asyncio
 import logging
 import json
+import os
+import time
+import uuid
 from typing import Dict, Any, List, Optional
 from datetime import datetime
 from fastapi import FastAPI, HTTPException, Depends, BackgroundTasks
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import StreamingResponse
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from pydantic import BaseModel, Field
 
@@ -594,6 +598,8 @@ from src.shared.events.event_sourcing import (
 )
 from openai_service import OpenAIService
 from form_recognizer_service import FormRecognizerService
+from ocr_pool import OCRWorkerPool, OCRQueueFullError
+from batch_jobs import BatchExecutor
 # from ml_models import # MLModelManager
 from fine_tuning_service import DocumentFineTuningService
 from fine_tuning_api import router as fine_tuning_router
@@ -653,7 +659,15 @@ except Exception as e:
     logger.warning(f"Azure Service Bus not available: {str(e)}")
 # AI Services
 openai_service = OpenAIService(event_bus)
+
+# LLM stages of process_document_with_ai: "parallel" issues entity extraction,
+# summary and classification concurrently; "fused" asks for all three in one call
+AI_LLM_MODE = os.getenv("AI_LLM_MODE", "parallel")
+# Max concurrent LLM calls per document (both modes, chunk calls of long documents included)
+AI_DOCUMENT_LLM_CONCURRENCY = int(os.getenv("AI_DOCUMENT_LLM_CONCURRENCY", "3"))
 form_recognizer_service = FormRecognizerService(event_bus)
+# OCR runs in worker processes so pytesseract never blocks the event loop
+ocr_pool = OCRWorkerPool()
 # ml_model_manager = MLModelManager(event_bus)
 fine_tuning_service = DocumentFineTuningService(event_bus)
 fine_tuning_workflow = DocumentFineTuningWorkflow(event_bus)
@@ -711,13 +725,17 @@ class BatchProcessingRequest(BaseModel):
     document_ids: List[str]
     user_id: str
     processing_options: Optional[Dict[str, Any]] = Field(default_factory=dict)
+    wait: bool = False  # Block until the batch finishes and return all results
 
 class BatchProcessingResponse(BaseModel):
     batch_id: str
+    status: str
     total_documents: int
-    successful_processing: int
-    failed_processing: int
-    results: List[Dict[str, Any]]
+    successful_processing: int = 0
+    failed_processing: int = 0
+    results: List[Dict[str, Any]] = Field(default_factory=list)
+    status_url: Optional[str] = None
+    stream_url: Optional[str] = None
 
 class IntelligentRoutingRequest(BaseModel):
     document_id: str
@@ -823,6 +841,9 @@ async def process_document(
         
     except HTTPException:
         raise
+    except OCRQueueFullError as e:
+        logger.warning(f"Rejecting document {request.document_id}: {str(e)}")
+        raise HTTPException(status_code=503, detail="OCR queue full, retry later")
     except Exception as e:
         logger.error(f"Error processing document {request.document_id}: {str(e)}")
         
@@ -842,59 +863,81 @@ async def process_document(
 @app.post("/batch-process", response_model=BatchProcessingResponse)
 async def batch_process_documents(
     request: BatchProcessingRequest,
-    user_id: str = Depends(get_current_user),
-    background_tasks: BackgroundTasks = BackgroundTasks()
+    user_id: str = Depends(get_current_user)
 ):
-    """Process multiple documents in batch"""
+    """
+    Process multiple documents in batch
+    
+    Returns a batch id immediately; results can be followed at stream_url
+    (NDJSON, or SSE with ?format=sse) or polled at status_url. With
+    wait=true the call blocks and returns all results.
+    """
     try:
-        batch_id = str(uuid.uuid4())
-        successful_processing = 0
-        failed_processing = 0
-        results = []
-        
-        # Process documents concurrently
-        tasks = []
-        for document_id in request.document_ids:
-            task = process_single_document_async(
-                document_id, user_id, request.processing_options
+        job = await batch_executor.submit(user_id, request.document_ids, request.processing_options)
+        
+        if request.wait:
+            job = await batch_executor.wait(job.job_id)
+            summary = job.summary()
+            return BatchProcessingResponse(
+                batch_id=job.job_id,
+                status=job.status,
+                total_documents=summary["total_documents"],
+                successful_processing=summary["successful_processing"],
+                failed_processing=summary["failed_processing"],
+                results=job.records
             )
-            tasks.append(task)
-        
-        # Wait for all tasks to complete
-        batch_results = await asyncio.gather(*tasks, return_exceptions=True)
-        
-        for i, result in enumerate(batch_results):
-            document_id = request.document_ids[i]
-            
-            if isinstance(result, Exception):
-                failed_processing += 1
-                results.append({
-                    "document_id": document_id,
-                    "status": "failed",
-                    "error": str(result)
-                })
-            else:
-                successful_processing += 1
-                results.append({
-                    "document_id": document_id,
-                    "status": "completed",
-                    "processing_result": result
-                })
-        
-        logger.info(f"Batch processing completed. Batch ID: {batch_id}, Success: {successful_processing}, Failed: {failed_processing}")
         
         return BatchProcessingResponse(
-            batch_id=batch_id,
-            total_documents=len(request.document_ids),
-            successful_processing=successful_processing,
-            failed_processing=failed_processing,
-            results=results
+            batch_id=job.job_id,
+            status=job.status,
+            total_documents=len(job.document_ids),
+            status_url=f"/batch-process/{job.job_id}",
+            stream_url=f"/batch-process/{job.job_id}/stream"
         )
         
     except Exception as e:
         logger.error(f"Error in batch processing: {str(e)}")
         raise HTTPException(status_code=500, detail="Internal server error")
 
+# Batch status endpoint
+@app.get("/batch-process/{batch_id}")
+async def get_batch_status(
+    batch_id: str,
+    include_results: bool = True,
+    user_id: str = Depends(get_current_user)
+):
+    """Get progress (and results so far) of a batch"""
+    job = batch_executor.get_job(batch_id)
+    if not job or job.user_id != user_id:
+        raise HTTPException(status_code=404, detail="Batch not found")
+    
+    response = job.summary()
+    if include_results:
+        response["results"] = job.records
+    return response
+
+# Batch results stream endpoint
+@app.get("/batch-process/{batch_id}/stream")
+async def stream_batch_results(
+    batch_id: str,
+    format: str = "ndjson",
+    user_id: str = Depends(get_current_user)
+):
+    """Stream per-document results as they complete (NDJSON or SSE)"""
+    if format not in ("ndjson", "sse"):
+        raise HTTPException(status_code=400, detail="format must be 'ndjson' or 'sse'")
+    
+    job = batch_executor.get_job(batch_id)
+    if not job or job.user_id != user_id:
+        raise HTTPException(status_code=404, detail="Batch not found")
+    
+    media_type = "text/event-stream" if format == "sse" else "application/x-ndjson"
+    return StreamingResponse(
+        batch_executor.stream(job, format),
+        media_type=media_type,
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
 # Document classification endpoint
 @app.post("/classify", response_model=ClassificationResponse)
 async def classify_document(request: ClassificationRequest):
@@ -1331,7 +1374,11 @@ async def get_model_status():
             "models": models_status,
             "overall_status": "healthy" if all(
                 model["status"] == "healthy" for model in models_status.values()
-            ) else "degraded"
+            ) else "degraded",
+            "model_registry": ml_model_manager.get_model_stats(),
+            "form_recognizer_cache": form_recognizer_service.get_cache_stats(),
+            "ocr": ocr_pool.get_stats(),
+            "openai": openai_service.get_client_stats()
         }
         
     except Exception as e:
@@ -1393,21 +1440,15 @@ async def download_document_content(blob_path: str) -> bytes:
         raise
 
 async def extract_text_from_image(image_content: bytes) -> str:
-    """Extract text from image using OCR (Tesseract)"""
+    """Extract text from image using OCR (Tesseract) in the OCR worker pool"""
     try:
-        from PIL import Image
-        import pytesseract
-        import io
-        
-        # Open image from bytes
-        image = Image.open(io.BytesIO(image_content))
-        
-        # Perform OCR
-        extracted_text = pytesseract.image_to_string(image)
+        extracted_text = await ocr_pool.extract_text(image_content)
         
         logger.info(f"OCR extracted {len(extracted_text)} characters from image")
         return extracted_text
         
+    except OCRQueueFullError:
+        raise
     except Exception as e:
         logger.error(f"Error extracting text from image: {str(e)}")
         return ""
@@ -1417,7 +1458,15 @@ async def process_document_with_ai(
     document: Dict[str, Any], 
     processing_options: Dict[str, Any]
 ) -> Dict[str, Any]:
-    """Process document using AI services (OpenAI-only mode for local development)"""
+    """
+    Process document using AI services (OpenAI-only mode for local development)
+    
+    processing_options:
+        llm_mode: "parallel" or "fused" (default: AI_LLM_MODE)
+        max_concurrent_llm_calls: per-document cap on LLM calls (default: AI_DOCUMENT_LLM_CONCURRENCY)
+    """
+    stage_timings: Dict[str, float] = {}
+    started = time.perf_counter()
     try:
         # Detect if document is an image and extract text using OCR
         content_type = document.get("content_type", "")
@@ -1441,16 +1490,36 @@ async def process_document_with_ai(
             except:
                 extracted_text = str(document_content)
         
-        logger.info(f"Processing document with OpenAI (extracted {len(extracted_text)} characters)")
+        stage_timings["text_extraction"] = _elapsed_ms(started)
+        
+        llm_mode = processing_options.get("llm_mode", AI_LLM_MODE)
+        logger.info(f"Processing document with OpenAI (extracted {len(extracted_text)} characters, mode={llm_mode})")
+        
+        # One budget for every LLM call made for this document, whichever mode
+        budget = openai_service.document_budget(
+            processing_options.get("max_concurrent_llm_calls", AI_DOCUMENT_LLM_CONCURRENCY),
+            operations=2
+        )
+        if llm_mode == "fused":
+            stage_start = time.perf_counter()
+            fused = await openai_service.analyze_document_fused(extracted_text, budget=budget)
+            stage_timings["fused_analysis"] = _elapsed_ms(stage_start)
+            entities, summary, classification = fused["entities"], fused["summary"], fused["classification"]
+            if not fused["fused"]:
+                llm_mode = "fused_fallback"
+        else:
+            # Independent calls: issue them concurrently
+            entities, summary, classification = await asyncio.gather(
+                _timed_stage("entities", lambda: openai_service.extract_entities(extracted_text, budget), stage_timings),
+                _timed_stage("summary", lambda: openai_service.generate_summary(extracted_text, budget=budget), stage_timings),
+                _timed_stage("classification", lambda: openai_service.classify_document(extracted_text, budget), stage_timings)
+            )
         
-        # Use OpenAI for all processing
-        entities = await openai_service.extract_entities(extracted_text)
-        summary = await openai_service.generate_summary(extracted_text)
-        classification = await openai_service.classify_document(extracted_text)
+        stage_timings["total"] = _elapsed_ms(started)
         
         # Combine all results
         processing_result = {
-            "document_type": classification.get("predicted_type", "invoice"),
+            "document_type": classification.get("document_type", classification.get("predicted_type", "invoice")),
             "classification_confidence": classification.get("confidence", 0.85),
             "extracted_text": extracted_text[:1000],  # First 1000 chars
             "entities": entities.get("entities", []),
@@ -1458,6 +1527,8 @@ async def process_document_with_ai(
             "processing_timestamp": datetime.utcnow().isoformat(),
             "ai_models_used": ["openai_gpt", "tesseract_ocr"] if is_image else ["openai_gpt"],
             "ocr_used": is_image,
+            "llm_mode": llm_mode,
+            "stage_timings_ms": stage_timings,
             "mode": "local_development"
         }
         
@@ -1465,6 +1536,8 @@ async def process_document_with_ai(
         
         return processing_result
         
+    except OCRQueueFullError:
+        raise
     except Exception as e:
         logger.error(f"Error processing document with AI: {str(e)}")
         # Return a minimal result instead of failing
@@ -1477,9 +1550,21 @@ async def process_document_with_ai(
             "error": str(e),
             "processing_timestamp": datetime.utcnow().isoformat(),
             "ai_models_used": ["openai_gpt"],
+            "stage_timings_ms": dict(stage_timings, total=_elapsed_ms(started)),
             "mode": "local_development_fallback"
         }
 
+def _elapsed_ms(start: float) -> float:
+    return round((time.perf_counter() - start) * 1000, 1)
+
+async def _timed_stage(name: str, call, timings: Dict[str, float]):
+    """Run one processing stage and record its duration"""
+    start = time.perf_counter()
+    try:
+        return await call()
+    finally:
+        timings[name] = _elapsed_ms(start)
+
 async def update_document_processing_result(
     document_id: str, 
     user_id: str, 
@@ -1514,30 +1599,33 @@ async def process_single_document_async(
     user_id: str, 
     processing_options: Dict[str, Any]
 ) -> Dict[str, Any]:
-    """Process a single document asynchronously"""
+    """Process a single document asynchronously (batch worker)"""
     try:
-        # Get document
-        document = await get_document(document_id, user_id)
-        if not document:
-            raise Exception("Document not found")
+        start_time = time.perf_counter()
         
-        # Download content
-        document_content = await download_document_content(document["blob_path"])
+        # Get document and download content
+        async with batch_executor.limit("storage"):
+            document = await get_document(document_id, user_id)
+            if not document:
+                raise Exception("Document not found")
+            document_content = await download_document_content(document["blob_path"])
         
         # Process with AI
-        processing_result = await process_document_with_ai(
-            document_content, 
-            document, 
-            processing_options
-        )
+        async with batch_executor.limit("ai"):
+            processing_result = await process_document_with_ai(
+                document_content, 
+                document, 
+                processing_options
+            )
         
         # Update document
-        await update_document_processing_result(
-            document_id, 
-            user_id, 
-            processing_result, 
-            0.0  # Duration will be calculated by caller
-        )
+        async with batch_executor.limit("storage"):
+            await update_document_processing_result(
+                document_id, 
+                user_id, 
+                processing_result, 
+                time.perf_counter() - start_time
+            )
         
         return processing_result
         
@@ -1545,6 +1633,16 @@ async def process_single_document_async(
         logger.error(f"Error processing document {document_id}: {str(e)}")
         raise
 
+# Batch jobs run with bounded concurrency; "ai" caps documents in the
+# OCR/LLM stage across all batches, "storage" caps metadata/blob calls
+batch_executor = BatchExecutor(
+    process_single_document_async,
+    dependency_limits={
+        "ai": int(os.getenv("BATCH_AI_CONCURRENCY", "4")),
+        "storage": int(os.getenv("BATCH_STORAGE_CONCURRENCY", "10"))
+    }
+)
+
 async def publish_event(event):
     """Publish event to event bus"""
     try:
@@ -1577,12 +1675,19 @@ async def startup_event():
         logger.info("ML models loaded successfully")
     except Exception as e:
         logger.warning(f"Could not load some models: {str(e)}")
+    
+    # Pick up batches interrupted by the last shutdown
+    resumed = await batch_executor.resume_incomplete()
+    if resumed:
+        logger.info(f"Resumed {resumed} batch jobs")
 
 # Shutdown event
 @app.on_event("shutdown")
 async def shutdown_event():
     """Cleanup on shutdown"""
     logger.info("AI Processing Service shutting down")
+    await batch_executor.shutdown()
+    ocr_pool.shutdown()
     await service_bus_client.close()
 
 if __name__ == "__main__":
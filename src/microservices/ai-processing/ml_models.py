@@ -4,12 +4,15 @@ Advanced machine learning models for document classification, sentiment analysis
 """
 
 import asyncio
+import json
 import logging
+import os
 import pickle
 import numpy as np
 import pandas as pd
 from typing import Dict, Any, List, Optional, Tuple
 from datetime import datetime
+from concurrent.futures import ProcessPoolExecutor
 import joblib
 from sklearn.feature_extraction.text import TfidfVectorizer, CountVectorizer
 from sklearn.ensemble import RandomForestClassifier, GradientBoostingClassifier
@@ -29,6 +32,89 @@ import onnxruntime as ort
 
 from src.shared.config.settings import config_manager
 from src.shared.events.event_sourcing import DomainEvent, EventType, EventBus
+from model_registry import ModelRegistry, LazyModelStore
+
+# Which vectorizer and label encoder each batch prediction uses
+BATCH_PREDICTORS = {
+    'classification': ('document_classifier_tfidf', 'tfidf', 'document_type'),
+    'sentiment': ('sentiment_classifier', 'tfidf', 'sentiment'),
+    'language': ('language_detector', 'count', 'language'),
+}
+
+# Fitted components in batch prediction worker processes (set once per worker)
+_worker_components: Dict[str, Any] = {}
+
+
+def _top_k(probabilities: np.ndarray, k: int) -> np.ndarray:
+    """Column indices of the k highest probabilities per row, highest first"""
+    k = min(k, probabilities.shape[1])
+    # Partial sort: only the top k of each row are ordered
+    top = np.argpartition(-probabilities, k - 1, axis=1)[:, :k]
+    order = np.argsort(-np.take_along_axis(probabilities, top, axis=1), axis=1)
+    return np.take_along_axis(top, order, axis=1)
+
+
+def _predict_batch(components: Dict[str, Any], texts: List[str], prediction_type: str) -> List[Dict[str, Any]]:
+    """
+    Run the requested predictions over a list of texts
+
+    Each vectorizer transforms the whole list once and each model gets one
+    predict_proba call on the resulting sparse matrix.
+    """
+    timestamp = datetime.utcnow().isoformat()
+    results = [{'text': text} for text in texts]
+    matrices = {}
+
+    for task, (model_name, vectorizer_name, encoder_name) in BATCH_PREDICTORS.items():
+        if prediction_type not in ('all', task):
+            continue
+        if vectorizer_name not in matrices:
+            matrices[vectorizer_name] = components['vectorizers'][vectorizer_name].transform(texts)
+        model = components['models'][model_name]
+        probabilities = model.predict_proba(matrices[vectorizer_name])
+        # predict_proba columns follow the classes the model was trained on
+        labels = components['encoders'][encoder_name].classes_[model.classes_].tolist()
+        best = probabilities.argmax(axis=1)
+        confidences = probabilities[np.arange(len(texts)), best]
+
+        if task == 'sentiment':
+            for i, result in enumerate(results):
+                result[task] = {
+                    'predicted_sentiment': labels[best[i]],
+                    'confidence': float(confidences[i]),
+                    'sentiment_scores': {
+                        label: float(score) for label, score in zip(labels, probabilities[i])
+                    },
+                    'model_used': model_name,
+                    'timestamp': timestamp
+                }
+            continue
+
+        top = _top_k(probabilities, 3)
+        label_key, predicted_key = ('class', 'predicted_type') if task == 'classification' else ('language', 'predicted_language')
+        for i, result in enumerate(results):
+            result[task] = {
+                predicted_key: labels[best[i]],
+                'confidence': float(confidences[i]),
+                'top_predictions': [
+                    {label_key: labels[idx], 'confidence': float(probabilities[i, idx])}
+                    for idx in top[i]
+                ],
+                'model_used': model_name,
+                'timestamp': timestamp
+            }
+
+    return results
+
+
+def _init_prediction_worker(components: Dict[str, Any]):
+    """Receive the fitted models once when a worker process starts"""
+    _worker_components.update(components)
+
+
+def _predict_shard(texts: List[str], prediction_type: str) -> List[Dict[str, Any]]:
+    return _predict_batch(_worker_components, texts, prediction_type)
+
 
 class DocumentDataset(Dataset):
     """PyTorch dataset for document classification"""
@@ -83,10 +169,18 @@ class MLModelManager:
         self.event_bus = event_bus
         self.logger = logging.getLogger(__name__)
         
-        # Model storage
-        self.models = {}
-        self.vectorizers = {}
-        self.label_encoders = {}
+        # Model storage; entries restored by load_model are read from the
+        # registry (memory-mapped) on first use
+        self.registry = ModelRegistry()
+        self.models = LazyModelStore(self.registry)
+        self.vectorizers = LazyModelStore(self.registry)
+        self.label_encoders = LazyModelStore(self.registry)
+        
+        # Large batch predictions are split into shards of this many texts
+        # and run in ML_BATCH_WORKERS processes (0 = always in-process)
+        self.batch_workers = int(os.getenv('ML_BATCH_WORKERS', '0'))
+        self.batch_shard_size = int(os.getenv('ML_BATCH_SHARD_SIZE', '1000'))
+        self._prediction_pool: Optional[ProcessPoolExecutor] = None
         
         # Document types for classification
         self.document_types = [
@@ -464,60 +558,92 @@ class MLModelManager:
     async def batch_predict(self, texts: List[str], prediction_type: str = 'all') -> List[Dict[str, Any]]:
         """Perform batch predictions on multiple texts"""
         try:
-            results = []
-            
-            for text in texts:
-                result = {'text': text}
-                
-                if prediction_type in ['all', 'classification']:
-                    classification = await self.classify_document(text)
-                    result['classification'] = classification
-                
-                if prediction_type in ['all', 'sentiment']:
-                    sentiment = await self.analyze_sentiment(text)
-                    result['sentiment'] = sentiment
-                
-                if prediction_type in ['all', 'language']:
-                    language = await self.detect_language(text)
-                    result['language'] = language
-                
-                results.append(result)
-            
-            return results
+            if not texts:
+                return []
+            
+            if self.batch_workers <= 0 or len(texts) <= self.batch_shard_size:
+                return await asyncio.to_thread(
+                    _predict_batch, self._prediction_components(), texts, prediction_type
+                )
+            
+            # Shard across worker processes; results keep input order
+            loop = asyncio.get_running_loop()
+            pool = self._get_prediction_pool()
+            shards = await asyncio.gather(*[
+                loop.run_in_executor(
+                    pool, _predict_shard, texts[i:i + self.batch_shard_size], prediction_type
+                )
+                for i in range(0, len(texts), self.batch_shard_size)
+            ])
+            return [result for shard in shards for result in shard]
             
         except Exception as e:
             self.logger.error(f"Error in batch prediction: {str(e)}")
             raise
     
+    def get_model_stats(self) -> Dict[str, Any]:
+        """Load time and memory per stored model, and which models are loaded"""
+        return {
+            **self.registry.get_stats(),
+            'loaded': {name: self.models.is_loaded(name) for name in self.models.keys()}
+        }
+    
+    def _prediction_components(self) -> Dict[str, Any]:
+        """Fitted vectorizers, models and encoders used by batch prediction"""
+        return {
+            'vectorizers': {name: self.vectorizers[name] for name in ('tfidf', 'count')},
+            'models': {model_name: self.models[model_name] for model_name, _, _ in BATCH_PREDICTORS.values()},
+            'encoders': {name: self.label_encoders[name] for _, _, name in BATCH_PREDICTORS.values()},
+        }
+    
+    def _get_prediction_pool(self) -> ProcessPoolExecutor:
+        """Worker processes receive the current models once, at startup"""
+        if self._prediction_pool is None:
+            self._prediction_pool = ProcessPoolExecutor(
+                max_workers=self.batch_workers,
+                initializer=_init_prediction_worker,
+                initargs=(self._prediction_components(),)
+            )
+        return self._prediction_pool
+    
+    def _reset_prediction_pool(self):
+        """
+        Retire worker processes holding outdated models
+        
+        The next batch starts a fresh pool; shards already queued on the old
+        one still run to completion on the models they started with.
+        """
+        old_pool, self._prediction_pool = self._prediction_pool, None
+        if old_pool is not None:
+            old_pool.shutdown(wait=False, cancel_futures=False)
+    
     async def _save_model(self, model_name: str, training_result: Dict[str, Any]):
-        """Save trained model to storage"""
+        """Save trained model to the model registry"""
         try:
             # Save model
-            model_path = f"models/{model_name}.joblib"
-            joblib.dump(self.models[model_name], model_path)
+            self.registry.save(model_name, self.models[model_name])
             
             # Save vectorizer if applicable
             if 'tfidf' in model_name:
-                vectorizer_path = f"models/{model_name}_vectorizer.joblib"
-                joblib.dump(self.vectorizers['tfidf'], vectorizer_path)
+                self.registry.save(f"{model_name}_vectorizer", self.vectorizers['tfidf'])
             elif 'count' in model_name:
-                vectorizer_path = f"models/{model_name}_vectorizer.joblib"
-                joblib.dump(self.vectorizers['count'], vectorizer_path)
+                self.registry.save(f"{model_name}_vectorizer", self.vectorizers['count'])
             
             # Save label encoder
-            encoder_path = f"models/{model_name}_encoder.joblib"
+            encoder_key = f"{model_name}_encoder"
             if 'document' in model_name:
-                joblib.dump(self.label_encoders['document_type'], encoder_path)
+                self.registry.save(encoder_key, self.label_encoders['document_type'])
             elif 'sentiment' in model_name:
-                joblib.dump(self.label_encoders['sentiment'], encoder_path)
+                self.registry.save(encoder_key, self.label_encoders['sentiment'])
             elif 'language' in model_name:
-                joblib.dump(self.label_encoders['language'], encoder_path)
+                self.registry.save(encoder_key, self.label_encoders['language'])
             
             # Save training metadata
-            metadata_path = f"models/{model_name}_metadata.json"
+            metadata_path = self.registry.model_dir / f"{model_name}_metadata.json"
             with open(metadata_path, 'w') as f:
                 json.dump(training_result, f, indent=2)
             
+            self._reset_prediction_pool()
             self.logger.info(f"Model {model_name} saved successfully")
             
         except Exception as e:
@@ -525,31 +651,29 @@ class MLModelManager:
             raise
     
     async def load_model(self, model_name: str):
-        """Load trained model from storage"""
+        """Restore a trained model from the registry; files are read on first use"""
         try:
             # Load model
-            model_path = f"models/{model_name}.joblib"
-            self.models[model_name] = joblib.load(model_path)
+            self.models.defer(model_name, model_name)
             
             # Load vectorizer if applicable
             if 'tfidf' in model_name:
-                vectorizer_path = f"models/{model_name}_vectorizer.joblib"
-                self.vectorizers['tfidf'] = joblib.load(vectorizer_path)
+                self.vectorizers.defer('tfidf', f"{model_name}_vectorizer")
             elif 'count' in model_name:
-                vectorizer_path = f"models/{model_name}_vectorizer.joblib"
-                self.vectorizers['count'] = joblib.load(vectorizer_path)
+                self.vectorizers.defer('count', f"{model_name}_vectorizer")
             
             # Load label encoder
-            encoder_path = f"models/{model_name}_encoder.joblib"
+            encoder_key = f"{model_name}_encoder"
             if 'document' in model_name:
-                self.label_encoders['document_type'] = joblib.load(encoder_path)
+                self.label_encoders.defer('document_type', encoder_key)
             elif 'sentiment' in model_name:
-                self.label_encoders['sentiment'] = joblib.load(encoder_path)
+                self.label_encoders.defer('sentiment', encoder_key)
             elif 'language' in model_name:
-                self.label_encoders['language'] = joblib.load(encoder_path)
+                self.label_encoders.defer('language', encoder_key)
             
-            self.logger.info(f"Model {model_name} loaded successfully")
+            self._reset_prediction_pool()
+            self.logger.info(f"Model {model_name} registered for loading")
             
         except Exception as e:
             self.logger.error(f"Error loading model {model_name}: {str(e)}")
-            raise
\ No newline at end of file
+            raise
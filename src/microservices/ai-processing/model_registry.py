@@ -0,0 +1,268 @@
+"""
+Model Registry
+Memory-mapped, lazily loaded storage for the custom scikit-learn models
+
+Models are written as uncompressed joblib files so their numpy arrays
+(TF-IDF idf weights, coefficient matrices) can be loaded with
+mmap_mode="r". Mapped arrays are read-only and backed by the OS page cache,
+so every uvicorn worker serving the same model shares one physical copy of
+its weights instead of holding its own unpickled duplicate.
+
+scikit-learn trees copy their node arrays into private buffers when
+unpickled, so random forests are stored as an ArrayForestClassifier: all
+trees flattened into a few numpy arrays that stay memory-mapped and are
+traversed with vectorized numpy indexing. Python-object parts of a model
+(e.g. a vectorizer's vocabulary dict) are still unpickled per process.
+
+Files are replaced atomically: a process that still has the previous
+version mapped keeps reading the old inode until it reloads.
+
+Usage:
+    registry = ModelRegistry()
+    registry.save("sentiment_classifier", model)
+    models = LazyModelStore(registry)
+    models.defer("sentiment_classifier", "sentiment_classifier")
+    models["sentiment_classifier"]  # loaded on first access
+"""
+
+import logging
+import os
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+import joblib
+import numpy as np
+from sklearn.base import BaseEstimator, ClassifierMixin
+from sklearn.ensemble import RandomForestClassifier
+
+try:
+    import psutil
+    PSUTIL_AVAILABLE = True
+except ImportError:
+    PSUTIL_AVAILABLE = False
+
+logger = logging.getLogger(__name__)
+
+
+def _rss_bytes() -> int:
+    """Resident set size of this process (0 if it can't be measured)"""
+    if PSUTIL_AVAILABLE:
+        return psutil.Process().memory_info().rss
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, IndexError):
+        return 0
+
+
+class ArrayForestClassifier(ClassifierMixin, BaseEstimator):
+    """
+    Random forest stored as flat node arrays
+
+    Predictions match RandomForestClassifier.predict_proba. fit() trains a
+    regular forest with forest_params and flattens it, so a loaded model can
+    still be retrained (and cloned by cross_val_score).
+    """
+
+    # Rows densified at a time during traversal
+    block_size = 256
+
+    def __init__(self, forest_params: Optional[Dict[str, Any]] = None):
+        self.forest_params = forest_params
+
+    @classmethod
+    def from_forest(cls, forest: RandomForestClassifier) -> "ArrayForestClassifier":
+        model = cls(forest.get_params())
+        model._flatten(forest)
+        return model
+
+    def fit(self, X, y):
+        forest = RandomForestClassifier(**(self.forest_params or {})).fit(X, y)
+        self._flatten(forest)
+        return self
+
+    def _flatten(self, forest: RandomForestClassifier):
+        trees = [estimator.tree_ for estimator in forest.estimators_]
+        offsets = np.cumsum([0] + [tree.node_count for tree in trees])
+        left, right, feature, threshold, proba = [], [], [], [], []
+        for tree, offset in zip(trees, offsets):
+            is_leaf = tree.children_left == -1
+            # Leaves point to themselves so traversal can run a fixed number of steps
+            own = np.arange(tree.node_count) + offset
+            left.append(np.where(is_leaf, own, tree.children_left + offset))
+            right.append(np.where(is_leaf, own, tree.children_right + offset))
+            feature.append(np.where(is_leaf, 0, tree.feature))
+            threshold.append(tree.threshold)
+            value = tree.value[:, 0, :]
+            proba.append(value / np.maximum(value.sum(axis=1, keepdims=True), 1e-12))
+
+        self.classes_ = forest.classes_
+        self.n_features_in_ = forest.n_features_in_
+        self.roots_ = offsets[:-1].astype(np.int32)
+        # (left, right) pairs so the next node is a single lookup
+        self.children_ = np.stack([np.concatenate(left), np.concatenate(right)], axis=1).astype(np.int32).ravel()
+        self.feature_ = np.concatenate(feature).astype(np.int32)
+        self.threshold_ = np.concatenate(threshold)
+        self.proba_ = np.concatenate(proba).astype(np.float32)
+        self.max_depth_ = max(tree.max_depth for tree in trees)
+
+    def predict_proba(self, X) -> np.ndarray:
+        # Plain ndarray views of the (possibly memory-mapped) arrays index faster
+        children, feature, threshold, proba = (
+            np.asarray(a) for a in (self.children_, self.feature_, self.threshold_, self.proba_)
+        )
+        n_samples = X.shape[0]
+        result = np.empty((n_samples, len(self.classes_)), dtype=np.float64)
+        for start in range(0, n_samples, self.block_size):
+            block = X[start:start + self.block_size]
+            # Trees compare float32 features, as scikit-learn does
+            dense = block.astype(np.float32).toarray() if hasattr(block, "toarray") else np.asarray(block, dtype=np.float32)
+            # Row offsets into the flattened block, one column per tree
+            row_offsets = (np.arange(dense.shape[0]) * dense.shape[1])[:, None]
+            dense = dense.ravel()
+            nodes = np.broadcast_to(np.asarray(self.roots_), (len(row_offsets), len(self.roots_))).copy()
+            # Every tree advances one level per step; leaves point to themselves
+            for _ in range(self.max_depth_):
+                go_right = np.take(dense, row_offsets + np.take(feature, nodes)) > np.take(threshold, nodes)
+                next_nodes = np.take(children, nodes * 2 + go_right)
+                if np.array_equal(next_nodes, nodes):
+                    break
+                nodes = next_nodes
+            result[start:start + len(row_offsets)] = np.take(proba, nodes, axis=0).mean(axis=1)
+        return result
+
+    def predict(self, X) -> np.ndarray:
+        return self.classes_[self.predict_proba(X).argmax(axis=1)]
+
+
+def _storage_form(obj: Any) -> Any:
+    """Convert a model to its memory-mappable form for storage"""
+    if isinstance(obj, RandomForestClassifier):
+        return ArrayForestClassifier.from_forest(obj)
+    # Vectorizers keep every pruned term in stop_words_; with 1-3 grams and
+    # max_features this is far larger than the vocabulary and unused by transform
+    if getattr(obj, "stop_words_", None) is not None:
+        obj.stop_words_ = None
+    return obj
+
+
+class ModelRegistry:
+    """Stores models on disk and loads them memory-mapped"""
+
+    def __init__(self, model_dir: Optional[str] = None, mmap: Optional[bool] = None):
+        """
+        Args:
+            model_dir: Directory holding model files (default: ML_MODEL_DIR or models)
+            mmap: Memory-map model arrays on load (default: ML_MODEL_MMAP or true)
+        """
+        self.model_dir = Path(model_dir or os.getenv("ML_MODEL_DIR", "models"))
+        self.mmap = mmap if mmap is not None else os.getenv("ML_MODEL_MMAP", "true").lower() == "true"
+        self._lock = threading.Lock()
+        self.load_stats: Dict[str, Dict[str, Any]] = {}
+
+    def path(self, key: str) -> Path:
+        return self.model_dir / f"{key}.joblib"
+
+    def exists(self, key: str) -> bool:
+        return self.path(key).exists()
+
+    def save(self, key: str, obj: Any):
+        """Write a model uncompressed (compressed files can't be memory-mapped)"""
+        self.model_dir.mkdir(parents=True, exist_ok=True)
+        path = self.path(key)
+        tmp_path = path.with_suffix(".tmp")
+        joblib.dump(_storage_form(obj), tmp_path, compress=0)
+        os.replace(tmp_path, path)
+
+    def load(self, key: str) -> Any:
+        """Load a model, recording load time and the RSS it added"""
+        path = self.path(key)
+        # Loads are serialized so the RSS delta belongs to this model
+        with self._lock:
+            rss_before = _rss_bytes()
+            start = time.perf_counter()
+            obj = joblib.load(path, mmap_mode="r" if self.mmap else None)
+            load_ms = (time.perf_counter() - start) * 1000
+            rss_added = max(0, _rss_bytes() - rss_before)
+
+        self.load_stats[key] = {
+            "load_time_ms": round(load_ms, 1),
+            "rss_added_mb": round(rss_added / 1024 / 1024, 2),
+            "file_size_mb": round(path.stat().st_size / 1024 / 1024, 2),
+            "memory_mapped": self.mmap,
+            "loaded_at": time.time()
+        }
+        logger.info(f"Loaded {key} in {load_ms:.0f} ms (+{rss_added / 1024 / 1024:.1f} MB RSS)")
+        return obj
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Per-model load statistics and this process's RSS"""
+        return {
+            "model_dir": str(self.model_dir),
+            "memory_mapped": self.mmap,
+            "process_rss_mb": round(_rss_bytes() / 1024 / 1024, 2),
+            "models": dict(self.load_stats)
+        }
+
+
+class LazyModelStore(dict):
+    """
+    Dict of models whose entries can be deferred to the registry
+
+    A deferred entry is loaded on first access, so a worker only pays for
+    (and maps) the models it actually serves.
+    """
+
+    def __init__(self, registry: ModelRegistry):
+        super().__init__()
+        self.registry = registry
+        self._deferred: Dict[str, str] = {}
+        self._lock = threading.Lock()
+
+    def defer(self, name: str, key: str):
+        """Replace an entry with the registry file `key`, loaded on first use"""
+        if not self.registry.exists(key):
+            raise FileNotFoundError(f"No stored model at {self.registry.path(key)}")
+        with self._lock:
+            self._deferred[name] = key
+            super().pop(name, None)
+
+    def is_loaded(self, name: str) -> bool:
+        return name not in self._deferred and super().__contains__(name)
+
+    def __getitem__(self, name: str) -> Any:
+        if name in self._deferred:
+            with self._lock:
+                key = self._deferred.get(name)
+                if key is not None:
+                    super().__setitem__(name, self.registry.load(key))
+                    del self._deferred[name]
+        return super().__getitem__(name)
+
+    def __setitem__(self, name: str, value: Any):
+        self._deferred.pop(name, None)
+        super().__setitem__(name, value)
+
+    def __contains__(self, name: object) -> bool:
+        return name in self._deferred or super().__contains__(name)
+
+    def get(self, name: str, default: Any = None) -> Any:
+        return self[name] if name in self else default
+
+    def keys(self):
+        # Deferred entries are never also held in the dict
+        return list(super().keys()) + list(self._deferred)
+
+    def __iter__(self):
+        return iter(self.keys())
+
+    def __len__(self) -> int:
+        return len(self.keys())
+
+    def values(self):
+        return [self[name] for name in self.keys()]
+
+    def items(self):
+        return [(name, self[name]) for name in self.keys()]
@@ -0,0 +1,260 @@
+"""
+OCR Worker Pool
+Runs Tesseract OCR in a bounded process pool, off the event loop
+
+pytesseract blocks for seconds per page, so OCR runs in worker processes
+(CPU-count sized) instead of inside request handlers. Every page holds a
+queue slot from submission until its result is back; when all slots are
+taken, callers wait up to OCR_QUEUE_TIMEOUT seconds and then get
+OCRQueueFullError (backpressure instead of unbounded queueing).
+
+Pre-processing (in the worker):
+- greyscale conversion
+- downscale so the longest side is at most OCR_MAX_DIMENSION pixels
+- deskew: small-angle rotation estimated by projection-profile search
+
+Multi-page images (TIFF) are split into frames and OCR'd in parallel.
+
+Usage:
+    pool = OCRWorkerPool()
+    text = await pool.extract_text(image_bytes)
+"""
+
+import asyncio
+import io
+import logging
+import os
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Any, Deque, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+# Deskew search range and step (degrees)
+DESKEW_MAX_ANGLE = 5.0
+DESKEW_STEP = 0.5
+# Width of the thumbnail used to estimate skew
+DESKEW_SAMPLE_WIDTH = 800
+
+
+class OCRQueueFullError(RuntimeError):
+    """Raised when the OCR queue stays full for longer than the queue timeout"""
+    pass
+
+
+# ===== WORKER-SIDE FUNCTIONS (run in pool processes) =====
+
+def _estimate_skew(image) -> float:
+    """Estimate skew angle of a greyscale page by maximising row-profile sharpness"""
+    import numpy as np
+    from PIL import Image
+
+    sample = image
+    if image.width > DESKEW_SAMPLE_WIDTH:
+        ratio = DESKEW_SAMPLE_WIDTH / image.width
+        sample = image.resize((DESKEW_SAMPLE_WIDTH, max(1, int(image.height * ratio))))
+
+    # Dark pixels are text
+    ink = Image.eval(sample, lambda p: 255 if p < 128 else 0)
+
+    best_angle, best_score = 0.0, -1.0
+    steps = int(DESKEW_MAX_ANGLE / DESKEW_STEP)
+    for i in range(-steps, steps + 1):
+        angle = i * DESKEW_STEP
+        rotated = ink.rotate(angle, resample=Image.NEAREST, fillcolor=0)
+        profile = np.asarray(rotated, dtype=np.float32).sum(axis=1)
+        # Text lines aligned with rows give sharp peaks between rows
+        score = float(np.square(np.diff(profile)).sum())
+        if score > best_score:
+            best_angle, best_score = angle, score
+    return best_angle
+
+
+def _preprocess(image, max_dimension: int, deskew: bool):
+    """Greyscale, downscale and deskew a page before OCR"""
+    from PIL import Image
+
+    image = image.convert("L")
+
+    longest = max(image.width, image.height)
+    if max_dimension and longest > max_dimension:
+        ratio = max_dimension / longest
+        image = image.resize(
+            (max(1, int(image.width * ratio)), max(1, int(image.height * ratio))),
+            Image.LANCZOS
+        )
+
+    if deskew:
+        angle = _estimate_skew(image)
+        if angle:
+            image = image.rotate(angle, resample=Image.BICUBIC, expand=True, fillcolor=255)
+    return image
+
+
+def _ocr_frame(image_content: bytes, frame: int, max_dimension: int, deskew: bool) -> str:
+    """OCR one frame (page) of an image"""
+    from PIL import Image
+    import pytesseract
+
+    image = Image.open(io.BytesIO(image_content))
+    if frame:
+        image.seek(frame)
+    page = _preprocess(image, max_dimension, deskew)
+    return pytesseract.image_to_string(page)
+
+
+def _count_frames(image_content: bytes) -> int:
+    """Number of pages in an image (reads headers only)"""
+    from PIL import Image
+
+    with Image.open(io.BytesIO(image_content)) as image:
+        return getattr(image, "n_frames", 1)
+
+
+# ===== POOL =====
+
+class OCRWorkerPool:
+    """Bounded process pool for OCR with backpressure and latency metrics"""
+
+    def __init__(
+        self,
+        max_workers: Optional[int] = None,
+        max_queue_depth: Optional[int] = None,
+        queue_timeout: Optional[float] = None,
+        max_dimension: Optional[int] = None,
+        deskew: Optional[bool] = None
+    ):
+        """
+        Args:
+            max_workers: Worker processes (default: OCR_WORKERS or CPU count)
+            max_queue_depth: Pages queued or running before callers wait (default: OCR_MAX_QUEUE_DEPTH or 4 x workers)
+            queue_timeout: Seconds to wait for a queue slot (default: OCR_QUEUE_TIMEOUT or 30)
+            max_dimension: Longest page side after downscaling (default: OCR_MAX_DIMENSION or 3000)
+            deskew: Estimate and correct page skew (default: OCR_DESKEW or true)
+        """
+        self.max_workers = max_workers or int(os.getenv("OCR_WORKERS", "0")) or os.cpu_count() or 1
+        self.max_queue_depth = max_queue_depth or int(os.getenv("OCR_MAX_QUEUE_DEPTH", "0")) or self.max_workers * 4
+        self.queue_timeout = queue_timeout if queue_timeout is not None else float(os.getenv("OCR_QUEUE_TIMEOUT", "30"))
+        self.max_dimension = max_dimension if max_dimension is not None else int(os.getenv("OCR_MAX_DIMENSION", "3000"))
+        self.deskew = deskew if deskew is not None else os.getenv("OCR_DESKEW", "true").lower() == "true"
+
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._slots: Optional[asyncio.Semaphore] = None
+        self._queued = 0
+        self._running = 0
+
+        self._stats = {
+            "documents": 0,
+            "pages": 0,
+            "failed_pages": 0,
+            "rejected_pages": 0,
+            "peak_queue_depth": 0,
+            "pool_restarts": 0,
+        }
+        # Recent per-page latencies (ms) for percentiles
+        self._latencies: Deque[float] = deque(maxlen=500)
+        self._queue_waits: Deque[float] = deque(maxlen=500)
+
+    @property
+    def executor(self) -> ProcessPoolExecutor:
+        """Worker processes are started on first use"""
+        if self._executor is None:
+            self._executor = ProcessPoolExecutor(max_workers=self.max_workers)
+            logger.info(f"OCR worker pool started with {self.max_workers} processes")
+        return self._executor
+
+    async def extract_text(self, image_content: bytes) -> str:
+        """
+        OCR an image; multi-page images are OCR'd page by page in parallel
+
+        Raises:
+            OCRQueueFullError: If no queue slot frees up within queue_timeout
+        """
+        if self._slots is None:
+            self._slots = asyncio.Semaphore(self.max_queue_depth)
+
+        self._stats["documents"] += 1
+        frames = await asyncio.to_thread(_count_frames, image_content)
+        pages = await asyncio.gather(*[
+            self._ocr_page(image_content, frame) for frame in range(frames)
+        ])
+        return "\n\f".join(page.strip("\n") for page in pages)
+
+    async def _ocr_page(self, image_content: bytes, frame: int) -> str:
+        """Run one page through the pool, holding a queue slot until it finishes"""
+        wait_start = time.perf_counter()
+        self._queued += 1
+        self._stats["peak_queue_depth"] = max(self._stats["peak_queue_depth"], self._queued + self._running)
+        try:
+            await asyncio.wait_for(self._slots.acquire(), timeout=self.queue_timeout)
+        except asyncio.TimeoutError:
+            self._stats["rejected_pages"] += 1
+            raise OCRQueueFullError(
+                f"OCR queue full ({self.max_queue_depth} pages pending, waited {self.queue_timeout:.0f}s)"
+            )
+        finally:
+            self._queued -= 1
+        self._queue_waits.append((time.perf_counter() - wait_start) * 1000)
+
+        self._running += 1
+        start = time.perf_counter()
+        try:
+            loop = asyncio.get_running_loop()
+            try:
+                text = await loop.run_in_executor(
+                    self.executor, _ocr_frame, image_content, frame, self.max_dimension, self.deskew
+                )
+            except BrokenProcessPool:
+                # A worker died (e.g. OOM on a huge page); start a fresh pool for later pages
+                self._restart_pool()
+                raise
+            self._stats["pages"] += 1
+            return text
+        except Exception:
+            self._stats["failed_pages"] += 1
+            raise
+        finally:
+            self._latencies.append((time.perf_counter() - start) * 1000)
+            self._running -= 1
+            self._slots.release()
+
+    def _restart_pool(self):
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+            self._stats["pool_restarts"] += 1
+            logger.warning("OCR worker pool broken, restarting")
+
+    def shutdown(self):
+        """Stop the worker processes"""
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get queue and latency statistics"""
+        latencies = sorted(self._latencies)
+        queue_waits = list(self._queue_waits)
+        return {
+            "workers": self.max_workers,
+            "max_queue_depth": self.max_queue_depth,
+            "queued": self._queued,
+            "running": self._running,
+            **self._stats,
+            "latency_ms": {
+                "avg": round(sum(latencies) / len(latencies), 1) if latencies else 0.0,
+                "p50": _percentile(latencies, 0.50),
+                "p95": _percentile(latencies, 0.95),
+                "max": round(latencies[-1], 1) if latencies else 0.0,
+            },
+            "avg_queue_wait_ms": round(sum(queue_waits) / len(queue_waits), 1) if queue_waits else 0.0,
+        }
+
+
+def _percentile(sorted_values: List[float], fraction: float) -> float:
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, int(round(fraction * (len(sorted_values) - 1))))
+    return round(sorted_values[index], 1)
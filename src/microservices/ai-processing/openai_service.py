@@ -492,12 +492,14 @@ Azure Service: Azure OpenAI Service
 """
 
 import asyncio
+import hashlib
 import json
 import logging
-from typing import Dict, Any, List, Optional, Union
+from typing import Dict, Any, List, Optional, Tuple, Union
 from datetime import datetime
 import numpy as np
-from openai import AzureOpenAI, OpenAI
+from openai import AsyncAzureOpenAI, AsyncOpenAI
+from openai.types.chat import ChatCompletion
 import os
 
 # Azure imports (optional)
@@ -517,6 +519,53 @@ except ImportError:
 from src.shared.config.settings import config_manager
 from src.shared.events.event_sourcing import DomainEvent, EventType, EventBus
 from src.shared.mocks.azure_mocks import MockOpenAI
+from src.shared.cache.batching import GetBatcher
+from src.shared.cache.llm_cache import LLMResponseCache
+from text_chunking import TextChunk, chunk_text, count_tokens, truncate_to_tokens
+
+# Shared connection pool (optional: needs httpx and the enhanced settings)
+try:
+    from src.shared.http import HTTPClientPool
+    HTTP_POOL_AVAILABLE = True
+except ImportError:
+    HTTP_POOL_AVAILABLE = False
+    HTTPClientPool = None
+
+# Dimension of text-embedding-ada-002 vectors (used for mock embeddings)
+EMBEDDING_DIMENSIONS = 1536
+
+
+def _parse_model_limits(spec: str) -> Dict[str, int]:
+    """Parse "model=limit,model=limit" into a dict"""
+    limits = {}
+    for item in spec.split(","):
+        if "=" in item:
+            model, limit = item.split("=", 1)
+            limits[model.strip()] = int(limit)
+    return limits
+
+
+class DocumentBudget:
+    """
+    LLM limits shared by every call made for one document
+    
+    calls caps the document's concurrent completion requests, chunk map calls
+    included. tokens caps the document text sent by all chunked operations
+    together: each of the `operations` (summary, entity extraction) maps at
+    most an equal share of it, and they share one chunk plan.
+    """
+    
+    def __init__(self, max_concurrent_calls: int, tokens: int, operations: int = 1):
+        self.calls = asyncio.Semaphore(max(1, max_concurrent_calls))
+        self.tokens = tokens
+        self.operations = max(1, operations)
+        self.plans: Dict[Tuple[str, str], Tuple[List[TextChunk], bool]] = {}
+    
+    @property
+    def operation_tokens(self) -> int:
+        """Tokens one chunked operation may map"""
+        return self.tokens // self.operations
+
 
 class OpenAIService:
     """Hybrid OpenAI service supporting Azure OpenAI, standard OpenAI, and local mocks"""
@@ -534,16 +583,22 @@ class OpenAIService:
         self.client = None
         self.client_type = None
         self.mock_client = MockOpenAI()
+        # Compatible endpoint for the standard client (e.g. a local stub server)
+        self.base_url = os.getenv("OPENAI_BASE_URL") or None
+        self.http_client = None
         
         # Try to initialize OpenAI clients in order of preference
         if not self.use_mock:
+            self.http_client = http_client = self._shared_http_client()
+            
             # Try Azure OpenAI first (if configured)
             if self.azure_endpoint and hasattr(self.config, 'openai_api_key') and self.config.openai_api_key:
                 try:
-                    self.client = AzureOpenAI(
+                    self.client = AsyncAzureOpenAI(
                         api_key=self.config.openai_api_key,
                         api_version="2024-02-15-preview",
-                        azure_endpoint=self.azure_endpoint
+                        azure_endpoint=self.azure_endpoint,
+                        http_client=http_client
                     )
                     self.client_type = "azure"
                     self.logger.info("Using Azure OpenAI")
@@ -551,9 +606,13 @@ class OpenAIService:
                     self.logger.warning(f"Azure OpenAI init failed: {e}")
             
             # Fall back to standard OpenAI if Azure not available
-            if not self.client and self.openai_key and self.openai_key.startswith('sk-'):
+            if not self.client and self.openai_key and (self.openai_key.startswith('sk-') or self.base_url):
                 try:
-                    self.client = OpenAI(api_key=self.openai_key)
+                    self.client = AsyncOpenAI(
+                        api_key=self.openai_key,
+                        base_url=self.base_url,
+                        http_client=http_client
+                    )
                     self.client_type = "openai"
                     self.logger.info("Using standard OpenAI API")
                 except Exception as e:
@@ -584,44 +643,261 @@ class OpenAIService:
             "embedding": "text-embedding-ada-002",
             "davinci": "text-davinci-003"
         }
+        
+        # Per-model concurrency caps, e.g. OPENAI_MODEL_CONCURRENCY="gpt-4=8,text-embedding-ada-002=4";
+        # models not listed share the OPENAI_MAX_CONCURRENCY default
+        self.default_model_concurrency = int(os.getenv("OPENAI_MAX_CONCURRENCY", "16"))
+        self.model_concurrency = _parse_model_limits(os.getenv("OPENAI_MODEL_CONCURRENCY", ""))
+        self._model_semaphores: Dict[str, asyncio.Semaphore] = {}
+        self.call_stats = {"chat_requests": 0, "embedding_requests": 0, "embedding_inputs": 0}
+        
+        # Low-temperature (deterministic) completions are served from cache when repeated
+        self.response_cache = LLMResponseCache()
+        
+        # Concurrent single-text generate_embeddings calls are coalesced into
+        # one multi-input embeddings request
+        self._embedding_batcher = GetBatcher(
+            self._embed_many,
+            window=float(os.getenv("OPENAI_EMBEDDING_BATCH_WINDOW_MS", "5")) / 1000,
+            max_batch_size=int(os.getenv("OPENAI_EMBEDDING_BATCH_SIZE", "16"))
+        )
+        
+        # Long documents: "map_reduce" processes every chunk in parallel and merges
+        # the results, "truncate" only sends the first chunk
+        self.long_document_mode = os.getenv("OPENAI_LONG_DOCUMENT_MODE", "map_reduce")
+        self.chunk_tokens = int(os.getenv("OPENAI_CHUNK_TOKENS", "3000"))
+        self.chunk_overlap_tokens = int(os.getenv("OPENAI_CHUNK_OVERLAP_TOKENS", "200"))
+        # Max document tokens mapped per document, split evenly between the
+        # chunked operations run on it; later chunks are skipped and one chunk
+        # of each share is kept back for the reduce step
+        self.document_token_budget = int(os.getenv("OPENAI_DOCUMENT_TOKEN_BUDGET", "60000"))
+        # Max concurrent LLM calls per document (bounds the chunk fan-out)
+        self.document_concurrency = int(os.getenv("OPENAI_DOCUMENT_CONCURRENCY", "4"))
     
-    async def generate_summary(self, text: str, max_length: int = 200) -> Dict[str, Any]:
-        """Generate document summary using GPT-4"""
+    def _shared_http_client(self):
+        """Platform HTTP connection pool (keep-alive, HTTP/2), or None for the SDK default"""
+        if not HTTP_POOL_AVAILABLE:
+            return None
         try:
-            prompt = f"""
+            return HTTPClientPool.get_client()
+        except Exception as e:
+            self.logger.warning(f"Shared HTTP client pool unavailable, OpenAI uses its own: {e}")
+            return None
+    
+    def document_budget(self, max_concurrent_calls: Optional[int] = None, operations: int = 1) -> DocumentBudget:
+        """Budget for the LLM calls of one document, shared by `operations` chunked operations"""
+        return DocumentBudget(
+            max_concurrent_calls or self.document_concurrency,
+            self.document_token_budget,
+            operations
+        )
+    
+    def _plan_chunks(self, text: str, model: str, budget: DocumentBudget) -> Tuple[List[TextChunk], bool]:
+        """
+        Split a document for map-reduce, capped by one operation's share of the budget
+        
+        Always returns at least one chunk (empty text gives one empty chunk).
+        The plan is computed once per document and reused by later operations.
+        
+        Returns:
+            (chunks to process, whether chunks were dropped for the budget)
+        """
+        key = (model, text)
+        if key not in budget.plans:
+            budget.plans[key] = self._select_chunks(text, model, budget.operation_tokens)
+        return budget.plans[key]
+    
+    def _select_chunks(self, text: str, model: str, token_budget: int) -> Tuple[List[TextChunk], bool]:
+        if self.long_document_mode != "map_reduce":
+            first_chunk = truncate_to_tokens(text, self.chunk_tokens, model)
+            return [TextChunk(0, first_chunk, count_tokens(first_chunk, model), 1, 1)], len(first_chunk) < len(text)
+        
+        chunks = chunk_text(text, self.chunk_tokens, self.chunk_overlap_tokens, model)
+        if not chunks:
+            return [TextChunk(0, text, count_tokens(text, model), 1, 1)], False
+        # Leave room for the reduce call
+        map_budget = token_budget - self.chunk_tokens
+        selected, used = [], 0
+        for chunk in chunks:
+            if selected and used + chunk.token_count > map_budget:
+                break
+            selected.append(chunk)
+            used += chunk.token_count
+        if len(selected) < len(chunks):
+            self.logger.warning(
+                f"Document exceeds its token budget ({token_budget} per operation); "
+                f"processing {len(selected)} of {len(chunks)} chunks"
+            )
+        return selected, len(selected) < len(chunks)
+    
+    def _model_slot(self, model: str) -> asyncio.Semaphore:
+        """Concurrency cap for a model"""
+        semaphore = self._model_semaphores.get(model)
+        if semaphore is None:
+            limit = self.model_concurrency.get(model, self.default_model_concurrency)
+            semaphore = self._model_semaphores[model] = asyncio.Semaphore(limit)
+        return semaphore
+    
+    async def generate_summary(self, text: str, max_length: int = 200,
+                               budget: Optional[DocumentBudget] = None) -> Dict[str, Any]:
+        """
+        Generate document summary using GPT-4
+        
+        Documents longer than one chunk are summarized chunk by chunk in
+        parallel (map) and the partial summaries are combined (reduce).
+        Pass the document's budget when other operations run on it too.
+        """
+        try:
+            model = self.models["gpt4"]
+            budget = budget or self.document_budget()
+            chunks, truncated = self._plan_chunks(text, model, budget)
+            
+            if len(chunks) == 1:
+                summary = await self._summarize_text(chunks[0].text, max_length, budget)
+            else:
+                partials = await asyncio.gather(*[
+                    self._summarize_text(
+                        chunk.text, max_length, budget,
+                        section=f"part {chunk.index + 1} of {len(chunks)}, pages {chunk.first_page}-{chunk.last_page}"
+                    )
+                    for chunk in chunks
+                ])
+                summary = await self._reduce_summaries(partials, max_length, budget)
+            
+            return {
+                "summary": summary,
+                "word_count": len(summary.split()),
+                "model_used": model,
+                "chunks": len(chunks),
+                "truncated": truncated,
+                "timestamp": datetime.utcnow().isoformat()
+            }
+            
+        except Exception as e:
+            self.logger.error(f"Error generating summary: {str(e)}")
+            raise
+    
+    async def _summarize_text(self, text: str, max_length: int, budget: Optional[DocumentBudget] = None,
+                              section: Optional[str] = None) -> str:
+        """One summarization call; section labels a chunk of a longer document"""
+        scope = f"This is {section} of a longer document. " if section else ""
+        prompt = f"""
             Please provide a comprehensive summary of the following document text.
-            Focus on key information, main topics, and important details.
+            {scope}Focus on key information, main topics, and important details.
             Keep the summary under {max_length} words.
             
             Document text:
-            {text[:4000]}  # Limit input to avoid token limits
+            {text}
             """
+        
+        response = await self._call_openai(
+            model=self.models["gpt4"],
+            messages=[
+                {"role": "system", "content": "You are an expert document analyst. Provide clear, concise summaries."},
+                {"role": "user", "content": prompt}
+            ],
+            max_tokens=max_length,
+            temperature=0.3,
+            budget=budget
+        )
+        return response.choices[0].message.content
+    
+    async def _reduce_summaries(self, partials: List[str], max_length: int,
+                                budget: Optional[DocumentBudget] = None) -> str:
+        """Combine partial summaries, in rounds if they don't fit in one call"""
+        if not partials:
+            return ""
+        model = self.models["gpt4"]
+        while len(partials) > 1:
+            # Group consecutive partials into chunk-sized batches
+            groups, current, current_tokens = [], [], 0
+            for partial in partials:
+                tokens = count_tokens(partial, model)
+                if current and current_tokens + tokens > self.chunk_tokens:
+                    groups.append(current)
+                    current, current_tokens = [], 0
+                current.append(partial)
+                current_tokens += tokens
+            groups.append(current)
             
-            response = await self._call_openai(
-                model=self.models["gpt4"],
-                messages=[
-                    {"role": "system", "content": "You are an expert document analyst. Provide clear, concise summaries."},
-                    {"role": "user", "content": prompt}
-                ],
-                max_tokens=max_length,
-                temperature=0.3
-            )
+            if len(groups) == len(partials):
+                # Partials too long to combine; keep only what fits
+                groups = [[truncate_to_tokens("\n\n".join(partials), self.chunk_tokens, model)]]
+            
+            partials = await asyncio.gather(*[
+                self._summarize_text(
+                    "\n\n".join(f"Section {i + 1}: {partial}" for i, partial in enumerate(group)),
+                    max_length,
+                    budget,
+                    section="a set of consecutive section summaries (combine them into one summary)"
+                )
+                for group in groups
+            ])
+        return partials[0]
+    
+    async def extract_entities(self, text: str, budget: Optional[DocumentBudget] = None) -> Dict[str, Any]:
+        """
+        Extract named entities from text using GPT-4
+        
+        Long documents are processed chunk by chunk in parallel and the entity
+        sets merged (deduplicated per type, case-insensitively). Pass the
+        document's budget when other operations run on it too.
+        """
+        try:
+            model = self.models["gpt4"]
+            budget = budget or self.document_budget()
+            chunks, truncated = self._plan_chunks(text, model, budget)
             
-            summary = response.choices[0].message.content
+            self.logger.info(f"Calling OpenAI for entity extraction (text length: {len(text)}, chunks: {len(chunks)})")
+            
+            chunk_results = await asyncio.gather(*[
+                self._extract_entities_text(chunk.text, budget) for chunk in chunks
+            ], return_exceptions=True)
+            chunk_entities = [result for result in chunk_results if not isinstance(result, BaseException)]
+            if not chunk_entities:
+                raise chunk_results[0]
+            entities = self._merge_entities(chunk_entities)
             
             return {
-                "summary": summary,
-                "word_count": len(summary.split()),
-                "model_used": self.models["gpt4"],
+                "entities": entities,
+                "entity_count": sum(len(v) if isinstance(v, list) else 1 for v in entities.values()),
+                "model_used": model,
+                "chunks": len(chunks),
+                "truncated": truncated,
                 "timestamp": datetime.utcnow().isoformat()
             }
             
         except Exception as e:
-            self.logger.error(f"Error generating summary: {str(e)}")
-            raise
+            self.logger.error(f"Error extracting entities: {str(e)}")
+            # Return empty result instead of failing
+            return {
+                "entities": {},
+                "entity_count": 0,
+                "model_used": self.models["gpt4"],
+                "timestamp": datetime.utcnow().isoformat(),
+                "error": str(e)
+            }
     
-    async def extract_entities(self, text: str) -> Dict[str, Any]:
-        """Extract named entities from text using GPT-4"""
+    @staticmethod
+    def _merge_entities(chunk_entities: List[Dict[str, Any]]) -> Dict[str, Any]:
+        """Union entity lists per type, keeping first-seen spelling and order"""
+        merged: Dict[str, List[Any]] = {}
+        seen: Dict[str, set] = {}
+        for entities in chunk_entities:
+            for entity_type, values in entities.items():
+                if not isinstance(values, list):
+                    values = [values]
+                bucket = merged.setdefault(entity_type, [])
+                keys = seen.setdefault(entity_type, set())
+                for value in values:
+                    key = value.strip().lower() if isinstance(value, str) else json.dumps(value, sort_keys=True, default=str)
+                    if key not in keys:
+                        keys.add(key)
+                        bucket.append(value)
+        return merged
+    
+    async def _extract_entities_text(self, text: str, budget: Optional[DocumentBudget] = None) -> Dict[str, Any]:
+        """One entity extraction call; returns {} if the response isn't valid JSON"""
         try:
             prompt = f"""
             Extract the following types of entities from the text:
@@ -638,11 +914,9 @@ class OpenAIService:
             Example: {{"ORGANIZATION": ["Microsoft"], "MONEY": ["$1000"], "DATE": ["2024-01-15"]}}
             
             Text:
-            {text[:3000]}
+            {text}
             """
             
-            self.logger.info(f"Calling OpenAI for entity extraction (text length: {len(text)})")
-            
             response = await self._call_openai(
                 model=self.models["gpt4"],
                 messages=[
@@ -650,7 +924,8 @@ class OpenAIService:
                     {"role": "user", "content": prompt}
                 ],
                 max_tokens=1000,
-                temperature=0.1
+                temperature=0.1,
+                budget=budget
             )
             
             self.logger.info(f"OpenAI response received: {type(response)}")
@@ -676,23 +951,111 @@ class OpenAIService:
                     self.logger.warning(f"Failed to parse entities JSON: {je}. Response: {entities_json[:200]}")
                     entities = {}
             
-            return {
+            return entities if isinstance(entities, dict) else {}
+            
+        except Exception as e:
+            self.logger.error(f"Error extracting entities from chunk: {str(e)}")
+            raise
+    
+    async def analyze_document_fused(self, text: str, max_summary_length: int = 200,
+                                     budget: Optional[DocumentBudget] = None) -> Dict[str, Any]:
+        """
+        Extract entities, summarize and classify in a single structured-output call
+        
+        Returns the same shapes as extract_entities, generate_summary and
+        classify_document under "entities", "summary" and "classification".
+        If the response is not valid JSON, or the document is longer than one
+        chunk, falls back to the three separate calls (which map-reduce long text).
+        All calls, fallback included, run within the document's budget.
+        """
+        model = self.models["gpt4"]
+        budget = budget or self.document_budget(operations=2)
+        if self.long_document_mode == "map_reduce" and count_tokens(text, model) > self.chunk_tokens:
+            return await self._analyze_separately(text, max_summary_length, budget)
+        
+        prompt = f"""
+        Analyze the document text below and return ONE JSON object with exactly these keys:
+        
+        "entities": object mapping entity type to a list of entities found. Types:
+            PERSON, ORGANIZATION, LOCATION, DATE, MONEY, EMAIL, PHONE, URL
+        "summary": comprehensive summary of key information, main topics and
+            important details, under {max_summary_length} words
+        "classification": object with
+            "category": one of INVOICE, CONTRACT, REPORT, CORRESPONDENCE, TECHNICAL, LEGAL, MEDICAL, OTHER
+            "confidence": score between 0 and 1
+            "reasoning": brief explanation of the classification
+        
+        Document text:
+        {truncate_to_tokens(text, self.chunk_tokens, model)}
+        """
+        
+        response = await self._call_openai(
+            model=self.models["gpt4"],
+            messages=[
+                {"role": "system", "content": "You are an expert document analyst. Return ONLY valid JSON, no markdown, no explanations."},
+                {"role": "user", "content": prompt}
+            ],
+            max_tokens=1000 + max_summary_length * 2,
+            temperature=0.1,
+            budget=budget
+        )
+        
+        try:
+            content = response.choices[0].message.content.strip()
+            if content.startswith("```"):
+                content = content.split("```")[1]
+                if content.startswith("json"):
+                    content = content[4:]
+                content = content.strip()
+            fused = json.loads(content)
+            entities = fused["entities"]
+            summary = fused["summary"]
+            classification = fused["classification"]
+            if not isinstance(entities, dict) or not isinstance(summary, str) or not isinstance(classification, dict):
+                raise ValueError("unexpected field types")
+        except (AttributeError, IndexError, KeyError, TypeError, ValueError) as e:
+            self.logger.warning(f"Fused analysis returned unusable output ({str(e)}), using separate calls")
+            return await self._analyze_separately(text, max_summary_length, budget)
+        
+        timestamp = datetime.utcnow().isoformat()
+        return {
+            "entities": {
                 "entities": entities,
                 "entity_count": sum(len(v) if isinstance(v, list) else 1 for v in entities.values()),
                 "model_used": self.models["gpt4"],
-                "timestamp": datetime.utcnow().isoformat()
-            }
-            
-        except Exception as e:
-            self.logger.error(f"Error extracting entities: {str(e)}")
-            # Return empty result instead of failing
-            return {
-                "entities": {},
-                "entity_count": 0,
+                "timestamp": timestamp
+            },
+            "summary": {
+                "summary": summary,
+                "word_count": len(summary.split()),
                 "model_used": self.models["gpt4"],
-                "timestamp": datetime.utcnow().isoformat(),
-                "error": str(e)
-            }
+                "timestamp": timestamp
+            },
+            "classification": {
+                "document_type": classification.get("category", "invoice"),
+                "confidence": classification.get("confidence", 0.5),
+                "reasoning": classification.get("reasoning", ""),
+                "model_used": self.models["gpt4"],
+                "timestamp": timestamp
+            },
+            "fused": True
+        }
+    
+    async def _analyze_separately(self, text: str, max_summary_length: int,
+                                  budget: Optional[DocumentBudget] = None) -> Dict[str, Any]:
+        """Entities, summary and classification as three concurrent calls"""
+        budget = budget or self.document_budget(operations=2)
+        entities_result, summary_result, classification_result = await asyncio.gather(
+            self.extract_entities(text, budget),
+            self.generate_summary(text, max_summary_length, budget),
+            self.classify_document(text, budget)
+        )
+        return {
+            "entities": entities_result,
+            "summary": summary_result,
+            "classification": classification_result,
+            "fused": False
+        }
     
     async def answer_question(self, question: str, context: str = None, 
                             document_id: str = None) -> Dict[str, Any]:
@@ -738,7 +1101,7 @@ class OpenAIService:
             self.logger.error(f"Error answering question: {str(e)}")
             raise
     
-    async def classify_document(self, text: str) -> Dict[str, Any]:
+    async def classify_document(self, text: str, budget: Optional[DocumentBudget] = None) -> Dict[str, Any]:
         """Classify document type using GPT-4"""
         try:
             prompt = f"""
@@ -772,7 +1135,8 @@ class OpenAIService:
                     {"role": "user", "content": prompt}
                 ],
                 max_tokens=200,
-                temperature=0.1
+                temperature=0.1,
+                budget=budget
             )
             
             if not response or not hasattr(response, 'choices') or not response.choices:
@@ -873,20 +1237,55 @@ class OpenAIService:
             raise
     
     async def generate_embeddings(self, text: str) -> List[float]:
-        """Generate embeddings for text using Azure OpenAI"""
+        """Generate embeddings for text using Azure OpenAI (batched with concurrent calls)"""
         try:
-            response = await self._call_openai(
-                model=self.models["embedding"],
-                input=text,
-                encoding_format="float"
-            )
+            return await self._embedding_batcher.load(text)
             
-            return response.data[0].embedding
+        except Exception as e:
+            self.logger.error(f"Error generating embeddings: {str(e)}")
+            raise
+    
+    async def generate_embeddings_batch(self, texts: List[str]) -> List[List[float]]:
+        """Generate embeddings for many texts, in requests of up to the embedding batch size"""
+        try:
+            batch_size = self._embedding_batcher.max_batch_size
+            unique_texts = list(dict.fromkeys(texts))
+            batches = await asyncio.gather(*[
+                self._embed_many(unique_texts[i:i + batch_size])
+                for i in range(0, len(unique_texts), batch_size)
+            ])
+            embeddings = {}
+            for batch in batches:
+                embeddings.update(batch)
+            return [embeddings[text] for text in texts]
             
         except Exception as e:
             self.logger.error(f"Error generating embeddings: {str(e)}")
             raise
     
+    async def _embed_many(self, texts: List[str]) -> Dict[str, List[float]]:
+        """One embeddings request for several inputs"""
+        if not self.client:
+            return {text: self._mock_embedding(text) for text in texts}
+        
+        model = self.models["embedding"]
+        async with self._model_slot(model):
+            response = await self.client.embeddings.create(
+                model=model,
+                input=texts,
+                encoding_format="float"
+            )
+        self.call_stats["embedding_requests"] += 1
+        self.call_stats["embedding_inputs"] += len(texts)
+        return {texts[item.index]: item.embedding for item in response.data}
+    
+    @staticmethod
+    def _mock_embedding(text: str) -> List[float]:
+        """Deterministic unit vector derived from the text (mock mode)"""
+        seed = int.from_bytes(hashlib.sha256(text.encode("utf-8")).digest()[:8], "big")
+        vector = np.random.default_rng(seed).standard_normal(EMBEDDING_DIMENSIONS)
+        return (vector / np.linalg.norm(vector)).tolist()
+    
     async def semantic_search(self, query: str, top_k: int = 5) -> List[Dict[str, Any]]:
         """Perform semantic search using vector embeddings"""
         try:
@@ -941,26 +1340,26 @@ class OpenAIService:
             self.logger.error(f"Error searching relevant content: {str(e)}")
             return ""
     
-    async def _call_openai(self, model: str, **kwargs) -> Any:
-        """Make async call to OpenAI (Azure, standard, or mock)"""
+    async def _call_openai(self, model: str, budget: Optional[DocumentBudget] = None, **kwargs) -> Any:
+        """Make async call to OpenAI (Azure, standard, or mock), within the document's budget if given"""
+        if budget is not None:
+            async with budget.calls:
+                return await self._call_openai(model, **kwargs)
         try:
             # If using mock
             if self.client_type == "mock":
                 messages = kwargs.get('messages', [])
                 return self.mock_client.chat_completion(messages, model)
             
-            # If using real OpenAI (Azure or standard)
+            # If using real OpenAI (Azure or standard), through the response cache
             if self.client:
-                # Run the OpenAI call in a thread pool to avoid blocking
-                loop = asyncio.get_event_loop()
-                response = await loop.run_in_executor(
-                    None, 
-                    lambda: self.client.chat.completions.create(
-                        model=model,
-                        **kwargs
-                    )
+                return await self.response_cache.get_or_call(
+                    model,
+                    kwargs,
+                    lambda: self._request_completion(model, kwargs),
+                    serialize=lambda response: response.model_dump(),
+                    deserialize=ChatCompletion.model_validate
                 )
-                return response
             
             # Fallback to mock if client not initialized
             self.logger.warning("No OpenAI client available, using mock")
@@ -973,6 +1372,30 @@ class OpenAIService:
             messages = kwargs.get('messages', [])
             return self.mock_client.chat_completion(messages, model)
     
+    async def _request_completion(self, model: str, params: Dict[str, Any]) -> Any:
+        """Chat completion on the native async client (shared connection pool), capped per model"""
+        async with self._model_slot(model):
+            response = await self.client.chat.completions.create(
+                model=model,
+                **params
+            )
+        self.call_stats["chat_requests"] += 1
+        return response
+    
+    def get_client_stats(self) -> Dict[str, Any]:
+        """Get OpenAI client, concurrency and embedding batching statistics"""
+        return {
+            "client_type": self.client_type,
+            "shared_connection_pool": self.http_client is not None,
+            **self.call_stats,
+            "model_concurrency": {
+                model: self.model_concurrency.get(model, self.default_model_concurrency)
+                for model in self._model_semaphores
+            },
+            "embedding_batching": self._embedding_batcher.get_stats(),
+            "response_cache": self.response_cache.get_stats()
+        }
+    
     async def process_document_batch(self, documents: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
         """Process multiple documents in batch"""
         try:
@@ -1013,10 +1436,11 @@ class OpenAIService:
             text = document.get("content", "")
             
             # Process document with multiple AI services
+            budget = self.document_budget(operations=2)
             tasks = [
-                self.generate_summary(text),
-                self.extract_entities(text),
-                self.classify_document(text),
+                self.generate_summary(text, budget=budget),
+                self.extract_entities(text, budget),
+                self.classify_document(text, budget),
                 self.analyze_sentiment(text)
             ]
             
@@ -0,0 +1,157 @@
+"""
+Text Chunking
+Token-aware splitting of long documents for map-reduce LLM processing
+
+Documents are split on page breaks (form feeds, as produced by the OCR
+pool), then paragraphs, then sentences; only units larger than a chunk are
+cut mid-sentence. Units are packed into chunks of at most max_tokens, and
+each chunk repeats the trailing units of the previous one (up to
+overlap_tokens) so entities and sentences spanning a boundary are seen whole.
+
+Tokens are counted with tiktoken when installed, otherwise estimated at
+four characters per token.
+"""
+
+import math
+import re
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import List, Optional, Tuple
+
+try:
+    import tiktoken
+    TIKTOKEN_AVAILABLE = True
+except ImportError:
+    TIKTOKEN_AVAILABLE = False
+
+CHARS_PER_TOKEN = 4
+DEFAULT_ENCODING = "cl100k_base"
+
+_PAGE_BREAK = re.compile(r"\f")
+_PARAGRAPH_BREAK = re.compile(r"\n\s*\n")
+_SENTENCE_END = re.compile(r"(?<=[.!?])\s+")
+
+
+@dataclass
+class TextChunk:
+    """A slice of a document sized for one LLM call"""
+    index: int
+    text: str
+    token_count: int
+    first_page: int
+    last_page: int
+
+
+@lru_cache(maxsize=8)
+def _encoding(model: Optional[str]):
+    if model:
+        try:
+            return tiktoken.encoding_for_model(model)
+        except KeyError:
+            pass
+    return tiktoken.get_encoding(DEFAULT_ENCODING)
+
+
+def count_tokens(text: str, model: Optional[str] = None) -> int:
+    """Number of tokens in text for the model's tokenizer"""
+    if not text:
+        return 0
+    if TIKTOKEN_AVAILABLE:
+        return len(_encoding(model).encode(text, disallowed_special=()))
+    return math.ceil(len(text) / CHARS_PER_TOKEN)
+
+
+def truncate_to_tokens(text: str, max_tokens: int, model: Optional[str] = None) -> str:
+    """Cut text to at most max_tokens tokens"""
+    if TIKTOKEN_AVAILABLE:
+        encoding = _encoding(model)
+        tokens = encoding.encode(text, disallowed_special=())
+        return text if len(tokens) <= max_tokens else encoding.decode(tokens[:max_tokens])
+    return text[:max_tokens * CHARS_PER_TOKEN]
+
+
+def _split_oversized(text: str, max_tokens: int, model: Optional[str]) -> List[str]:
+    """Split a unit with no usable boundaries into max_tokens pieces"""
+    if TIKTOKEN_AVAILABLE:
+        encoding = _encoding(model)
+        tokens = encoding.encode(text, disallowed_special=())
+        return [encoding.decode(tokens[i:i + max_tokens]) for i in range(0, len(tokens), max_tokens)]
+    size = max_tokens * CHARS_PER_TOKEN
+    return [text[i:i + size] for i in range(0, len(text), size)]
+
+
+def _units(text: str, max_tokens: int, model: Optional[str]) -> List[Tuple[str, int, int]]:
+    """Break text into (unit, tokens, page) units that each fit in a chunk"""
+    units = []
+    for page, page_text in enumerate(_PAGE_BREAK.split(text), start=1):
+        for paragraph in _PARAGRAPH_BREAK.split(page_text):
+            paragraph = paragraph.strip()
+            if not paragraph:
+                continue
+            tokens = count_tokens(paragraph, model)
+            if tokens <= max_tokens:
+                units.append((paragraph, tokens, page))
+                continue
+            for sentence in _SENTENCE_END.split(paragraph):
+                tokens = count_tokens(sentence, model)
+                if tokens <= max_tokens:
+                    units.append((sentence, tokens, page))
+                else:
+                    for piece in _split_oversized(sentence, max_tokens, model):
+                        units.append((piece, count_tokens(piece, model), page))
+    return units
+
+
+def chunk_text(
+    text: str,
+    max_tokens: int = 3000,
+    overlap_tokens: int = 200,
+    model: Optional[str] = None
+) -> List[TextChunk]:
+    """
+    Split text into overlapping, boundary-aligned chunks
+
+    Args:
+        text: Document text (pages separated by form feeds)
+        max_tokens: Maximum tokens per chunk
+        overlap_tokens: Tokens of trailing context repeated at the start of the next chunk
+        model: Model whose tokenizer to count with
+
+    Returns:
+        Chunks in document order; a single chunk if the text fits
+    """
+    units = _units(text, max_tokens, model)
+    chunks: List[TextChunk] = []
+    current: List[Tuple[str, int, int]] = []
+    current_tokens = 0
+    # Units at the start of `current` that were carried over as overlap
+    carried = 0
+
+    def emit():
+        chunks.append(TextChunk(
+            index=len(chunks),
+            text="\n\n".join(unit[0] for unit in current),
+            token_count=current_tokens,
+            first_page=current[0][2],
+            last_page=current[-1][2]
+        ))
+
+    for unit in units:
+        # Prefer to end a reasonably full chunk at a page boundary
+        page_break = current and unit[2] != current[-1][2] and current_tokens >= max_tokens // 2
+        if current and len(current) > carried and (current_tokens + unit[1] > max_tokens or page_break):
+            emit()
+            overlap: List[Tuple[str, int, int]] = []
+            overlap_size = 0
+            for previous in reversed(current):
+                if overlap_size + previous[1] > overlap_tokens or overlap_size + previous[1] + unit[1] > max_tokens:
+                    break
+                overlap.insert(0, previous)
+                overlap_size += previous[1]
+            current, current_tokens, carried = overlap, overlap_size, len(overlap)
+        current.append(unit)
+        current_tokens += unit[1]
+
+    if current and len(current) > carried:
+        emit()
+    return chunks
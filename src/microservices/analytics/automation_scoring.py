@@ -727,15 +727,23 @@ class AutomationScoringEngine:
     ) -> AutomationMetrics:
         """
         Calculate overall automation metrics for a time period
-        Results are cached to reduce database load
+        Results are cached to reduce database load; concurrent misses share one
+        aggregation and an expired entry keeps being served while it is refreshed
         """
-        # Try to get from cache first
         cache_key = f"automation_metrics:{time_range}"
-        cached = await cache_service.get(cache_key)
-        if cached:
-            logger.info(f"Returning cached automation metrics for {time_range}")
-            return AutomationMetrics(**cached)
-        
+        cache_ttl = self._get_cache_ttl(time_range)
+        cached = await cache_service.get_or_set(
+            cache_key,
+            lambda: self._aggregate_automation_metrics(time_range),
+            ttl=cache_ttl,
+            stale_ttl=cache_ttl,
+            # Empty windows are re-checked after a minute, not the full TTL
+            ttl_for=lambda metrics: 60 if not metrics.get("total_processed") else None
+        )
+        return AutomationMetrics(**cached)
+    
+    async def _aggregate_automation_metrics(self, time_range: str) -> Dict[str, Any]:
+        """Aggregate automation metrics from the database (cache-miss path)"""
         try:
             # Parse time range
             now = datetime.utcnow()
@@ -753,21 +761,43 @@ class AutomationScoringEngine:
             # Query automation scores from database
             query = """
                 SELECT 
-                    document_id,
                     confidence_score,
                     completeness_score,
                     validation_pass,
                     automation_score,
-                    requires_review,
-                    created_at
+                    requires_review
                 FROM automation_scores
                 WHERE created_at >= ?
-                ORDER BY created_at DESC
             """
             
-            results = self.sql_service.execute_query(query, (start_time,))
+            # Aggregate batch by batch so 30-day windows run in bounded memory
+            total_processed = 0
+            requires_review = 0
+            manual_intervention = 0
+            confidence_sum = 0.0
+            completeness_sum = 0.0
+            # Averages skip NULL scores, as DataFrame.mean() does
+            confidence_count = 0
+            completeness_count = 0
+            validation_passed = 0
+            
+            async for df in self.sql_service.stream_query_async(
+                query, (start_time,), output="dataframe"
+            ):
+                review_flags = df['requires_review'].fillna(False).astype(bool)
+                total_processed += len(df)
+                requires_review += int(review_flags.sum())
+                
+                # Manual intervention is when automation score < threshold
+                manual_intervention += int((df['automation_score'] < self.manual_intervention_threshold).sum())
+                
+                confidence_sum += float(df['confidence_score'].sum())
+                confidence_count += int(df['confidence_score'].count())
+                completeness_sum += float(df['completeness_score'].sum())
+                completeness_count += int(df['completeness_score'].count())
+                validation_passed += int(df['validation_pass'].fillna(False).astype(bool).sum())
             
-            if not results:
+            if not total_processed:
                 metrics = AutomationMetrics(
                     automation_rate=0.0,
                     total_processed=0,
@@ -780,25 +810,15 @@ class AutomationScoringEngine:
                     time_range=time_range,
                     timestamp=now
                 )
-                # Cache empty result for shorter time
-                await cache_service.set(cache_key, metrics.dict(), ttl=60)
-                return metrics
-            
-            # Convert to DataFrame for analysis
-            df = pd.DataFrame(results)
+                return metrics.dict()
             
             # Calculate metrics
-            total_processed = len(df)
-            fully_automated = len(df[~df['requires_review']])
-            requires_review = len(df[df['requires_review']])
-            
-            # Manual intervention is when automation score < threshold
-            manual_intervention = len(df[df['automation_score'] < self.manual_intervention_threshold])
+            fully_automated = total_processed - requires_review
             
             # Calculate averages
-            average_confidence = df['confidence_score'].mean()
-            average_completeness = df['completeness_score'].mean()
-            validation_pass_rate = (df['validation_pass'].sum() / total_processed) * 100
+            average_confidence = confidence_sum / confidence_count if confidence_count else 0.0
+            average_completeness = completeness_sum / completeness_count if completeness_count else 0.0
+            validation_pass_rate = (validation_passed / total_processed) * 100
             
             # Calculate automation rate
             automation_rate = (fully_automated / total_processed) * 100
@@ -816,12 +836,8 @@ class AutomationScoringEngine:
                 timestamp=now
             )
             
-            # Cache result with TTL based on time range
-            cache_ttl = self._get_cache_ttl(time_range)
-            await cache_service.set(cache_key, metrics.dict(), ttl=cache_ttl)
-            logger.info(f"Cached automation metrics for {time_range} (TTL: {cache_ttl}s)")
-            
-            return metrics
+            logger.info(f"Aggregated automation metrics for {time_range}")
+            return metrics.dict()
             
         except Exception as e:
             logger.error(f"Error calculating automation metrics: {str(e)}")
@@ -890,9 +906,7 @@ class AutomationScoringEngine:
         """Invalidate all automation metrics cache keys"""
         try:
             time_ranges = ["1h", "24h", "7d", "30d"]
-            for time_range in time_ranges:
-                cache_key = f"automation_metrics:{time_range}"
-                await cache_service.delete(cache_key)
+            await cache_service.mdelete([f"automation_metrics:{time_range}" for time_range in time_ranges])
             logger.info("Invalidated automation metrics cache")
         except Exception as e:
             logger.warning(f"Error invalidating cache: {str(e)}")
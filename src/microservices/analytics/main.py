@@ -546,6 +546,7 @@ from src.shared.events.event_sourcing import EventBus
 from src.shared.storage.data_lake_service import DataLakeService
 from src.shared.storage.sql_service import SQLService
 from src.shared.cache.redis_cache import cache_service, cache_result, cache_invalidate, CacheKeys
+from src.shared.cache.llm_cache import get_llm_cache_savings
 # PowerBI service not available in dev mode
 powerbi_service = None
 from src.shared.monitoring.advanced_monitoring import monitoring_service
@@ -2021,6 +2022,9 @@ async def get_cost_savings(user_id: str = Depends(get_current_user)):
         if_all_manual_cost = documents_processed * manual_cost_per_doc
         savings = if_all_manual_cost - current_cost
         
+        # Repeated deterministic LLM requests served from the response cache
+        llm_cache = await get_llm_cache_savings()
+        
         return {
             "total_savings": round(savings, 2),
             "monthly_savings": round(savings, 2),
@@ -2033,7 +2037,8 @@ async def get_cost_savings(user_id: str = Depends(get_current_user)):
                 "manual_cost": round(manual_docs * manual_cost_per_doc, 2),
                 "total_cost": round(current_cost, 2),
                 "savings_per_automated_doc": round(manual_cost_per_doc - automated_cost_per_doc, 2)
-            }
+            },
+            "llm_cache": llm_cache
         }
     except Exception as e:
         logger.error(f"Error calculating cost savings: {str(e)}")
@@ -2049,6 +2054,15 @@ async def get_cost_savings(user_id: str = Depends(get_current_user)):
                 "manual_cost": 0.0,
                 "total_cost": 0.0,
                 "savings_per_automated_doc": 0.0
+            },
+            "llm_cache": {
+                "hits": 0,
+                "misses": 0,
+                "bypassed": 0,
+                "hit_rate": 0.0,
+                "tokens_saved": 0,
+                "cost_saved_usd": 0.0,
+                "latency_saved_seconds": 0.0
             }
         }
 
@@ -5,11 +5,13 @@ Comprehensive data transformation and loading workflows
 
 import asyncio
 import logging
+import os
+import time
 import pandas as pd
 import numpy as np
 from typing import Dict, Any, List, Optional, Tuple
 from datetime import datetime, timedelta
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 from enum import Enum
 import json
 from fastapi import FastAPI, HTTPException, Depends, BackgroundTasks
@@ -18,7 +20,8 @@ from pydantic import BaseModel, Field
 from src.shared.config.settings import config_manager
 from src.shared.storage.sql_service import SQLService
 from src.shared.storage.data_lake_service import DataLakeService
-from src.shared.cache.redis_cache import cache_service
+from src.shared.cache.redis_cache import cache_service, CacheKeys
+from sql_expressions import AggregatePlan, EnrichPlan, ExpressionError, PushdownUnsupported
 
 class PipelineStatus(Enum):
     """ETL Pipeline status"""
@@ -48,6 +51,11 @@ class PipelineStep:
     transformation_config: Dict[str, Any]
     dependencies: List[str] = None
     enabled: bool = True
+    # Incremental extraction: only rows with watermark_column above the highest
+    # value loaded by the previous execution are read
+    watermark_column: Optional[str] = None
+    # Load by insert-or-update on these columns instead of plain inserts
+    merge_keys: Optional[List[str]] = None
 
 @dataclass
 class PipelineExecution:
@@ -61,10 +69,41 @@ class PipelineExecution:
     records_failed: int = 0
     error_message: Optional[str] = None
     execution_log: List[str] = None
+    # step_id -> pending, running, completed, skipped or failed
+    step_status: Dict[str, str] = field(default_factory=dict)
+    # step_id -> start/finish offsets (seconds from execution start), duration, records,
+    # rows_per_second and peak_memory_mb
+    step_timings: Dict[str, Dict[str, Any]] = field(default_factory=dict)
+    # Steps restored from the checkpoint of a failed run instead of re-executed
+    resumed_steps: List[str] = field(default_factory=list)
+    # Longest dependency chain by step duration; bounds the pipeline's wall time
+    critical_path: List[str] = field(default_factory=list)
+    critical_path_seconds: float = 0.0
+
+@dataclass
+class CompiledStep:
+    """Source query and parsed expressions of a step, built once per configuration"""
+    source_query: str
+    # EnrichPlan or AggregatePlan for ENRICH / AGGREGATE steps
+    expressions: Optional[Any] = None
+    # Expressions were moved into source_query and run in the database
+    pushed_down: bool = False
+    # Cache key of the running min/max of an incremental NORMALIZE step
+    normalization_stats_key: Optional[str] = None
+    dialect: str = "mssql"
 
 class ETLPipeline:
     """Advanced ETL/ELT pipeline processor"""
     
+    # Row-wise transformations that give the same result batch by batch
+    STREAMING_TRANSFORMATIONS = (
+        TransformationType.CLEAN,
+        TransformationType.ENRICH,
+        TransformationType.VALIDATE,
+    )
+    
+    NORMALIZATION_METHODS = ("min_max", "z_score", "robust")
+    
     def __init__(self):
         self.config = config_manager.get_azure_config()
         self.sql_service = SQLService(self.config.sql_connection_string)
@@ -75,6 +114,21 @@ class ETLPipeline:
         self.pipelines = {}
         self.executions = {}
         
+        # Independent steps run concurrently up to this limit
+        self.max_parallel_steps = int(os.getenv("ETL_MAX_PARALLEL_STEPS", "4"))
+        # Completed steps are checkpointed so a failed execution can resume
+        self.checkpoint_ttl = int(os.getenv("ETL_CHECKPOINT_TTL", "604800"))
+        # State carried between executions (watermarks, running normalization statistics)
+        self.state_ttl = int(os.getenv("ETL_STATE_TTL", "7776000"))
+        # Steps read, transform and load fetch_size rows at a time
+        self.streaming_enabled = os.getenv("ETL_STREAMING", "true").lower() == "true"
+        self.fetch_size = int(os.getenv("ETL_FETCH_SIZE", "5000"))
+        # Row data a step may hold at once before a warning is logged
+        self.step_memory_limit_mb = float(os.getenv("ETL_STEP_MEMORY_LIMIT_MB", "512"))
+        # Compute ENRICH/AGGREGATE expressions in the source query instead of pandas
+        self.expression_pushdown = os.getenv("ETL_EXPRESSION_PUSHDOWN", "false").lower() == "true"
+        self._compiled_steps: Dict[Tuple[str, str], Tuple[str, CompiledStep]] = {}
+        
         # Initialize default pipelines
         self._initialize_default_pipelines()
     
@@ -96,7 +150,9 @@ class ETLPipeline:
                         "file_size": "int64",
                         "created_at": "datetime64[ns]"
                     }
-                }
+                },
+                watermark_column="created_at",
+                merge_keys=["document_id"]
             ),
             PipelineStep(
                 step_id="enrich_documents",
@@ -111,7 +167,9 @@ class ETLPipeline:
                         "size_category": "CASE WHEN file_size < 1024000 THEN 'small' WHEN file_size < 10485760 THEN 'medium' ELSE 'large' END"
                     }
                 },
-                dependencies=["extract_documents"]
+                dependencies=["extract_documents"],
+                watermark_column="created_at",
+                merge_keys=["document_id"]
             ),
             PipelineStep(
                 step_id="aggregate_documents",
@@ -147,7 +205,9 @@ class ETLPipeline:
                         "metric_value": "float64",
                         "metric_timestamp": "datetime64[ns]"
                     }
-                }
+                },
+                watermark_column="metric_timestamp",
+                merge_keys=["id"]
             ),
             PipelineStep(
                 step_id="normalize_metrics",
@@ -213,13 +273,24 @@ class ETLPipeline:
                         "is_recent_user": "CASE WHEN DATEDIFF(day, created_at, GETDATE()) < 30 THEN 1 ELSE 0 END"
                     }
                 },
-                dependencies=["extract_user_data"]
+                dependencies=["extract_user_data"],
+                # No watermark: document_count and the GETDATE() columns change
+                # without updated_at moving, so every user is re-read and upserted
+                merge_keys=["id"]
             )
         ]
     
     async def execute_pipeline(self, pipeline_name: str, 
-                             execution_id: Optional[str] = None) -> PipelineExecution:
-        """Execute an ETL pipeline"""
+                             execution_id: Optional[str] = None,
+                             resume: bool = False) -> PipelineExecution:
+        """
+        Execute an ETL pipeline
+        
+        Steps run in dependency order; steps whose dependencies are all done
+        run concurrently (up to ETL_MAX_PARALLEL_STEPS). With resume=True the
+        steps checkpointed as completed by an earlier run of execution_id are
+        not executed again.
+        """
         if pipeline_name not in self.pipelines:
             raise ValueError(f"Pipeline '{pipeline_name}' not found")
         
@@ -235,27 +306,34 @@ class ETLPipeline:
         
         self.executions[execution_id] = execution
         
+        # Get pipeline steps
+        steps = self.pipelines[pipeline_name]
+        
         try:
             self.logger.info(f"Starting pipeline execution: {execution_id}")
             execution.execution_log.append(f"Pipeline {pipeline_name} started at {execution.start_time}")
             
-            # Get pipeline steps
-            steps = self.pipelines[pipeline_name]
+            order = self._plan_steps(steps)
+            # A bad expression fails the execution before any step runs
+            for step in steps:
+                self._compile_step(pipeline_name, step)
+            for step_id in order:
+                execution.step_status[step_id] = "pending"
+            
+            if resume:
+                checkpoint = await self.load_checkpoint(execution_id)
+                if checkpoint.get("pipeline_name") not in (None, pipeline_name):
+                    raise ValueError(f"Execution {execution_id} belongs to pipeline {checkpoint['pipeline_name']}")
+                for step_id in checkpoint.get("completed_steps", []):
+                    if step_id in execution.step_status:
+                        execution.step_status[step_id] = "completed"
+                        execution.resumed_steps.append(step_id)
+                execution.execution_log.append(
+                    f"Resuming execution: {len(execution.resumed_steps)} of {len(order)} steps already completed"
+                )
             
             # Execute steps in dependency order
-            for step in steps:
-                if not step.enabled:
-                    execution.execution_log.append(f"Skipping disabled step: {step.step_name}")
-                    continue
-                
-                # Check dependencies
-                if step.dependencies:
-                    for dep in step.dependencies:
-                        if not await self._is_step_completed(execution_id, dep):
-                            raise Exception(f"Dependency {dep} not completed for step {step.step_id}")
-                
-                # Execute step
-                await self._execute_step(execution, step)
+            await self._run_steps(execution, steps, order)
             
             # Mark as completed
             execution.status = PipelineStatus.COMPLETED
@@ -272,61 +350,325 @@ class ETLPipeline:
             
             self.logger.error(f"Pipeline execution failed: {execution_id} - {str(e)}")
         
+        self._record_critical_path(execution, steps)
         return execution
     
-    async def _execute_step(self, execution: PipelineExecution, step: PipelineStep):
-        """Execute a single pipeline step"""
+    def _plan_steps(self, steps: List[PipelineStep]) -> List[str]:
+        """Topologically order steps by their dependencies (Kahn's algorithm)"""
+        by_id = {step.step_id: step for step in steps}
+        remaining = {}
+        dependents: Dict[str, List[str]] = {step_id: [] for step_id in by_id}
+        for step in steps:
+            for dep in step.dependencies or []:
+                if dep not in by_id:
+                    raise ValueError(f"Step {step.step_id} depends on unknown step {dep}")
+                dependents[dep].append(step.step_id)
+            remaining[step.step_id] = len(set(step.dependencies or []))
+        
+        # Ties keep the order steps are listed in
+        ready = [step.step_id for step in steps if remaining[step.step_id] == 0]
+        order = []
+        while ready:
+            step_id = ready.pop(0)
+            order.append(step_id)
+            for dependent in dict.fromkeys(dependents[step_id]):
+                remaining[dependent] -= 1
+                if remaining[dependent] == 0:
+                    ready.append(dependent)
+        
+        if len(order) != len(steps):
+            cycle = [step_id for step_id, count in remaining.items() if count > 0]
+            raise ValueError(f"Dependency cycle between steps: {', '.join(cycle)}")
+        return order
+    
+    async def _run_steps(self, execution: PipelineExecution, steps: List[PipelineStep], order: List[str]):
+        """Start each step as soon as its dependencies are done, up to max_parallel_steps at once"""
+        by_id = {step.step_id: step for step in steps}
+        pending = [step_id for step_id in order if execution.step_status[step_id] != "completed"]
+        running: Dict[asyncio.Task, str] = {}
+        failure: Optional[BaseException] = None
+        
+        try:
+            while pending or running:
+                # After a failure no new steps start; running ones finish and are checkpointed
+                if failure is None:
+                    for step_id in list(pending):
+                        if len(running) >= self.max_parallel_steps:
+                            break
+                        step = by_id[step_id]
+                        if not all([
+                            await self._is_step_completed(execution.execution_id, dep)
+                            for dep in step.dependencies or []
+                        ]):
+                            continue
+                        pending.remove(step_id)
+                        if not step.enabled:
+                            execution.step_status[step_id] = "skipped"
+                            execution.execution_log.append(f"Skipping disabled step: {step.step_name}")
+                            continue
+                        execution.step_status[step_id] = "running"
+                        running[asyncio.create_task(self._run_step(execution, step))] = step_id
+                
+                if not running:
+                    break
+                
+                done, _ = await asyncio.wait(running, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    running.pop(task)
+                    if task.exception() is not None and failure is None:
+                        failure = task.exception()
+        finally:
+            # Only reached with tasks left if the execution itself was cancelled
+            for task in running:
+                task.cancel()
+        
+        if failure is not None:
+            raise failure
+    
+    async def _run_step(self, execution: PipelineExecution, step: PipelineStep):
+        """Execute a step, record its timing and checkpoint it on success"""
+        started = time.perf_counter()
+        offset = (datetime.utcnow() - execution.start_time).total_seconds()
+        timing = {"started_at": round(offset, 3)}
+        execution.step_timings[step.step_id] = timing
+        try:
+            timing.update(await self._execute_step(execution, step))
+        except Exception:
+            execution.step_status[step.step_id] = "failed"
+            raise
+        finally:
+            duration = time.perf_counter() - started
+            timing["duration_seconds"] = round(duration, 3)
+            timing["finished_at"] = round(offset + duration, 3)
+        
+        execution.step_status[step.step_id] = "completed"
+        await self._save_checkpoint(execution)
+    
+    def _record_critical_path(self, execution: PipelineExecution, steps: List[PipelineStep]):
+        """Find the longest chain of dependent steps by duration in this execution"""
+        durations = {
+            step_id: timing.get("duration_seconds", 0.0)
+            for step_id, timing in execution.step_timings.items()
+        }
+        # Longest finishing chain per step, visiting steps in dependency order
+        chain_seconds: Dict[str, float] = {}
+        previous: Dict[str, Optional[str]] = {}
+        by_id = {step.step_id: step for step in steps}
+        try:
+            order = self._plan_steps(steps)
+        except ValueError:
+            return
+        for step_id in order:
+            deps = [dep for dep in by_id[step_id].dependencies or [] if dep in chain_seconds]
+            best = max(deps, key=lambda dep: chain_seconds[dep], default=None)
+            chain_seconds[step_id] = durations.get(step_id, 0.0) + (chain_seconds[best] if best else 0.0)
+            previous[step_id] = best
+        
+        if not chain_seconds or not durations:
+            return
+        step_id = max(chain_seconds, key=chain_seconds.get)
+        execution.critical_path_seconds = round(chain_seconds[step_id], 3)
+        path = []
+        while step_id is not None:
+            if step_id in durations:
+                path.append(step_id)
+            step_id = previous[step_id]
+        execution.critical_path = path[::-1]
+        execution.execution_log.append(
+            f"Critical path {' -> '.join(execution.critical_path)}: {execution.critical_path_seconds:.2f}s "
+            f"of {sum(durations.values()):.2f}s total step time"
+        )
+    
+    async def _execute_step(self, execution: PipelineExecution, step: PipelineStep) -> Dict[str, Any]:
+        """
+        Execute a single pipeline step; returns its load statistics
+        
+        Streamable transformations (CLEAN, ENRICH, VALIDATE) extract, transform
+        and bulk-load one batch of fetch_size rows at a time, so only one batch
+        is held in memory. AGGREGATE, NORMALIZE and DEDUPLICATE need the whole
+        dataset and transform all batches at once.
+        
+        Steps with a watermark_column only read rows past the stored
+        watermark, which moves up once all of them are loaded.
+        """
         try:
             execution.execution_log.append(f"Executing step: {step.step_name}")
             
-            # Extract data
-            source_data = await self._extract_data(step.source_query)
-            execution.records_processed += len(source_data)
+            compiled = self._compile_step(execution.pipeline_name, step)
+            fetch_size = step.transformation_config.get("fetch_size", self.fetch_size)
+            streaming = (
+                self.streaming_enabled
+                and (step.transformation_type in self.STREAMING_TRANSFORMATIONS or compiled.pushed_down)
+                and step.transformation_config.get("streaming", True)
+            )
+            stats = {"records": 0, "records_extracted": 0, "batches": 0, "streamed": streaming, "peak_memory_mb": 0.0}
+            started = time.perf_counter()
             
-            # Transform data
-            transformed_data = await self._transform_data(source_data, step)
+            query, params, watermark = await self._source_query(execution.pipeline_name, step, compiled)
+            if step.watermark_column:
+                stats["watermark_from"] = None if watermark is None else str(watermark)
+            high_watermark = watermark
             
-            # Load data
-            await self._load_data(transformed_data, step.target_table)
+            if streaming:
+                async for batch in self._extract_batches(query, fetch_size, output="dataframe", params=params):
+                    execution.records_processed += len(batch)
+                    stats["records_extracted"] += len(batch)
+                    high_watermark = self._high_watermark(batch, step, high_watermark)
+                    transformed = await self._transform_frame(batch, step, compiled, execution.start_time)
+                    # Source and transformed batch are both alive until the load finishes
+                    self._track_memory(stats, batch, transformed)
+                    stats["records"] += await self._load_frame(
+                        transformed, step.target_table, create_table=stats["batches"] == 0,
+                        merge_keys=step.merge_keys
+                    )
+                    stats["batches"] += 1
+            else:
+                source = await self._extract_frame(query, fetch_size, params)
+                execution.records_processed += len(source)
+                stats["records_extracted"] = len(source)
+                high_watermark = self._high_watermark(source, step, high_watermark)
+                transformed = await self._transform_frame(source, step, compiled, execution.start_time)
+                self._track_memory(stats, source, transformed)
+                del source
+                stats["records"] = await self._load_frame(transformed, step.target_table, merge_keys=step.merge_keys)
+                stats["batches"] = 1
             
-            execution.execution_log.append(f"Step completed: {step.step_name} - {len(transformed_data)} records processed")
+            # Advanced only after every batch is loaded; a failed step re-reads from the old watermark
+            if step.watermark_column:
+                stats["watermark_to"] = None if high_watermark is None else str(high_watermark)
+                if high_watermark is not None and high_watermark != watermark:
+                    await self._save_watermark(execution.pipeline_name, step, high_watermark)
+            
+            elapsed = time.perf_counter() - started
+            stats["rows_per_second"] = round(stats["records"] / elapsed, 1) if elapsed > 0 else 0.0
+            stats["memory_limit_mb"] = self.step_memory_limit_mb
+            if stats["peak_memory_mb"] > self.step_memory_limit_mb:
+                message = (
+                    f"Step {step.step_name} held {stats['peak_memory_mb']:.1f} MB of data, above the "
+                    f"{self.step_memory_limit_mb:.0f} MB limit"
+                    + (" - lower fetch_size" if streaming else " - it is not streamable")
+                )
+                execution.execution_log.append(message)
+                self.logger.warning(message)
+            
+            execution.execution_log.append(
+                f"Step completed: {step.step_name} - {stats['records']} records processed "
+                f"({stats['batches']} batches, {stats['rows_per_second']:.0f} rows/s, "
+                f"peak {stats['peak_memory_mb']:.1f} MB)"
+            )
+            return stats
             
         except Exception as e:
             execution.records_failed += 1
             execution.execution_log.append(f"Step failed: {step.step_name} - {str(e)}")
             raise
     
-    async def _extract_data(self, query: str) -> List[Dict[str, Any]]:
-        """Extract data from source"""
+    def _track_memory(self, stats: Dict[str, Any], *frames: pd.DataFrame):
+        """Record the largest amount of row data held at once by a step"""
+        size = sum(int(df.memory_usage(index=True, deep=True).sum()) for df in frames)
+        stats["peak_memory_mb"] = max(stats["peak_memory_mb"], round(size / 1024 / 1024, 2))
+    
+    async def _extract_frame(self, query: str, fetch_size: Optional[int] = None,
+                             params: tuple = ()) -> pd.DataFrame:
+        """Extract the full result of a query as one DataFrame"""
+        frames = [batch async for batch in self._extract_batches(query, fetch_size, output="dataframe", params=params)]
+        if not frames:
+            return pd.DataFrame()
+        return frames[0] if len(frames) == 1 else pd.concat(frames, ignore_index=True)
+    
+    async def _extract_batches(self, query: str, fetch_size: Optional[int] = None,
+                               output: str = "rows", params: tuple = ()):
+        """Extract data from source in batches using a server-side cursor"""
         try:
-            return self.sql_service.execute_query(query)
+            async for batch in self.sql_service.stream_query_async(
+                query, params, fetch_size=fetch_size, output=output
+            ):
+                yield batch
         except Exception as e:
             self.logger.error(f"Error extracting data: {str(e)}")
             raise
     
-    async def _transform_data(self, data: List[Dict[str, Any]], 
-                            step: PipelineStep) -> List[Dict[str, Any]]:
-        """Transform data according to step configuration"""
-        if not data:
-            return []
+    def _compile_step(self, pipeline_name: str, step: PipelineStep) -> CompiledStep:
+        """
+        Parse a step's expressions, reusing the result while its configuration is unchanged
+        
+        With pushdown (ETL_EXPRESSION_PUSHDOWN or transformation_config
+        "pushdown") the expressions are rendered into the source query for
+        the database to compute; expressions the database dialect can't
+        express are evaluated in pandas instead.
+        """
+        dialect = "postgres" if getattr(self.sql_service, "use_postgres", False) else "mssql"
+        fingerprint = json.dumps(
+            [step.source_query, step.transformation_type.value, step.transformation_config, dialect,
+             step.watermark_column, step.merge_keys],
+            sort_keys=True, default=str
+        )
+        cached = self._compiled_steps.get((pipeline_name, step.step_id))
+        if cached is not None and cached[0] == fingerprint:
+            return cached[1]
+        
+        config = step.transformation_config
+        expressions = None
+        try:
+            if step.transformation_type == TransformationType.ENRICH and "add_columns" in config:
+                expressions = EnrichPlan(config["add_columns"])
+            elif step.transformation_type == TransformationType.AGGREGATE and "aggregations" in config:
+                expressions = AggregatePlan(config.get("group_by", []), config["aggregations"])
+        except ExpressionError as e:
+            raise ExpressionError(f"Step {step.step_id}: {str(e)}") from e
+        
+        compiled = CompiledStep(source_query=step.source_query, expressions=expressions, dialect=dialect)
+        if step.transformation_type == TransformationType.NORMALIZE:
+            method = config.get("normalization_method", "min_max")
+            if method not in self.NORMALIZATION_METHODS:
+                raise ValueError(f"Step {step.step_id}: unknown normalization method '{method}'")
+            if config.get("incremental"):
+                if method != "min_max":
+                    raise ValueError(f"Step {step.step_id}: incremental normalization only supports min_max")
+                compiled.normalization_stats_key = CacheKeys.ETL_NORMALIZATION_STATS.format(
+                    pipeline_name=pipeline_name, step_id=step.step_id
+                )
+        if expressions is not None and config.get("pushdown", self.expression_pushdown):
+            try:
+                compiled.source_query = expressions.pushdown(step.source_query, dialect)
+                compiled.pushed_down = True
+            except PushdownUnsupported as e:
+                self.logger.info(f"Step {step.step_id} expressions evaluated in pandas: {str(e)}")
+        
+        if step.watermark_column and not (
+            step.transformation_type in self.STREAMING_TRANSFORMATIONS
+            or (step.transformation_type == TransformationType.NORMALIZE and config.get("incremental"))
+        ):
+            # Aggregating or deduplicating only the new rows would overwrite complete results
+            raise ValueError(
+                f"Step {step.step_id}: watermark_column needs a row-wise transformation, "
+                f"{step.transformation_type.value} uses all rows"
+            )
         
-        df = pd.DataFrame(data)
+        self._compiled_steps[(pipeline_name, step.step_id)] = (fingerprint, compiled)
+        return compiled
+    
+    async def _transform_frame(self, df: pd.DataFrame, step: PipelineStep, compiled: CompiledStep,
+                               now: Optional[datetime] = None) -> pd.DataFrame:
+        """Transform data according to step configuration"""
+        if df.empty:
+            return df
         
         try:
             if step.transformation_type == TransformationType.CLEAN:
                 df = await self._clean_data(df, step.transformation_config)
             elif step.transformation_type == TransformationType.ENRICH:
-                df = await self._enrich_data(df, step.transformation_config)
+                df = await self._enrich_data(df, compiled, now)
             elif step.transformation_type == TransformationType.AGGREGATE:
-                df = await self._aggregate_data(df, step.transformation_config)
+                df = await self._aggregate_data(df, compiled, now)
             elif step.transformation_type == TransformationType.NORMALIZE:
-                df = await self._normalize_data(df, step.transformation_config)
+                df = await self._normalize_data(df, step.transformation_config, compiled.normalization_stats_key)
             elif step.transformation_type == TransformationType.VALIDATE:
                 df = await self._validate_data(df, step.transformation_config)
             elif step.transformation_type == TransformationType.DEDUPLICATE:
                 df = await self._deduplicate_data(df, step.transformation_config)
             
-            return df.to_dict('records')
+            return df
             
         except Exception as e:
             self.logger.error(f"Error transforming data: {str(e)}")
@@ -357,81 +699,111 @@ class ETLPipeline:
         
         return df
     
-    async def _enrich_data(self, df: pd.DataFrame, config: Dict[str, Any]) -> pd.DataFrame:
-        """Enrich data with additional columns"""
-        if "add_columns" in config:
-            for col_name, expression in config["add_columns"].items():
-                # This is a simplified version - in production, you'd use a proper SQL expression parser
-                if "CASE" in expression:
-                    # Handle CASE statements
-                    df[col_name] = self._evaluate_case_expression(df, expression)
-                elif "SUBSTRING" in expression:
-                    # Handle SUBSTRING functions
-                    df[col_name] = self._evaluate_substring_expression(df, expression)
-                else:
-                    # Simple column reference
-                    df[col_name] = expression
-        
-        return df
+    async def _enrich_data(self, df: pd.DataFrame, compiled: CompiledStep,
+                           now: Optional[datetime] = None) -> pd.DataFrame:
+        """Enrich data with additional columns computed from the compiled expressions"""
+        if compiled.expressions is None or compiled.pushed_down:
+            return df
+        return compiled.expressions.apply(df, now)
     
-    async def _aggregate_data(self, df: pd.DataFrame, config: Dict[str, Any]) -> pd.DataFrame:
-        """Aggregate data according to configuration"""
-        if "group_by" in config and "aggregations" in config:
-            group_cols = config["group_by"]
-            agg_dict = config["aggregations"]
-            
-            # Convert aggregation functions
-            agg_functions = {}
-            for col, func in agg_dict.items():
-                if func.upper() == "COUNT(*)":
-                    agg_functions[col] = "count"
-                elif func.upper().startswith("SUM("):
-                    agg_functions[col] = "sum"
-                elif func.upper().startswith("AVG("):
-                    agg_functions[col] = "mean"
-                elif func.upper().startswith("MIN("):
-                    agg_functions[col] = "min"
-                elif func.upper().startswith("MAX("):
-                    agg_functions[col] = "max"
-                elif func.upper().startswith("STDEV("):
-                    agg_functions[col] = "std"
-            
-            # Perform aggregation
-            if group_cols:
-                df = df.groupby(group_cols).agg(agg_functions).reset_index()
-            else:
-                df = df.agg(agg_functions).to_frame().T
-        
-        return df
+    async def _aggregate_data(self, df: pd.DataFrame, compiled: CompiledStep,
+                              now: Optional[datetime] = None) -> pd.DataFrame:
+        """Aggregate data with the compiled group_by and aggregations"""
+        if compiled.expressions is None or compiled.pushed_down:
+            return df
+        return compiled.expressions.apply(df, now)
     
-    async def _normalize_data(self, df: pd.DataFrame, config: Dict[str, Any]) -> pd.DataFrame:
-        """Normalize data according to configuration"""
+    async def _normalize_data(self, df: pd.DataFrame, config: Dict[str, Any],
+                              stats_key: Optional[str] = None) -> pd.DataFrame:
+        """
+        Normalize numeric columns, within each group when group_by is set
+        
+        Methods: min_max (scaled to target_range), z_score and robust
+        (median / interquartile range). Per-group statistics for all columns
+        come from one groupby over the group codes and are broadcast back to
+        the rows with a single index lookup. Constant groups scale by 1.
+        
+        With stats_key (incremental min_max) the running min/max of every
+        group is kept between executions, so rows of later executions are
+        scaled against everything seen so far.
+        """
         method = config.get("normalization_method", "min_max")
-        target_range = config.get("target_range", [0, 1])
+        low, high = config.get("target_range", [0, 1])
         group_by = config.get("group_by", [])
+        columns = [
+            col for col in config.get("columns") or df.select_dtypes(include="number").columns
+            if col not in group_by
+        ]
+        if not columns:
+            return df
         
+        values = df[columns].astype(float)
         if group_by:
-            # Normalize within groups
-            for group, group_df in df.groupby(group_by):
-                for col in df.columns:
-                    if col not in group_by and df[col].dtype in ['int64', 'float64']:
-                        if method == "min_max":
-                            min_val = group_df[col].min()
-                            max_val = group_df[col].max()
-                            if max_val != min_val:
-                                df.loc[group_df.index, col] = (group_df[col] - min_val) / (max_val - min_val)
+            codes = df.groupby(group_by, dropna=False, sort=False).ngroup().to_numpy()
         else:
-            # Normalize entire dataset
-            for col in df.columns:
-                if df[col].dtype in ['int64', 'float64']:
-                    if method == "min_max":
-                        min_val = df[col].min()
-                        max_val = df[col].max()
-                        if max_val != min_val:
-                            df[col] = (df[col] - min_val) / (max_val - min_val)
+            codes = np.zeros(len(df), dtype=np.int64)
+        # Indexed by group code 0..n_groups-1
+        grouped = values.groupby(codes)
         
+        if method == "min_max":
+            minimum, maximum = grouped.min(), grouped.max()
+            if stats_key:
+                minimum, maximum = await self._merge_running_min_max(stats_key, df, group_by, codes, minimum, maximum)
+            center, scale = minimum, maximum - minimum
+        elif method == "z_score":
+            center, scale = grouped.mean(), grouped.std(ddof=0)
+        else:
+            center = grouped.median()
+            scale = grouped.quantile(0.75) - grouped.quantile(0.25)
+        
+        scale = scale.mask(scale == 0, 1.0)
+        scaled = (values.to_numpy() - center.to_numpy()[codes]) / scale.to_numpy()[codes]
+        if method == "min_max":
+            scaled = low + scaled * (high - low)
+        df[columns] = scaled
         return df
     
+    async def _merge_running_min_max(self, stats_key: str, df: pd.DataFrame, group_by: List[str],
+                                     codes: np.ndarray, minimum: pd.DataFrame,
+                                     maximum: pd.DataFrame) -> Tuple[pd.DataFrame, pd.DataFrame]:
+        """Combine a batch's per-group min/max with the stored running values and save them"""
+        state = await cache_service.get(stats_key) or {}
+        groups: Dict[str, Dict[str, Dict[str, Any]]] = state.get("groups", {})
+        
+        # Stable key per group, taken from the group's first row
+        if group_by:
+            first_rows = pd.Series(np.arange(len(df))).groupby(codes).min().to_numpy()
+            group_keys = [
+                json.dumps(list(key), default=str)
+                for key in df[group_by].iloc[first_rows].itertuples(index=False, name=None)
+            ]
+        else:
+            group_keys = ["[]"]
+        
+        columns = list(minimum.columns)
+        stored_min = pd.DataFrame(
+            [groups.get(key, {}).get("min", {}) for key in group_keys], columns=columns, dtype=float
+        ).to_numpy()
+        stored_max = pd.DataFrame(
+            [groups.get(key, {}).get("max", {}) for key in group_keys], columns=columns, dtype=float
+        ).to_numpy()
+        # fmin/fmax ignore NaN, i.e. groups or columns seen for the first time
+        minimum = pd.DataFrame(np.fmin(minimum.to_numpy(), stored_min), index=minimum.index, columns=columns)
+        maximum = pd.DataFrame(np.fmax(maximum.to_numpy(), stored_max), index=maximum.index, columns=columns)
+        
+        for key, mins, maxs in zip(
+            group_keys,
+            minimum.astype(object).where(minimum.notna(), None).to_dict("records"),
+            maximum.astype(object).where(maximum.notna(), None).to_dict("records")
+        ):
+            groups[key] = {"min": mins, "max": maxs}
+        await cache_service.set(
+            stats_key,
+            {"groups": groups, "updated_at": datetime.utcnow().isoformat()},
+            ttl=self.state_ttl
+        )
+        return minimum, maximum
+    
     async def _validate_data(self, df: pd.DataFrame, config: Dict[str, Any]) -> pd.DataFrame:
         """Validate data according to configuration"""
         # This would implement data validation rules
@@ -450,21 +822,32 @@ class ETLPipeline:
         
         return df
     
-    async def _load_data(self, data: List[Dict[str, Any]], target_table: str):
-        """Load transformed data to target table"""
-        if not data:
-            return
+    async def _load_frame(self, df: pd.DataFrame, target_table: str, create_table: bool = True,
+                          merge_keys: Optional[List[str]] = None) -> int:
+        """
+        Bulk-load a transformed DataFrame into the target table; returns rows loaded
+        
+        With merge_keys, rows matching an existing row on those columns update it.
+        """
+        if df.empty:
+            return 0
         
         try:
-            # Create table if it doesn't exist
-            await self._create_target_table(target_table, data[0].keys())
+            columns = [str(col) for col in df.columns]
+            if create_table:
+                # Create table if it doesn't exist
+                await self._create_target_table(target_table, columns)
             
-            # Insert data
-            for record in data:
-                self.sql_service.execute_non_query(
-                    f"INSERT INTO {target_table} ({', '.join(record.keys())}) VALUES ({', '.join(['?' for _ in record.values()])})",
-                    tuple(record.values())
-                )
+            # Python scalars with NULL for missing values, straight from the columns
+            rows = list(df.astype(object).where(df.notna(), None).itertuples(index=False, name=None))
+            
+            # Bulk insert data (COPY / fast_executemany depending on driver) off the event loop
+            if merge_keys:
+                query = self.sql_service.upsert_query(target_table, columns, merge_keys)
+            else:
+                query = f"INSERT INTO {target_table} ({', '.join(columns)}) VALUES ({', '.join(['?' for _ in columns])})"
+            await self.sql_service.execute_batch_async(query, rows)
+            return len(rows)
             
         except Exception as e:
             self.logger.error(f"Error loading data to {target_table}: {str(e)}")
@@ -477,32 +860,94 @@ class ETLPipeline:
         self.logger.info(f"Creating target table: {table_name} with columns: {columns}")
     
     async def _is_step_completed(self, execution_id: str, step_id: str) -> bool:
-        """Check if a step is completed"""
-        # This would check the execution log for step completion
-        # For now, return True
-        return True
-    
-    def _evaluate_case_expression(self, df: pd.DataFrame, expression: str) -> pd.Series:
-        """Evaluate CASE expression (simplified)"""
-        # This is a simplified implementation
-        # In production, you'd use a proper SQL expression parser
-        result = pd.Series(["other"] * len(df))
-        
-        if "document" in expression.lower():
-            result = df.get("content_type", pd.Series()).str.contains("pdf", case=False, na=False)
-        elif "image" in expression.lower():
-            result = df.get("content_type", pd.Series()).str.contains("image", case=False, na=False)
-        
-        return result
-    
-    def _evaluate_substring_expression(self, df: pd.DataFrame, expression: str) -> pd.Series:
-        """Evaluate SUBSTRING expression (simplified)"""
-        # This is a simplified implementation
-        # In production, you'd use a proper SQL expression parser
-        if "file_name" in expression:
-            return df.get("file_name", pd.Series()).str.split(".").str[-1]
-        
-        return pd.Series([""] * len(df))
+        """Check if a step is completed (or skipped, which satisfies dependents)"""
+        execution = self.executions.get(execution_id)
+        if execution is not None:
+            return execution.step_status.get(step_id) in ("completed", "skipped")
+        checkpoint = await self.load_checkpoint(execution_id)
+        return step_id in checkpoint.get("completed_steps", [])
+    
+    async def _save_checkpoint(self, execution: PipelineExecution):
+        """Persist which steps of an execution have completed"""
+        await cache_service.set(
+            CacheKeys.ETL_CHECKPOINT.format(execution_id=execution.execution_id),
+            {
+                "pipeline_name": execution.pipeline_name,
+                "completed_steps": [
+                    step_id for step_id, status in execution.step_status.items() if status == "completed"
+                ],
+                "updated_at": datetime.utcnow().isoformat()
+            },
+            ttl=self.checkpoint_ttl
+        )
+    
+    async def load_checkpoint(self, execution_id: str) -> Dict[str, Any]:
+        """Load an execution's checkpoint ({} if there is none)"""
+        return await cache_service.get(CacheKeys.ETL_CHECKPOINT.format(execution_id=execution_id)) or {}
+    
+    async def _source_query(self, pipeline_name: str, step: PipelineStep,
+                            compiled: CompiledStep) -> Tuple[str, tuple, Any]:
+        """
+        Query, parameters and stored watermark for a step's extraction
+        
+        The watermark predicate wraps the configured source query (the
+        database pushes it into the scan), beneath any pushed-down
+        expressions. With merge_keys it is inclusive, so rows sharing the
+        last watermark value are re-read and upserted rather than missed.
+        """
+        watermark = await self.load_watermark(pipeline_name, step) if step.watermark_column else None
+        if watermark is None:
+            return compiled.source_query, (), None
+        
+        comparison = ">=" if step.merge_keys else ">"
+        query = f"SELECT * FROM ({step.source_query}) AS incremental WHERE {step.watermark_column} {comparison} ?"
+        if compiled.pushed_down:
+            query = compiled.expressions.pushdown(query, compiled.dialect)
+        return query, (watermark,), watermark
+    
+    def _high_watermark(self, df: pd.DataFrame, step: PipelineStep, current: Any) -> Any:
+        """Highest watermark value seen so far, including this batch"""
+        if not step.watermark_column or df.empty:
+            return current
+        if step.watermark_column not in df.columns:
+            raise ValueError(f"Watermark column {step.watermark_column} not in the rows of step {step.step_id}")
+        value = df[step.watermark_column].max()
+        if pd.isna(value):
+            return current
+        # Plain Python values so the watermark round-trips through the cache codecs
+        if isinstance(value, pd.Timestamp):
+            value = value.to_pydatetime()
+        elif isinstance(value, np.generic):
+            value = value.item()
+        return value if current is None or value > current else current
+    
+    async def load_watermark(self, pipeline_name: str, step: PipelineStep) -> Any:
+        """Highest watermark loaded by a previous execution (None: read everything)"""
+        state = await cache_service.get(
+            CacheKeys.ETL_WATERMARK.format(pipeline_name=pipeline_name, step_id=step.step_id)
+        ) or {}
+        # A changed watermark column starts over with a full read
+        if state.get("column") != step.watermark_column:
+            return None
+        return state.get("value")
+    
+    async def _save_watermark(self, pipeline_name: str, step: PipelineStep, value: Any):
+        await cache_service.set(
+            CacheKeys.ETL_WATERMARK.format(pipeline_name=pipeline_name, step_id=step.step_id),
+            {"column": step.watermark_column, "value": value, "updated_at": datetime.utcnow().isoformat()},
+            ttl=self.state_ttl
+        )
+    
+    async def reset_watermarks(self, pipeline_name: str) -> List[str]:
+        """Forget a pipeline's watermarks so its next execution reads all rows"""
+        reset = []
+        for step in self.pipelines[pipeline_name]:
+            if step.watermark_column:
+                await cache_service.delete(
+                    CacheKeys.ETL_WATERMARK.format(pipeline_name=pipeline_name, step_id=step.step_id)
+                )
+                reset.append(step.step_id)
+        return reset
 
 # Pydantic models for API
 class PipelineExecutionRequest(BaseModel):
@@ -519,6 +964,11 @@ class PipelineStatusResponse(BaseModel):
     records_failed: int
     error_message: Optional[str]
     execution_log: List[str]
+    step_status: Dict[str, str] = Field(default_factory=dict)
+    step_timings: Dict[str, Dict[str, Any]] = Field(default_factory=dict)
+    resumed_steps: List[str] = Field(default_factory=list)
+    critical_path: List[str] = Field(default_factory=list)
+    critical_path_seconds: float = 0.0
 
 # Global ETL pipeline instance
 etl_pipeline = ETLPipeline()
\ No newline at end of file
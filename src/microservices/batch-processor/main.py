@@ -97,7 +97,9 @@ async def get_pipeline_details(pipeline_name: str):
                     "source_query": step.source_query,
                     "target_table": step.target_table,
                     "dependencies": step.dependencies or [],
-                    "enabled": step.enabled
+                    "enabled": step.enabled,
+                    "watermark_column": step.watermark_column,
+                    "merge_keys": step.merge_keys or []
                 }
                 for step in steps
             ]
@@ -108,6 +110,25 @@ async def get_pipeline_details(pipeline_name: str):
         logger.error(f"Error getting pipeline details: {str(e)}")
         raise HTTPException(status_code=500, detail="Failed to get pipeline details")
 
+@app.delete("/pipelines/{pipeline_name}/watermarks")
+async def reset_pipeline_watermarks(pipeline_name: str):
+    """Reset incremental watermarks so the next execution re-reads all source rows"""
+    try:
+        if pipeline_name not in etl_pipeline.pipelines:
+            raise HTTPException(status_code=404, detail="Pipeline not found")
+        
+        reset_steps = await etl_pipeline.reset_watermarks(pipeline_name)
+        return {
+            "pipeline_name": pipeline_name,
+            "reset_steps": reset_steps,
+            "timestamp": datetime.utcnow().isoformat()
+        }
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Error resetting watermarks: {str(e)}")
+        raise HTTPException(status_code=500, detail="Failed to reset watermarks")
+
 # Pipeline execution endpoints
 @app.post("/pipelines/{pipeline_name}/execute")
 async def execute_pipeline(
@@ -151,17 +172,7 @@ async def get_execution_status(execution_id: str):
         
         execution = etl_pipeline.executions[execution_id]
         
-        return PipelineStatusResponse(
-            execution_id=execution.execution_id,
-            pipeline_name=execution.pipeline_name,
-            status=execution.status.value,
-            start_time=execution.start_time.isoformat(),
-            end_time=execution.end_time.isoformat() if execution.end_time else None,
-            records_processed=execution.records_processed,
-            records_failed=execution.records_failed,
-            error_message=execution.error_message,
-            execution_log=execution.execution_log or []
-        )
+        return _execution_response(execution)
         
     except HTTPException:
         raise
@@ -169,6 +180,40 @@ async def get_execution_status(execution_id: str):
         logger.error(f"Error getting execution status: {str(e)}")
         raise HTTPException(status_code=500, detail="Failed to get execution status")
 
+@app.post("/executions/{execution_id}/resume")
+async def resume_execution(execution_id: str, background_tasks: BackgroundTasks):
+    """Re-run a failed execution, skipping the steps it already completed"""
+    try:
+        # Executions from before a restart are only known by their checkpoint
+        checkpoint = await etl_pipeline.load_checkpoint(execution_id)
+        execution = etl_pipeline.executions.get(execution_id)
+        if execution is None and not checkpoint:
+            raise HTTPException(status_code=404, detail="Execution not found")
+        if execution is not None and execution.status != PipelineStatus.FAILED:
+            raise HTTPException(status_code=409, detail=f"Execution is {execution.status.value}, only failed executions can be resumed")
+        
+        pipeline_name = execution.pipeline_name if execution else checkpoint["pipeline_name"]
+        background_tasks.add_task(
+            etl_pipeline.execute_pipeline,
+            pipeline_name,
+            execution_id,
+            True
+        )
+        
+        return {
+            "message": f"Pipeline {pipeline_name} execution resumed",
+            "execution_id": execution_id,
+            "completed_steps": checkpoint.get("completed_steps", []),
+            "status": "started",
+            "timestamp": datetime.utcnow().isoformat()
+        }
+        
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Error resuming execution: {str(e)}")
+        raise HTTPException(status_code=500, detail="Failed to resume execution")
+
 @app.get("/executions", response_model=ExecutionHistoryResponse)
 @cache_result(ttl=60, key_prefix="execution_history")  # Cache for 1 minute
 async def get_execution_history(
@@ -193,20 +238,7 @@ async def get_execution_history(
         paginated_executions = executions[start_idx:end_idx]
         
         return ExecutionHistoryResponse(
-            executions=[
-                PipelineStatusResponse(
-                    execution_id=e.execution_id,
-                    pipeline_name=e.pipeline_name,
-                    status=e.status.value,
-                    start_time=e.start_time.isoformat(),
-                    end_time=e.end_time.isoformat() if e.end_time else None,
-                    records_processed=e.records_processed,
-                    records_failed=e.records_failed,
-                    error_message=e.error_message,
-                    execution_log=e.execution_log or []
-                )
-                for e in paginated_executions
-            ],
+            executions=[_execution_response(e) for e in paginated_executions],
             total_executions=len(executions),
             page=page,
             page_size=page_size
@@ -384,6 +416,25 @@ async def get_batch_health():
         logger.error(f"Error getting batch health: {str(e)}")
         raise HTTPException(status_code=500, detail="Failed to get batch health")
 
+def _execution_response(execution) -> PipelineStatusResponse:
+    """Build the API view of a pipeline execution"""
+    return PipelineStatusResponse(
+        execution_id=execution.execution_id,
+        pipeline_name=execution.pipeline_name,
+        status=execution.status.value,
+        start_time=execution.start_time.isoformat(),
+        end_time=execution.end_time.isoformat() if execution.end_time else None,
+        records_processed=execution.records_processed,
+        records_failed=execution.records_failed,
+        error_message=execution.error_message,
+        execution_log=execution.execution_log or [],
+        step_status=execution.step_status,
+        step_timings=execution.step_timings,
+        resumed_steps=execution.resumed_steps,
+        critical_path=execution.critical_path,
+        critical_path_seconds=execution.critical_path_seconds
+    )
+
 def _get_health_recommendations(stuck_executions: List[str], failure_rate: float) -> List[str]:
     """Get health recommendations based on system status"""
     recommendations = []
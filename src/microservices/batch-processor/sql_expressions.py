@@ -0,0 +1,1104 @@
+"""
+SQL Expression Compiler
+Compiles the SQL-style expressions of ETL transformation configs into
+vectorized pandas/NumPy operations
+
+ENRICH add_columns and AGGREGATE group_by/aggregations are written as
+SQL Server expressions, e.g.
+
+    CASE WHEN file_size < 1024000 THEN 'small' ELSE 'large' END
+    DATEDIFF(day, created_at, GETDATE())
+    SUBSTRING(file_name, CHARINDEX('.', file_name) + 1, LEN(file_name))
+    SUM(file_size) / COUNT(*)
+
+Each expression is parsed once into a tree whose nodes evaluate on whole
+columns (pandas Series), never row by row. The same tree renders back to
+SQL, so a step can instead push its expressions down into the source query
+and let the database compute them.
+
+Supported:
+- literals, columns ([bracketed], "quoted" or table.column), NULL
+- + - * / % (/ is true division, unlike integer division in SQL Server;
+  a zero divisor gives NULL), comparisons, AND/OR/NOT with SQL
+  three-valued NULL logic
+- LIKE, IN (...), IS [NOT] NULL, BETWEEN, searched and simple CASE
+- SUBSTRING, CHARINDEX, LEN, LOWER, UPPER, TRIM, LTRIM, RTRIM, CONCAT,
+  COALESCE, ISNULL, NULLIF, ABS, ROUND, FLOOR, CEILING
+- DATEDIFF, DATEADD, DATEPART, GETDATE, GETUTCDATE, CURRENT_TIMESTAMP,
+  DATE, YEAR, MONTH, DAY
+- COUNT(*), COUNT([DISTINCT] x), SUM, AVG, MIN, MAX, STDEV, VAR
+
+Strings compare case-insensitively everywhere (=, <>, <, >, IN, LIKE,
+CHARINDEX, NULLIF), as under SQL Server's default collation, so string
+matches agree whether or not a step is pushed down. PostgreSQL pushdown lowers
+both sides of comparisons, IN and NULLIF against string literals; comparing
+two string columns there stays case-sensitive.
+
+Pushed-down SQL keeps the pandas semantics: / casts its dividend to float,
+/ and % divide by NULLIF(divisor, 0), SQL Server AVG averages as float, and
+predicates selected as values (SQL Server has no boolean type) render as
+CASE WHEN p THEN 1 WHEN NOT p THEN 0 END.
+
+Usage:
+    plan = EnrichPlan({"size_category": "CASE WHEN file_size < 1024 THEN 'small' ELSE 'large' END"})
+    df = plan.apply(df)
+    query = plan.pushdown("SELECT * FROM documents", dialect="mssql")
+"""
+
+import math
+import operator
+import re
+from datetime import datetime
+from decimal import Decimal
+from functools import lru_cache
+from typing import Any, Dict, List, NamedTuple, Optional, Set, Tuple
+
+import numpy as np
+import pandas as pd
+from pandas.api.types import infer_dtype, is_datetime64_any_dtype, is_string_dtype
+
+DIALECTS = ("mssql", "postgres")
+
+
+class ExpressionError(ValueError):
+    """Raised for expressions that can't be parsed or evaluated"""
+
+
+class PushdownUnsupported(ExpressionError):
+    """Raised when an expression has no SQL form in the target dialect"""
+
+
+# ===== Tokenizer =====
+
+class _Token(NamedTuple):
+    kind: str  # number, string, name, op, end
+    value: Any
+    # Uppercased text of unquoted names, used for keyword matching
+    keyword: Optional[str] = None
+
+
+_TOKEN_PATTERN = re.compile(r"""
+    \s*(?:
+        (?P<number>\d+\.\d*|\.\d+|\d+)
+      | N?'(?P<string>(?:[^']|'')*)'
+      | \[(?P<bracketed>[^\]]+)\]
+      | "(?P<quoted>[^"]+)"
+      | (?P<name>[A-Za-z_@#][\w@#$]*)
+      | (?P<op><=|>=|<>|!=|[-+*/%=<>(),.])
+    )""", re.VERBOSE)
+
+
+def _tokenize(text: str) -> List[_Token]:
+    tokens = []
+    position = 0
+    text = text.rstrip()
+    while position < len(text):
+        match = _TOKEN_PATTERN.match(text, position)
+        if not match:
+            raise ExpressionError(f"Unexpected character {text[position:].lstrip()[:1]!r} in {text!r}")
+        position = match.end()
+        if match.group("number") is not None:
+            number = match.group("number")
+            tokens.append(_Token("number", float(number) if "." in number else int(number)))
+        elif match.group("string") is not None:
+            tokens.append(_Token("string", match.group("string").replace("''", "'")))
+        elif match.group("bracketed") is not None:
+            tokens.append(_Token("name", match.group("bracketed")))
+        elif match.group("quoted") is not None:
+            tokens.append(_Token("name", match.group("quoted")))
+        elif match.group("name") is not None:
+            tokens.append(_Token("name", match.group("name"), match.group("name").upper()))
+        else:
+            tokens.append(_Token("op", match.group("op")))
+    tokens.append(_Token("end", None))
+    return tokens
+
+
+# ===== Evaluation helpers =====
+
+class EvaluationContext:
+    """Per-evaluation state: the GETDATE() value and aggregate result columns"""
+
+    def __init__(self, now: Optional[datetime] = None, aggregates: Optional[Dict[str, str]] = None):
+        self.now = pd.Timestamp(now or datetime.utcnow())
+        self.aggregates = aggregates or {}
+
+
+def _is_null(value: Any) -> bool:
+    return value is None or value is pd.NA or value is pd.NaT or (isinstance(value, float) and math.isnan(value))
+
+
+def _null_mask(value: Any) -> Any:
+    return value.isna() if isinstance(value, pd.Series) else _is_null(value)
+
+
+def _broadcast(value: Any, index: pd.Index) -> pd.Series:
+    if isinstance(value, pd.Series):
+        return value
+    if _is_null(value):
+        return pd.Series(None, index=index, dtype=object)
+    return pd.Series(value, index=index, dtype=object if isinstance(value, str) else None)
+
+
+def _boolean(value: Any) -> Any:
+    """Nullable boolean (Kleene logic) Series, or bool/None for scalars"""
+    if isinstance(value, pd.Series):
+        return value.astype("boolean")
+    return None if _is_null(value) else bool(value)
+
+
+def _with_nulls(result: Any, *operands: Any) -> Any:
+    """Comparison result that is NULL wherever an operand is NULL"""
+    nulls = False
+    for operand in operands:
+        nulls = nulls | _null_mask(operand)
+    if not isinstance(result, pd.Series):
+        return None if nulls is True else result
+    result = result.astype("boolean")
+    if isinstance(nulls, pd.Series):
+        return result.mask(nulls)
+    return result.mask(pd.Series(nulls, index=result.index)) if nulls else result
+
+
+def _strings(value: Any, index: pd.Index) -> pd.Series:
+    series = _broadcast(value, index)
+    if series.dtype == object or is_string_dtype(series.dtype):
+        return series
+    # Implicit conversion, as SQL Server does for string functions
+    return series.astype(str).where(series.notna())
+
+
+def _fold_case(value: Any) -> Any:
+    """Lowercase strings (scalar or Series) for case-insensitive comparison"""
+    if isinstance(value, str):
+        return value.lower()
+    if isinstance(value, pd.Series) and (value.dtype == object or is_string_dtype(value.dtype)):
+        try:
+            lowered = value.str.lower()
+        except AttributeError:
+            # Object column without any strings (e.g. Decimal)
+            return value
+        # Non-string values (numbers in an object column) stay as they are
+        return lowered.where(lowered.notna(), value)
+    return value
+
+
+def _numbers(value: Any) -> Any:
+    """Numeric Series (NULL -> NaN), or float/None for scalars, e.g. for Decimal columns"""
+    if isinstance(value, pd.Series):
+        return value if value.dtype.kind in "iuf" else pd.to_numeric(value, errors="coerce")
+    return None if _is_null(value) else float(value)
+
+
+def _arithmetic_operand(value: Any) -> Any:
+    """Decimal values (scalar or object column) as floats so they mix with float columns"""
+    if isinstance(value, Decimal):
+        return _numbers(value)
+    if isinstance(value, pd.Series) and value.dtype == object and infer_dtype(value, skipna=True) in (
+        "decimal", "integer", "floating", "mixed-integer-float"
+    ):
+        return _numbers(value)
+    return value
+
+
+def _lower_sql(sql: str, dialect: str, fold: bool) -> str:
+    return f"LOWER({sql})" if fold and dialect == "postgres" else sql
+
+
+def _timestamps(value: Any) -> Any:
+    if isinstance(value, pd.Series):
+        return value if is_datetime64_any_dtype(value.dtype) else pd.to_datetime(value, errors="coerce")
+    return pd.NaT if _is_null(value) else pd.Timestamp(value)
+
+
+def _part(value: Any, name: str) -> Any:
+    return getattr(value.dt, name) if isinstance(value, pd.Series) else getattr(value, name)
+
+
+def _floor(value: Any, unit: str) -> Any:
+    freq = pd.Timedelta(**{f"{unit}s": 1})
+    return value.dt.floor(freq) if isinstance(value, pd.Series) else value.floor(freq)
+
+
+def _week_start(value: Any) -> Any:
+    """Start of the Sunday-based week, as DATEDIFF(week) counts boundaries"""
+    days_since_sunday = (_part(value, "dayofweek") + 1) % 7
+    return _floor(value, "day") - days_since_sunday * pd.Timedelta(days=1)
+
+
+_DATE_UNITS = {
+    "year": "year", "yy": "year", "yyyy": "year",
+    "quarter": "quarter", "qq": "quarter", "q": "quarter",
+    "month": "month", "mm": "month", "m": "month",
+    "week": "week", "wk": "week", "ww": "week",
+    "day": "day", "dd": "day", "d": "day",
+    "hour": "hour", "hh": "hour",
+    "minute": "minute", "mi": "minute", "n": "minute",
+    "second": "second", "ss": "second", "s": "second",
+}
+
+
+# ===== Expression nodes =====
+
+class Expression:
+    """A parsed expression; evaluates on a DataFrame to a Series or scalar"""
+
+    # True for expressions that evaluate to TRUE/FALSE/NULL
+    predicate = False
+
+    def children(self) -> List["Expression"]:
+        return []
+
+    def evaluate(self, df: pd.DataFrame, ctx: EvaluationContext) -> Any:
+        raise NotImplementedError
+
+    def to_sql(self, dialect: str) -> str:
+        raise NotImplementedError
+
+    def columns(self) -> Set[str]:
+        """Columns referenced outside aggregate functions"""
+        found = set()
+        for child in self.children():
+            found |= child.columns()
+        return found
+
+    def aggregates(self) -> List["Aggregate"]:
+        found = []
+        for child in self.children():
+            found.extend(child.aggregates())
+        return found
+
+
+class Literal(Expression):
+    def __init__(self, value: Any):
+        self.value = value
+
+    def evaluate(self, df, ctx):
+        return self.value
+
+    def to_sql(self, dialect):
+        if self.value is None:
+            return "NULL"
+        if isinstance(self.value, str):
+            return "'" + self.value.replace("'", "''") + "'"
+        return repr(self.value)
+
+
+class Column(Expression):
+    def __init__(self, name: str):
+        self.name = name
+
+    def columns(self):
+        return {self.name}
+
+    def evaluate(self, df, ctx):
+        if self.name in df.columns:
+            return df[self.name]
+        # SQL Server identifiers are case-insensitive
+        for column in df.columns:
+            if str(column).lower() == self.name.lower():
+                return df[column]
+        raise ExpressionError(f"Unknown column '{self.name}'")
+
+    def to_sql(self, dialect):
+        return quote_identifier(self.name, dialect)
+
+
+# % truncates towards zero like SQL's, not Python's floored modulo
+_ARITHMETIC = {"+": operator.add, "-": operator.sub, "*": operator.mul, "/": operator.truediv, "%": np.fmod}
+_FLOAT_TYPES = {"mssql": "FLOAT", "postgres": "DOUBLE PRECISION"}
+_COMPARISONS = {
+    "=": operator.eq, "<>": operator.ne, "!=": operator.ne,
+    "<": operator.lt, "<=": operator.le, ">": operator.gt, ">=": operator.ge,
+}
+
+
+class Binary(Expression):
+    def __init__(self, op: str, left: Expression, right: Expression):
+        self.op, self.left, self.right = op, left, right
+        self.predicate = op in _COMPARISONS or op in ("AND", "OR")
+
+    def children(self):
+        return [self.left, self.right]
+
+    def evaluate(self, df, ctx):
+        left = self.left.evaluate(df, ctx)
+        right = self.right.evaluate(df, ctx)
+        if self.op in _ARITHMETIC:
+            left, right = _arithmetic_operand(left), _arithmetic_operand(right)
+            if self.op in ("/", "%"):
+                # A zero divisor gives NULL rather than inf/NaN or an error
+                if isinstance(right, pd.Series):
+                    right = right.mask(right == 0)
+                elif not isinstance(right, str) and right == 0:
+                    right = None
+        if self.op in ("AND", "OR"):
+            left, right = _boolean(left), _boolean(right)
+            if isinstance(left, pd.Series) or isinstance(right, pd.Series):
+                left = pd.NA if left is None else left
+                right = pd.NA if right is None else right
+                return (left & right) if self.op == "AND" else (left | right)
+            # Kleene logic on scalars
+            if self.op == "AND":
+                return False if left is False or right is False else (None if None in (left, right) else True)
+            return True if left is True or right is True else (None if None in (left, right) else False)
+
+        series = left if isinstance(left, pd.Series) else right if isinstance(right, pd.Series) else None
+        if _is_null(left) or _is_null(right):
+            # NULL operand: the result is NULL for every row
+            return None if series is None else pd.Series(None, index=series.index, dtype=object)
+        if self.op in _COMPARISONS:
+            result = _COMPARISONS[self.op](_fold_case(left), _fold_case(right))
+            return _with_nulls(result, left, right)
+        return _ARITHMETIC[self.op](left, right)
+
+    def to_sql(self, dialect):
+        op = "<>" if self.op == "!=" else self.op
+        fold = self.op in _COMPARISONS and any(
+            isinstance(side, Literal) and isinstance(side.value, str) for side in (self.left, self.right)
+        )
+        left = _lower_sql(self.left.to_sql(dialect), dialect, fold)
+        right = _lower_sql(self.right.to_sql(dialect), dialect, fold)
+        if op == "/":
+            left = f"CAST({left} AS {_FLOAT_TYPES[dialect]})"
+        if op in ("/", "%"):
+            right = f"NULLIF({right}, 0)"
+        return f"({left} {op} {right})"
+
+
+class Not(Expression):
+    predicate = True
+
+    def __init__(self, operand: Expression):
+        self.operand = operand
+
+    def children(self):
+        return [self.operand]
+
+    def evaluate(self, df, ctx):
+        value = _boolean(self.operand.evaluate(df, ctx))
+        if isinstance(value, pd.Series):
+            return ~value
+        return None if value is None else not value
+
+    def to_sql(self, dialect):
+        return f"(NOT {self.operand.to_sql(dialect)})"
+
+
+class Negate(Expression):
+    def __init__(self, operand: Expression):
+        self.operand = operand
+
+    def children(self):
+        return [self.operand]
+
+    def evaluate(self, df, ctx):
+        value = self.operand.evaluate(df, ctx)
+        return None if _is_null(value) else -value
+
+    def to_sql(self, dialect):
+        return f"(-{self.operand.to_sql(dialect)})"
+
+
+class Like(Expression):
+    predicate = True
+
+    def __init__(self, operand: Expression, pattern: str, negated: bool = False):
+        self.operand, self.pattern, self.negated = operand, pattern, negated
+        # '%text%' is a plain substring test; anything else becomes a regex
+        inner = pattern[1:-1]
+        self._substring = (
+            inner if len(pattern) >= 2 and pattern[0] == pattern[-1] == "%" and not re.search(r"[%_\[]", inner)
+            else None
+        )
+        self._regex = "".join(
+            ".*" if char == "%" else "." if char == "_" else re.escape(char) for char in pattern
+        )
+
+    def children(self):
+        return [self.operand]
+
+    def evaluate(self, df, ctx):
+        value = _strings(self.operand.evaluate(df, ctx), df.index)
+        # Case-insensitive, like SQL Server's default collation
+        if self._substring is not None:
+            matched = value.str.contains(self._substring, case=False, regex=False)
+        else:
+            matched = value.str.fullmatch(self._regex, case=False)
+        matched = _with_nulls(matched.astype("boolean"), value)
+        return ~matched if self.negated else matched
+
+    def to_sql(self, dialect):
+        keyword = "ILIKE" if dialect == "postgres" else "LIKE"
+        negation = "NOT " if self.negated else ""
+        return f"({self.operand.to_sql(dialect)} {negation}{keyword} {Literal(self.pattern).to_sql(dialect)})"
+
+
+class In(Expression):
+    predicate = True
+
+    def __init__(self, operand: Expression, values: List[Expression], negated: bool = False):
+        self.operand, self.values, self.negated = operand, values, negated
+
+    def children(self):
+        return [self.operand] + self.values
+
+    def evaluate(self, df, ctx):
+        value = _broadcast(self.operand.evaluate(df, ctx), df.index)
+        options = [option.evaluate(df, ctx) for option in self.values]
+        if any(isinstance(option, pd.Series) for option in options):
+            raise ExpressionError("IN (...) only supports constant values")
+        options = [_fold_case(option) for option in options if not _is_null(option)]
+        matched = _with_nulls(_fold_case(value).isin(options), value)
+        return ~matched if self.negated else matched
+
+    def to_sql(self, dialect):
+        negation = "NOT " if self.negated else ""
+        fold = any(isinstance(option, Literal) and isinstance(option.value, str) for option in self.values)
+        options = ", ".join(_lower_sql(option.to_sql(dialect), dialect, fold) for option in self.values)
+        operand = _lower_sql(self.operand.to_sql(dialect), dialect, fold)
+        return f"({operand} {negation}IN ({options}))"
+
+
+class IsNull(Expression):
+    predicate = True
+
+    def __init__(self, operand: Expression, negated: bool = False):
+        self.operand, self.negated = operand, negated
+
+    def children(self):
+        return [self.operand]
+
+    def evaluate(self, df, ctx):
+        nulls = _null_mask(self.operand.evaluate(df, ctx))
+        if not self.negated:
+            return nulls
+        return ~nulls if isinstance(nulls, pd.Series) else not nulls
+
+    def to_sql(self, dialect):
+        return f"({self.operand.to_sql(dialect)} IS {'NOT ' if self.negated else ''}NULL)"
+
+
+class Case(Expression):
+    def __init__(self, whens: List[Tuple[Expression, Expression]], otherwise: Optional[Expression]):
+        self.whens = whens
+        self.otherwise = otherwise or Literal(None)
+
+    def children(self):
+        return [node for pair in self.whens for node in pair] + [self.otherwise]
+
+    def evaluate(self, df, ctx):
+        size = len(df)
+        conditions, choices = [], []
+        for condition, value in self.whens:
+            condition = _boolean(condition.evaluate(df, ctx))
+            if isinstance(condition, pd.Series):
+                # NULL (unknown) conditions fall through, as in SQL
+                conditions.append(condition.fillna(False).to_numpy(dtype=bool))
+            else:
+                conditions.append(np.full(size, bool(condition)))
+            choices.append(self._values(value.evaluate(df, ctx), size))
+        default = self.otherwise.evaluate(df, ctx)
+        if not conditions:
+            return default
+        result = np.select(conditions, choices, default=self._values(default, size))
+        return pd.Series(result, index=df.index)
+
+    @staticmethod
+    def _values(value: Any, size: int) -> np.ndarray:
+        if isinstance(value, pd.Series):
+            return value.to_numpy()
+        return np.full(size, value, dtype=object if isinstance(value, str) or _is_null(value) else None)
+
+    def to_sql(self, dialect):
+        parts = [f"WHEN {condition.to_sql(dialect)} THEN {value.to_sql(dialect)}" for condition, value in self.whens]
+        return f"CASE {' '.join(parts)} ELSE {self.otherwise.to_sql(dialect)} END"
+
+
+class Function(Expression):
+    """Scalar function call; date functions take their unit as the first argument"""
+
+    def __init__(self, name: str, args: List[Expression], unit: Optional[str] = None):
+        self.name, self.args, self.unit = name, args, unit
+
+    def children(self):
+        return self.args
+
+    def evaluate(self, df, ctx):
+        args = [arg.evaluate(df, ctx) for arg in self.args]
+        return _FUNCTIONS[self.name][2](self, df.index, ctx, *args)
+
+    def to_sql(self, dialect):
+        args = [arg.to_sql(dialect) for arg in self.args]
+        if dialect == "postgres":
+            if self.name == "NULLIF" and isinstance(self.args[1], Literal) and isinstance(self.args[1].value, str):
+                return f"(CASE WHEN LOWER({args[0]}) = LOWER({args[1]}) THEN NULL ELSE {args[0]} END)"
+            return _postgres_function(self.name, self.unit, args)
+        if self.name == "DATE":
+            return f"CAST({args[0]} AS DATE)"
+        if self.name in ("GETDATE", "GETUTCDATE"):
+            return f"{self.name}()"
+        if self.unit is not None:
+            args.insert(0, self.unit)
+        return f"{self.name}({', '.join(args)})"
+
+
+_AGGREGATE_FUNCTIONS = {
+    "COUNT": "count", "SUM": "sum", "AVG": "mean", "MIN": "min", "MAX": "max", "STDEV": "std", "VAR": "var",
+}
+_POSTGRES_AGGREGATES = {"STDEV": "STDDEV_SAMP", "VAR": "VAR_SAMP"}
+
+
+class Aggregate(Expression):
+    """Aggregate call; evaluates to its column in the grouped result"""
+
+    def __init__(self, name: str, arg: Optional[Expression], distinct: bool = False):
+        self.name, self.arg, self.distinct = name, arg, distinct
+        self.key = self.to_sql("mssql")
+
+    @property
+    def pandas_function(self) -> str:
+        if self.arg is None:
+            return "size"
+        return "nunique" if self.distinct else _AGGREGATE_FUNCTIONS[self.name]
+
+    def children(self):
+        return []
+
+    def aggregates(self):
+        return [self]
+
+    def evaluate(self, df, ctx):
+        slot = ctx.aggregates.get(self.key)
+        if slot is None:
+            raise ExpressionError(f"Aggregate {self.key} is only allowed in aggregations")
+        return df[slot]
+
+    def to_sql(self, dialect):
+        name = _POSTGRES_AGGREGATES.get(self.name, self.name) if dialect == "postgres" else self.name
+        if self.arg is None:
+            return f"{name}(*)"
+        arg = self.arg.to_sql(dialect)
+        if name == "AVG" and dialect == "mssql":
+            # SQL Server averages integers as integers; pandas as floats
+            arg = f"CAST({arg} AS FLOAT)"
+        return f"{name}({'DISTINCT ' if self.distinct else ''}{arg})"
+
+
+# ===== Scalar functions =====
+
+def _substring(node, index, ctx, value, start, length):
+    value = _strings(value, index)
+    # SQL positions are 1-based; a start before 1 shortens the result
+    begin = np.maximum(start - 1, 0)
+    stop = np.maximum(start - 1 + length, 0)
+    if not isinstance(begin, pd.Series) and not isinstance(stop, pd.Series):
+        if _is_null(begin) or _is_null(stop):
+            return pd.Series(None, index=index, dtype=object)
+        return value.str.slice(int(begin), int(stop))
+    begin, stop = _broadcast(begin, index), _broadcast(stop, index)
+    return pd.Series([
+        text[int(b):int(e)] if isinstance(text, str) and not _is_null(b) and not _is_null(e) else None
+        for text, b, e in zip(value, begin, stop)
+    ], index=index, dtype=object)
+
+
+def _charindex(node, index, ctx, needle, haystack):
+    haystack = _strings(haystack, index).str.lower()
+    if isinstance(needle, pd.Series):
+        return pd.Series([
+            text.find(str(sub).lower()) + 1 if isinstance(text, str) and isinstance(sub, str) else None
+            for sub, text in zip(needle, haystack)
+        ], index=index, dtype=object)
+    if _is_null(needle):
+        return pd.Series(None, index=index, dtype=object)
+    return haystack.str.find(str(needle).lower()) + 1
+
+
+def _string_method(method: str, *args):
+    def apply(node, index, ctx, value):
+        return getattr(_strings(value, index).str, method)(*args)
+    return apply
+
+
+def _concat(node, index, ctx, *values):
+    # CONCAT treats NULL as an empty string
+    result = _strings(values[0], index).fillna("")
+    for value in values[1:]:
+        result = result + _strings(value, index).fillna("")
+    return result
+
+
+def _coalesce(node, index, ctx, *values):
+    result = _broadcast(values[0], index)
+    for value in values[1:]:
+        result = result.where(result.notna(), value)
+    return result
+
+
+def _nullif(node, index, ctx, value, other):
+    value = _broadcast(value, index)
+    return value.mask(_fold_case(value) == _fold_case(other))
+
+
+def _round(node, index, ctx, value, digits=0):
+    # SQL Server rounds half away from zero (NumPy rounds half to even)
+    value = _numbers(value)
+    if value is None:
+        return None
+    scale = 10.0 ** digits
+    return np.sign(value) * np.floor(np.abs(value) * scale + 0.5) / scale
+
+
+def _numeric(function, value):
+    value = _numbers(value)
+    return None if value is None else function(value)
+
+
+def _datediff(node, index, ctx, start, end):
+    start, end = _timestamps(start), _timestamps(end)
+    unit = node.unit
+    if unit in ("day", "hour", "minute", "second"):
+        return (_floor(end, unit) - _floor(start, unit)) / pd.Timedelta(**{f"{unit}s": 1})
+    if unit == "week":
+        return (_week_start(end) - _week_start(start)) / pd.Timedelta(days=7)
+    years = _part(end, "year") - _part(start, "year")
+    if unit == "year":
+        return years
+    if unit == "quarter":
+        return years * 4 + _part(end, "quarter") - _part(start, "quarter")
+    return years * 12 + _part(end, "month") - _part(start, "month")
+
+
+def _dateadd(node, index, ctx, amount, value):
+    value = _timestamps(value)
+    unit = node.unit
+    if unit in ("day", "hour", "minute", "second", "week"):
+        return value + amount * pd.Timedelta(**{f"{unit}s": 1})
+    if isinstance(amount, pd.Series):
+        raise ExpressionError(f"DATEADD({unit}, ...) needs a constant amount")
+    months = int(amount) * {"year": 12, "quarter": 3, "month": 1}[unit]
+    return value + pd.DateOffset(months=months)
+
+
+def _datepart(node, index, ctx, value):
+    if node.unit == "week":
+        raise ExpressionError("DATEPART(week, ...) is not supported")
+    return _part(_timestamps(value), node.unit)
+
+
+def _now(node, index, ctx):
+    return ctx.now
+
+
+# Name -> (min args, max args, implementation)
+_FUNCTIONS = {
+    "SUBSTRING": (3, 3, _substring),
+    "CHARINDEX": (2, 2, _charindex),
+    "LEN": (1, 1, lambda node, index, ctx, value: _strings(value, index).str.rstrip(" ").str.len()),
+    "LOWER": (1, 1, _string_method("lower")),
+    "UPPER": (1, 1, _string_method("upper")),
+    "TRIM": (1, 1, _string_method("strip", " ")),
+    "LTRIM": (1, 1, _string_method("lstrip", " ")),
+    "RTRIM": (1, 1, _string_method("rstrip", " ")),
+    "CONCAT": (2, None, _concat),
+    "COALESCE": (1, None, _coalesce),
+    "ISNULL": (2, 2, _coalesce),
+    "NULLIF": (2, 2, _nullif),
+    "ABS": (1, 1, lambda node, index, ctx, value: _numeric(np.abs, value)),
+    "ROUND": (1, 2, _round),
+    "FLOOR": (1, 1, lambda node, index, ctx, value: _numeric(np.floor, value)),
+    "CEILING": (1, 1, lambda node, index, ctx, value: _numeric(np.ceil, value)),
+    "DATEDIFF": (2, 2, _datediff),
+    "DATEADD": (2, 2, _dateadd),
+    "DATEPART": (1, 1, _datepart),
+    "GETDATE": (0, 0, _now),
+    "GETUTCDATE": (0, 0, _now),
+    "DATE": (1, 1, lambda node, index, ctx, value: _floor(_timestamps(value), "day")),
+    "YEAR": (1, 1, lambda node, index, ctx, value: _part(_timestamps(value), "year")),
+    "MONTH": (1, 1, lambda node, index, ctx, value: _part(_timestamps(value), "month")),
+    "DAY": (1, 1, lambda node, index, ctx, value: _part(_timestamps(value), "day")),
+}
+_UNIT_FUNCTIONS = ("DATEDIFF", "DATEADD", "DATEPART")
+_POSTGRES_RENAMES = {"SUBSTRING": "SUBSTR", "ISNULL": "COALESCE"}
+
+
+def _postgres_function(name: str, unit: Optional[str], args: List[str]) -> str:
+    if name == "LEN":
+        return f"LENGTH(RTRIM({args[0]}))"
+    if name == "CHARINDEX":
+        return f"STRPOS(LOWER({args[1]}), LOWER({args[0]}))"
+    if name == "GETDATE":
+        return "LOCALTIMESTAMP"
+    if name == "GETUTCDATE":
+        return "(NOW() AT TIME ZONE 'UTC')"
+    if name == "DATE":
+        return f"CAST({args[0]} AS DATE)"
+    if name in ("YEAR", "MONTH", "DAY"):
+        return f"CAST(EXTRACT({name} FROM {args[0]}) AS INTEGER)"
+    if name == "DATEPART":
+        return f"CAST(EXTRACT({unit.upper()} FROM {args[0]}) AS INTEGER)"
+    if name == "DATEADD":
+        interval = {"quarter": "3 months", "week": "7 days"}.get(unit, f"1 {unit}")
+        return f"({args[1]} + ({args[0]}) * INTERVAL '{interval}')"
+    if name == "DATEDIFF":
+        if unit == "day":
+            return f"(CAST({args[1]} AS DATE) - CAST({args[0]} AS DATE))"
+        if unit == "year":
+            return f"CAST(EXTRACT(YEAR FROM {args[1]}) - EXTRACT(YEAR FROM {args[0]}) AS INTEGER)"
+        raise PushdownUnsupported(f"DATEDIFF({unit}, ...) has no PostgreSQL translation")
+    return f"{_POSTGRES_RENAMES.get(name, name)}({', '.join(args)})"
+
+
+def _value_sql(expression: Expression, dialect: str) -> str:
+    """SQL for an expression selected as a column value"""
+    sql = expression.to_sql(dialect)
+    if expression.predicate and dialect == "mssql":
+        # T-SQL predicates aren't values; NULL when unknown, as in pandas
+        return f"CASE WHEN {sql} THEN 1 WHEN NOT {sql} THEN 0 END"
+    return sql
+
+
+def quote_identifier(name: str, dialect: str = "mssql", always: bool = False) -> str:
+    if not always and re.fullmatch(r"[A-Za-z_][\w]*", name):
+        return name
+    return f'"{name}"' if dialect == "postgres" else f"[{name}]"
+
+
+# ===== Parser =====
+
+class _Parser:
+    """Recursive descent parser for SQL Server scalar expressions"""
+
+    def __init__(self, text: str):
+        self.text = text
+        self.tokens = _tokenize(text)
+        self.position = 0
+
+    def peek(self, offset: int = 0) -> _Token:
+        return self.tokens[min(self.position + offset, len(self.tokens) - 1)]
+
+    def advance(self) -> _Token:
+        token = self.peek()
+        self.position += 1
+        return token
+
+    def at_keyword(self, *keywords: str) -> bool:
+        return self.peek().keyword in keywords
+
+    def accept_keyword(self, keyword: str) -> bool:
+        if self.at_keyword(keyword):
+            self.position += 1
+            return True
+        return False
+
+    def accept_op(self, op: str) -> bool:
+        token = self.peek()
+        if token.kind == "op" and token.value == op:
+            self.position += 1
+            return True
+        return False
+
+    def expect_keyword(self, keyword: str):
+        if not self.accept_keyword(keyword):
+            self.error(f"expected {keyword}")
+
+    def expect_op(self, op: str):
+        if not self.accept_op(op):
+            self.error(f"expected '{op}'")
+
+    def error(self, message: str):
+        token = self.peek()
+        found = "end of expression" if token.kind == "end" else repr(token.value)
+        raise ExpressionError(f"{message}, found {found} in {self.text!r}")
+
+    def parse(self) -> Tuple[Expression, Optional[str]]:
+        expression = self.parse_or()
+        alias = None
+        if self.accept_keyword("AS"):
+            token = self.advance()
+            if token.kind != "name":
+                self.error("expected alias after AS")
+            alias = token.value
+        if self.peek().kind != "end":
+            self.error("unexpected token")
+        return expression, alias
+
+    def parse_or(self) -> Expression:
+        expression = self.parse_and()
+        while self.accept_keyword("OR"):
+            expression = Binary("OR", expression, self.parse_and())
+        return expression
+
+    def parse_and(self) -> Expression:
+        expression = self.parse_not()
+        while self.accept_keyword("AND"):
+            expression = Binary("AND", expression, self.parse_not())
+        return expression
+
+    def parse_not(self) -> Expression:
+        if self.accept_keyword("NOT"):
+            return Not(self.parse_not())
+        return self.parse_predicate()
+
+    def parse_predicate(self) -> Expression:
+        left = self.parse_additive()
+        token = self.peek()
+        if token.kind == "op" and token.value in _COMPARISONS:
+            self.advance()
+            return Binary(token.value, left, self.parse_additive())
+        if self.accept_keyword("IS"):
+            negated = self.accept_keyword("NOT")
+            self.expect_keyword("NULL")
+            return IsNull(left, negated)
+        negated = self.accept_keyword("NOT")
+        if self.accept_keyword("LIKE"):
+            pattern = self.advance()
+            if pattern.kind != "string":
+                self.error("LIKE needs a string pattern")
+            return Like(left, pattern.value, negated)
+        if self.accept_keyword("IN"):
+            self.expect_op("(")
+            values = [self.parse_additive()]
+            while self.accept_op(","):
+                values.append(self.parse_additive())
+            self.expect_op(")")
+            return In(left, values, negated)
+        if self.accept_keyword("BETWEEN"):
+            low = self.parse_additive()
+            self.expect_keyword("AND")
+            between = Binary("AND", Binary(">=", left, low), Binary("<=", left, self.parse_additive()))
+            return Not(between) if negated else between
+        if negated:
+            self.error("expected LIKE, IN or BETWEEN after NOT")
+        return left
+
+    def parse_additive(self) -> Expression:
+        expression = self.parse_term()
+        while self.peek().kind == "op" and self.peek().value in ("+", "-"):
+            expression = Binary(self.advance().value, expression, self.parse_term())
+        return expression
+
+    def parse_term(self) -> Expression:
+        expression = self.parse_unary()
+        while self.peek().kind == "op" and self.peek().value in ("*", "/", "%"):
+            expression = Binary(self.advance().value, expression, self.parse_unary())
+        return expression
+
+    def parse_unary(self) -> Expression:
+        if self.accept_op("-"):
+            operand = self.parse_unary()
+            if isinstance(operand, Literal) and isinstance(operand.value, (int, float)):
+                return Literal(-operand.value)
+            return Negate(operand)
+        if self.accept_op("+"):
+            return self.parse_unary()
+        return self.parse_primary()
+
+    def parse_primary(self) -> Expression:
+        token = self.advance()
+        if token.kind in ("number", "string"):
+            return Literal(token.value)
+        if token.kind == "op" and token.value == "(":
+            expression = self.parse_or()
+            self.expect_op(")")
+            return expression
+        if token.kind != "name":
+            self.position -= 1
+            self.error("expected a value")
+
+        if token.keyword == "NULL":
+            return Literal(None)
+        if token.keyword == "CASE":
+            return self.parse_case()
+        if token.keyword == "CURRENT_TIMESTAMP":
+            return Function("GETDATE", [])
+        if self.accept_op("("):
+            return self.parse_call(token)
+
+        name = token.value
+        # table.column: the source is a single frame, keep the column name
+        while self.accept_op("."):
+            part = self.advance()
+            if part.kind != "name":
+                self.error("expected column name after '.'")
+            name = part.value
+        return Column(name)
+
+    def parse_case(self) -> Expression:
+        # Simple CASE x WHEN v ... is rewritten as CASE WHEN x = v ...
+        subject = None if self.at_keyword("WHEN") else self.parse_additive()
+        whens = []
+        while self.accept_keyword("WHEN"):
+            condition = self.parse_or()
+            if subject is not None:
+                condition = Binary("=", subject, condition)
+            self.expect_keyword("THEN")
+            whens.append((condition, self.parse_or()))
+        if not whens:
+            self.error("expected WHEN")
+        otherwise = self.parse_or() if self.accept_keyword("ELSE") else None
+        self.expect_keyword("END")
+        return Case(whens, otherwise)
+
+    def parse_call(self, token: _Token) -> Expression:
+        name = token.keyword or token.value.upper()
+        if name in _AGGREGATE_FUNCTIONS:
+            if name == "COUNT" and self.accept_op("*"):
+                self.expect_op(")")
+                return Aggregate(name, None)
+            distinct = self.accept_keyword("DISTINCT")
+            arg = self.parse_or()
+            self.expect_op(")")
+            if arg.aggregates():
+                raise ExpressionError(f"Nested aggregate in {self.text!r}")
+            return Aggregate(name, arg, distinct)
+
+        if name not in _FUNCTIONS:
+            raise ExpressionError(f"Unsupported function {name}() in {self.text!r}")
+        unit = None
+        if name in _UNIT_FUNCTIONS:
+            unit_token = self.advance()
+            unit = _DATE_UNITS.get(str(unit_token.value).lower()) if unit_token.kind == "name" else None
+            if unit is None:
+                self.position -= 1
+                self.error(f"expected a date part for {name}")
+            if not self.accept_op(","):
+                self.expect_op(")")
+
+        args = []
+        if not self.accept_op(")"):
+            args.append(self.parse_or())
+            while self.accept_op(","):
+                args.append(self.parse_or())
+            self.expect_op(")")
+
+        minimum, maximum, _ = _FUNCTIONS[name]
+        if len(args) < minimum or (maximum is not None and len(args) > maximum):
+            raise ExpressionError(f"Wrong number of arguments for {name}() in {self.text!r}")
+        return Function(name, args, unit)
+
+
+@lru_cache(maxsize=1024)
+def _parse(text: str) -> Tuple[Expression, Optional[str]]:
+    return _Parser(text).parse()
+
+
+def compile_expression(text: str) -> Expression:
+    """Parse an expression (cached per distinct text)"""
+    expression, alias = _parse(text)
+    if alias is not None:
+        raise ExpressionError(f"Unexpected alias in {text!r}")
+    return expression
+
+
+def compile_named(text: str) -> Tuple[str, Expression]:
+    """Parse `expr [AS alias]`; unaliased expressions are named after their text"""
+    expression, alias = _parse(text)
+    if alias is None:
+        alias = expression.name if isinstance(expression, Column) else re.sub(r"\W+", "_", text).strip("_").lower()
+    return alias, expression
+
+
+# ===== Step plans =====
+
+class EnrichPlan:
+    """Compiled ENRICH add_columns; later columns may use earlier ones"""
+
+    def __init__(self, add_columns: Dict[str, str]):
+        self.columns: List[Tuple[str, Expression]] = []
+        for name, text in add_columns.items():
+            expression = compile_expression(text)
+            if expression.aggregates():
+                raise ExpressionError(f"Aggregates are not allowed in add_columns ({name})")
+            self.columns.append((name, expression))
+
+    def apply(self, df: pd.DataFrame, now: Optional[datetime] = None) -> pd.DataFrame:
+        ctx = EvaluationContext(now)
+        for name, expression in self.columns:
+            df[name] = expression.evaluate(df, ctx)
+        return df
+
+    def pushdown(self, source_query: str, dialect: str = "mssql") -> str:
+        """Source query that also computes the new columns"""
+        added: Set[str] = set()
+        selected = []
+        for name, expression in self.columns:
+            if expression.columns() & added:
+                raise PushdownUnsupported(f"{name} uses a column added in the same step")
+            selected.append(f"{_value_sql(expression, dialect)} AS {quote_identifier(name, dialect, always=True)}")
+            added.add(name)
+        return f"SELECT src.*, {', '.join(selected)} FROM ({source_query}) AS src"
+
+
+class AggregatePlan:
+    """Compiled AGGREGATE group_by and aggregations"""
+
+    def __init__(self, group_by: List[str], aggregations: Dict[str, str]):
+        self.keys = [compile_named(text) for text in group_by]
+        self.outputs = [(name, compile_expression(text)) for name, text in aggregations.items()]
+
+        key_names = {name for name, _ in self.keys}
+        for name, expression in self.keys:
+            if expression.aggregates():
+                raise ExpressionError(f"Aggregates are not allowed in group_by ({name})")
+        # Each distinct aggregate call is computed once, into its own slot column
+        self.slots: Dict[str, str] = {}
+        self.aggregates: List[Tuple[str, Aggregate]] = []
+        for name, expression in self.outputs:
+            ungrouped = expression.columns() - key_names
+            if ungrouped:
+                raise ExpressionError(
+                    f"{name} uses {', '.join(sorted(ungrouped))} outside an aggregate and not in group_by"
+                )
+            for aggregate in expression.aggregates():
+                if aggregate.key not in self.slots:
+                    slot = f"__agg{len(self.slots)}"
+                    self.slots[aggregate.key] = slot
+                    self.aggregates.append((slot, aggregate))
+
+    def apply(self, df: pd.DataFrame, now: Optional[datetime] = None) -> pd.DataFrame:
+        ctx = EvaluationContext(now, self.slots)
+        key_names = [name for name, _ in self.keys]
+        work = {name: _broadcast(expression.evaluate(df, ctx), df.index) for name, expression in self.keys}
+        for slot, aggregate in self.aggregates:
+            if aggregate.arg is not None:
+                work[slot] = _broadcast(aggregate.arg.evaluate(df, ctx), df.index)
+        if not key_names:
+            work["__all"] = pd.Series(0, index=df.index)
+        work = pd.DataFrame(work, index=df.index)
+        group_columns = key_names or ["__all"]
+
+        if self.aggregates:
+            # SQL GROUP BY keeps NULL keys and doesn't sort
+            grouped = work.groupby(group_columns, dropna=False, sort=False, observed=True)
+            named = {
+                slot: (slot if aggregate.arg is not None else group_columns[0], aggregate.pandas_function)
+                for slot, aggregate in self.aggregates
+            }
+            # SUM over only NULLs is NULL in SQL, 0 in pandas
+            sums = [slot for slot, aggregate in self.aggregates if aggregate.name == "SUM"]
+            named.update({f"{slot}_count": (slot, "count") for slot in sums})
+            result = grouped.agg(**named).reset_index()
+            for slot in sums:
+                result[slot] = result[slot].mask(result.pop(f"{slot}_count") == 0)
+        else:
+            result = work[group_columns].drop_duplicates().reset_index(drop=True)
+
+        output = result[key_names].copy()
+        for name, expression in self.outputs:
+            output[name] = expression.evaluate(result, ctx)
+        return output
+
+    def pushdown(self, source_query: str, dialect: str = "mssql") -> str:
+        """Source query that performs the aggregation"""
+        keys = [(name, _value_sql(expression, dialect)) for name, expression in self.keys]
+        selected = [f"{sql} AS {quote_identifier(name, dialect, always=True)}" for name, sql in keys]
+        selected += [
+            f"{_value_sql(expression, dialect)} AS {quote_identifier(name, dialect, always=True)}"
+            for name, expression in self.outputs
+        ]
+        query = f"SELECT {', '.join(selected)} FROM ({source_query}) AS src"
+        if keys:
+            query += f" GROUP BY {', '.join(sql for _, sql in keys)}"
+        return query
@@ -725,6 +725,7 @@ async def health_check():
 # Document upload endpoint
 @app.post("/documents/upload", response_model=DocumentUploadResponse)
 @monitor_performance(threshold=2.0)  # Fixed: only takes threshold parameter
+@cache_invalidate(tags=[CacheKeys.USER_DOCUMENTS])
 async def upload_document(
     file: UploadFile = File(...),
     user_id: str = Depends(get_current_user),
@@ -879,6 +880,7 @@ async def upload_document(
 # Batch upload endpoint
 @app.post("/documents/batch-upload", response_model=BatchUploadResponse)
 @monitor_performance(threshold=2.0)
+@cache_invalidate(tags=[CacheKeys.USER_DOCUMENTS])
 async def batch_upload_documents(
     files: List[UploadFile] = File(..., description="Multiple files to upload (10-15 documents)"),
     user_id: str = Depends(get_current_user),
@@ -1119,7 +1121,7 @@ async def get_document_status(
 
 # List user documents endpoint
 @app.get("/documents")
-@cache_result(ttl=300, key_prefix="user_documents")  # Cache for 5 minutes
+@cache_result(ttl=300, key_prefix="user_documents", tags=[CacheKeys.USER_DOCUMENTS])  # Cache for 5 minutes
 async def list_user_documents(
     user_id: str = Depends(get_current_user),
     status: Optional[str] = None,
@@ -1185,6 +1187,8 @@ async def delete_document(
             except Exception as e:
                 logger.warning(f"Could not delete from local storage: {e}")
         
+        await cache_service.invalidate_tags(CacheKeys.USER_DOCUMENTS.format(user_id=user_id))
+        
         return {
             "message": "Document deleted successfully",
             "document_id": document_id
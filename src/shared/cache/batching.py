@@ -0,0 +1,104 @@
+"""
+Request Batching
+Coalesces concurrent single-key lookups into one multi-key fetch
+
+Used by RedisCacheService.get so that N concurrent gets (e.g. a dashboard
+endpoint fanning out with asyncio.gather) become one pipelined MGET instead
+of N round-trips, and by OpenAIService.generate_embeddings to send
+concurrent single-text calls as one multi-input embeddings request.
+"""
+
+import asyncio
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+
+class GetBatcher:
+    """
+    Collects keys requested within a short window and loads them together
+
+    With window=0 the batch is flushed on the next event-loop iteration, so
+    lookups issued in the same tick are coalesced without adding latency.
+    Not thread-safe: meant to be used from the event loop only.
+    """
+
+    def __init__(
+        self,
+        fetch_many: Callable[[List[str]], Awaitable[Dict[str, Any]]],
+        window: float = 0.0,
+        max_batch_size: int = 100
+    ):
+        """
+        Args:
+            fetch_many: Coroutine function mapping a list of keys to {key: value}
+            window: Seconds to wait for more keys before flushing
+            max_batch_size: Flush immediately once this many distinct keys are pending
+        """
+        self.fetch_many = fetch_many
+        self.window = window
+        self.max_batch_size = max_batch_size
+        # key -> futures waiting on it
+        self._pending: Dict[str, List[asyncio.Future]] = {}
+        self._flush_handle: Optional[asyncio.Handle] = None
+        self._tasks = set()
+
+        self.requests = 0
+        self.batches = 0
+        self.keys_fetched = 0
+
+    async def load(self, key: str) -> Any:
+        """Queue a key for the next batch and wait for its value (None if absent)"""
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._pending.setdefault(key, []).append(future)
+        self.requests += 1
+
+        if len(self._pending) >= self.max_batch_size:
+            self._flush()
+        elif self._flush_handle is None:
+            if self.window > 0:
+                self._flush_handle = loop.call_later(self.window, self._flush)
+            else:
+                self._flush_handle = loop.call_soon(self._flush)
+        return await future
+
+    def _flush(self):
+        """Hand the pending keys to a fetch task"""
+        if self._flush_handle is not None:
+            self._flush_handle.cancel()
+            self._flush_handle = None
+        if not self._pending:
+            return
+
+        batch, self._pending = self._pending, {}
+        task = asyncio.ensure_future(self._run(batch))
+        # Keep a reference so the task isn't garbage collected mid-flight
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def _run(self, batch: Dict[str, List[asyncio.Future]]):
+        self.batches += 1
+        self.keys_fetched += len(batch)
+        try:
+            values = await self.fetch_many(list(batch))
+        except Exception as e:
+            for futures in batch.values():
+                for future in futures:
+                    if not future.done():
+                        future.set_exception(e)
+            return
+
+        for key, futures in batch.items():
+            value = values.get(key)
+            for future in futures:
+                if not future.done():
+                    future.set_result(value)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get batching statistics"""
+        return {
+            "requests": self.requests,
+            "batches": self.batches,
+            "keys_fetched": self.keys_fetched,
+            "avg_batch_size": round(self.keys_fetched / self.batches, 2) if self.batches else 0.0,
+            "round_trips_saved": self.requests - self.batches
+        }
@@ -0,0 +1,293 @@
+"""
+Cache Codecs
+Pluggable serialization and compression for values stored in Redis
+
+Encoded values carry a 4-byte header (magic, serializer id, compressor id,
+flags), so any codec can decode any value regardless of which profile wrote
+it. Values without the header are plain JSON (legacy entries and the "json"
+profile) and are decoded with json.loads.
+
+Profiles:
+- json:    plain JSON text, readable by non-Python consumers (lossy for datetimes)
+- fast:    orjson/msgpack, no compression; for small hot keys
+- compact: orjson/msgpack plus zstd/lz4/zlib above a size threshold; for large payloads
+
+fast and compact are type-preserving: datetime, date, time, Decimal, set
+and bytes values round-trip as their original types. UUIDs do too with the
+msgpack and json serializers; orjson writes them natively as strings, so
+with orjson they decode as str. Values a binary serializer rejects (e.g.
+ints wider than 64 bits) are written with the json serializer instead.
+"""
+
+import base64
+import json
+import logging
+import os
+import zlib
+from datetime import date, datetime, time
+from decimal import Decimal
+from typing import Any, Callable, Dict, Optional, Tuple
+from uuid import UUID
+
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
+try:
+    import msgpack
+    MSGPACK_AVAILABLE = True
+except ImportError:
+    MSGPACK_AVAILABLE = False
+
+try:
+    import zstandard
+    ZSTD_AVAILABLE = True
+except ImportError:
+    ZSTD_AVAILABLE = False
+
+try:
+    import lz4.frame
+    LZ4_AVAILABLE = True
+except ImportError:
+    LZ4_AVAILABLE = False
+
+logger = logging.getLogger(__name__)
+
+# 0xFF never starts UTF-8 JSON text, so headered values can't be confused with legacy ones
+MAGIC = 0xFF
+HEADER_SIZE = 4
+FLAG_TYPED = 0x01
+
+# Key of the envelope used for types the serializers can't represent natively
+TYPE_FIELD = "__cache_type__"
+
+SERIALIZER_IDS = {"json": 1, "orjson": 2, "msgpack": 3}
+COMPRESSOR_IDS = {"none": 0, "zlib": 1, "zstd": 2, "lz4": 3}
+
+
+# ===== TYPE-PRESERVING ENVELOPE =====
+
+def _wrap_type(obj: Any, binary: bool) -> Any:
+    """Envelope for a value the serializer can't represent natively"""
+    if isinstance(obj, datetime):
+        return {TYPE_FIELD: "datetime", "value": obj.isoformat()}
+    if isinstance(obj, date):
+        return {TYPE_FIELD: "date", "value": obj.isoformat()}
+    if isinstance(obj, time):
+        return {TYPE_FIELD: "time", "value": obj.isoformat()}
+    if isinstance(obj, Decimal):
+        return {TYPE_FIELD: "decimal", "value": str(obj)}
+    if isinstance(obj, UUID):
+        return {TYPE_FIELD: "uuid", "value": str(obj)}
+    if isinstance(obj, (set, frozenset)):
+        return {TYPE_FIELD: "set", "value": list(obj)}
+    if isinstance(obj, (bytes, bytearray, memoryview)) and not binary:
+        return {TYPE_FIELD: "bytes", "value": base64.b64encode(bytes(obj)).decode("ascii")}
+    return None
+
+
+_TYPE_DECODERS: Dict[str, Callable[[Any], Any]] = {
+    "datetime": datetime.fromisoformat,
+    "date": date.fromisoformat,
+    "time": time.fromisoformat,
+    "decimal": Decimal,
+    "uuid": UUID,
+    "set": set,
+    "bytes": base64.b64decode,
+}
+
+
+def _restore_types(obj: Any) -> Any:
+    """Replace type envelopes with the original values (only run when FLAG_TYPED is set)
+
+    Mutates the freshly decoded containers in place and only descends into
+    containers, which keeps the walk cheap for large payloads.
+    """
+    if isinstance(obj, dict):
+        type_name = obj.get(TYPE_FIELD)
+        if type_name is not None and len(obj) == 2:
+            decoder = _TYPE_DECODERS.get(type_name)
+            if decoder is not None:
+                value = obj["value"]
+                return decoder(_restore_types(value) if type_name == "set" else value)
+        for key, value in obj.items():
+            if isinstance(value, (dict, list)):
+                obj[key] = _restore_types(value)
+        return obj
+    if isinstance(obj, list):
+        for index, value in enumerate(obj):
+            if isinstance(value, (dict, list)):
+                obj[index] = _restore_types(value)
+        return obj
+    return obj
+
+
+# ===== SERIALIZERS =====
+
+def _dumps_json(value: Any, default: Callable) -> bytes:
+    return json.dumps(value, default=default, separators=(",", ":")).encode("utf-8")
+
+
+def _dumps_orjson(value: Any, default: Callable) -> bytes:
+    # Passthrough so datetimes reach `default` and round-trip with their type
+    return orjson.dumps(
+        value,
+        default=default,
+        option=orjson.OPT_PASSTHROUGH_DATETIME | orjson.OPT_NON_STR_KEYS
+    )
+
+
+def _dumps_msgpack(value: Any, default: Callable) -> bytes:
+    return msgpack.packb(value, default=default, use_bin_type=True)
+
+
+def _loads_msgpack(data: bytes) -> Any:
+    return msgpack.unpackb(data, raw=False, strict_map_key=False)
+
+
+_SERIALIZERS: Dict[str, Tuple[Callable[[Any, Callable], bytes], Callable[[bytes], Any]]] = {
+    "json": (_dumps_json, json.loads),
+}
+if ORJSON_AVAILABLE:
+    _SERIALIZERS["orjson"] = (_dumps_orjson, orjson.loads)
+if MSGPACK_AVAILABLE:
+    _SERIALIZERS["msgpack"] = (_dumps_msgpack, _loads_msgpack)
+
+
+# ===== COMPRESSORS =====
+
+_COMPRESSORS: Dict[str, Tuple[Callable[[bytes], bytes], Callable[[bytes], bytes]]] = {
+    "zlib": (lambda data: zlib.compress(data, 6), zlib.decompress),
+}
+if ZSTD_AVAILABLE:
+    _zstd_compressor = zstandard.ZstdCompressor(level=3)
+    _zstd_decompressor = zstandard.ZstdDecompressor()
+    _COMPRESSORS["zstd"] = (_zstd_compressor.compress, _zstd_decompressor.decompress)
+if LZ4_AVAILABLE:
+    _COMPRESSORS["lz4"] = (lz4.frame.compress, lz4.frame.decompress)
+
+_SERIALIZER_NAMES = {v: k for k, v in SERIALIZER_IDS.items()}
+_COMPRESSOR_NAMES = {v: k for k, v in COMPRESSOR_IDS.items()}
+
+
+def _resolve(requested: str, preference: Tuple[str, ...], available: Dict[str, Any], kind: str) -> str:
+    """Pick an available implementation; 'auto' takes the first available in preference order"""
+    if requested == "auto":
+        return next(name for name in preference if name in available)
+    if requested not in available:
+        fallback = next(name for name in preference if name in available)
+        logger.warning(f"Cache {kind} '{requested}' not installed, using '{fallback}'")
+        return fallback
+    return requested
+
+
+# ===== CODECS =====
+
+class CacheCodec:
+    """Encodes values to bytes for Redis and back"""
+
+    def __init__(
+        self,
+        name: str,
+        serializer: str = "auto",
+        compression: Optional[str] = None,
+        compress_threshold: int = 1024,
+        headered: bool = True
+    ):
+        """
+        Args:
+            name: Profile name used in logs and stats
+            serializer: json, orjson, msgpack or auto (orjson > msgpack > json)
+            compression: zstd, lz4, zlib, auto (zstd > lz4 > zlib) or None
+            compress_threshold: Minimum encoded size in bytes before compressing
+            headered: False writes plain JSON text with no header (json profile only)
+        """
+        self.name = name
+        self.serializer = _resolve(serializer, ("orjson", "msgpack", "json"), _SERIALIZERS, "serializer")
+        self.compression = (
+            _resolve(compression, ("zstd", "lz4", "zlib"), _COMPRESSORS, "compressor")
+            if compression else None
+        )
+        self.compress_threshold = compress_threshold
+        self.headered = headered
+        self._dumps = _SERIALIZERS[self.serializer][0]
+
+    def encode(self, value: Any) -> bytes:
+        """Serialize (and maybe compress) a value"""
+        if not self.headered:
+            return json.dumps(value, default=str).encode("utf-8")
+
+        typed = False
+        binary = self.serializer == "msgpack"
+
+        def default(obj: Any) -> Any:
+            nonlocal typed
+            wrapped = _wrap_type(obj, binary)
+            if wrapped is None:
+                return str(obj)
+            typed = True
+            return wrapped
+
+        serializer = self.serializer
+        try:
+            payload = self._dumps(value, default)
+        except (TypeError, OverflowError):
+            if serializer == "json":
+                raise
+            # orjson/msgpack reject e.g. ints wider than 64 bits; stdlib json doesn't
+            typed = False
+            serializer = "json"
+            payload = _dumps_json(value, default)
+        compressor_id = COMPRESSOR_IDS["none"]
+        if self.compression and len(payload) >= self.compress_threshold:
+            compressed = _COMPRESSORS[self.compression][0](payload)
+            if len(compressed) < len(payload):
+                payload = compressed
+                compressor_id = COMPRESSOR_IDS[self.compression]
+
+        header = bytes((MAGIC, SERIALIZER_IDS[serializer], compressor_id, FLAG_TYPED if typed else 0))
+        return header + payload
+
+    def __repr__(self) -> str:
+        return f"CacheCodec({self.name!r}, serializer={self.serializer!r}, compression={self.compression!r})"
+
+
+def decode_value(data: Any) -> Any:
+    """Decode a value written by any codec (or legacy plain JSON)"""
+    if isinstance(data, str):
+        return json.loads(data)
+    if not data or data[0] != MAGIC:
+        return json.loads(data)
+
+    serializer = _SERIALIZER_NAMES.get(data[1])
+    compressor = _COMPRESSOR_NAMES.get(data[2])
+    if serializer not in _SERIALIZERS or compressor is None or (compressor != "none" and compressor not in _COMPRESSORS):
+        raise ValueError(f"Cache value encoded with unavailable codec ({serializer}/{compressor})")
+
+    payload = memoryview(data)[HEADER_SIZE:]
+    if compressor != "none":
+        payload = _COMPRESSORS[compressor][1](payload)
+    value = _SERIALIZERS[serializer][1](bytes(payload) if serializer != "orjson" else payload)
+    return _restore_types(value) if data[3] & FLAG_TYPED else value
+
+
+def _build_profiles() -> Dict[str, CacheCodec]:
+    threshold = int(os.getenv("CACHE_COMPRESS_THRESHOLD", "1024"))
+    return {
+        "json": CacheCodec("json", serializer="json", headered=False),
+        "fast": CacheCodec("fast"),
+        "compact": CacheCodec("compact", compression="auto", compress_threshold=threshold),
+    }
+
+
+CODEC_PROFILES: Dict[str, CacheCodec] = _build_profiles()
+
+
+def get_codec(name: str) -> CacheCodec:
+    """Get a codec profile by name (json, fast, compact)"""
+    try:
+        return CODEC_PROFILES[name]
+    except KeyError:
+        raise ValueError(f"Unknown cache codec '{name}'. Available: {', '.join(CODEC_PROFILES)}")
@@ -0,0 +1,339 @@
+"""
+LLM Response Cache
+Caches deterministic chat completion requests by a hash of the normalized request
+
+Requests with temperature <= LLM_CACHE_MAX_TEMPERATURE (default 0.1) are
+treated as deterministic: the key is a SHA-256 of the model, the messages
+(whitespace-normalized) and every other generation parameter. Requests with
+higher or unset temperature, streaming or n > 1 bypass the cache.
+
+Backends:
+- redis: shared across replicas through cache_service (TTL bounded)
+- disk:  one JSON file per entry under LLM_CACHE_DIR (TTL and entry-count bounded)
+
+Hits record the tokens, cost and latency the original call took. The totals
+are kept in a Redis hash (CacheKeys.LLM_CACHE_STATS) so the analytics
+service can report them across all replicas. Bypassed calls never touch
+Redis: they are counted locally and added to the shared hash with the
+next hit or miss (and not at all while the cache is disabled).
+"""
+
+import asyncio
+import hashlib
+import json
+import logging
+import os
+import re
+import time
+from pathlib import Path
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+from .redis_cache import cache_service, CacheKeys
+
+logger = logging.getLogger(__name__)
+
+# USD per 1K tokens (input, output)
+MODEL_PRICING = {
+    "gpt-4": (0.03, 0.06),
+    "gpt-4-turbo-preview": (0.01, 0.03),
+    "gpt-35-turbo": (0.0005, 0.0015),
+    "gpt-3.5-turbo": (0.0005, 0.0015),
+}
+
+# Parameters that don't change the completion and so stay out of the key
+_TRANSPORT_PARAMS = {"user", "timeout", "extra_headers", "extra_query", "extra_body"}
+
+_WHITESPACE = re.compile(r"\s+")
+
+
+def normalize_messages(messages: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """Collapse whitespace in message text so indentation changes don't miss the cache"""
+    normalized = []
+    for message in messages:
+        message = dict(message)
+        if isinstance(message.get("content"), str):
+            message["content"] = _WHITESPACE.sub(" ", message["content"]).strip()
+        normalized.append(message)
+    return normalized
+
+
+def request_key(model: str, params: Dict[str, Any]) -> str:
+    """Stable digest of a chat completion request"""
+    key_params = {k: v for k, v in params.items() if k not in _TRANSPORT_PARAMS and k != "messages"}
+    payload = {
+        "model": model,
+        "messages": normalize_messages(params.get("messages", [])),
+        "params": key_params,
+    }
+    return hashlib.sha256(json.dumps(payload, sort_keys=True, default=str).encode("utf-8")).hexdigest()
+
+
+def estimate_cost(model: str, prompt_tokens: int, completion_tokens: int) -> float:
+    """USD cost of a call at list prices (0 for unknown models)"""
+    input_price, output_price = MODEL_PRICING.get(model, (0.0, 0.0))
+    return (prompt_tokens * input_price + completion_tokens * output_price) / 1000
+
+
+# ===== BACKENDS =====
+
+class RedisLLMCacheBackend:
+    """Entries in Redis through the shared cache service"""
+
+    name = "redis"
+
+    async def get(self, digest: str) -> Optional[Dict[str, Any]]:
+        return await cache_service.get(CacheKeys.LLM_RESPONSE.format(digest=digest))
+
+    async def set(self, digest: str, entry: Dict[str, Any], ttl: int):
+        await cache_service.set(CacheKeys.LLM_RESPONSE.format(digest=digest), entry, ttl=ttl)
+
+
+class DiskLLMCacheBackend:
+    """Entries as JSON files; least recently used files are evicted beyond max_entries"""
+
+    name = "disk"
+
+    def __init__(self, directory: str, max_entries: int):
+        self.directory = Path(directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self.max_entries = max_entries
+        self._writes_since_evict = 0
+
+    async def get(self, digest: str) -> Optional[Dict[str, Any]]:
+        return await asyncio.to_thread(self._read, digest)
+
+    async def set(self, digest: str, entry: Dict[str, Any], ttl: int):
+        await asyncio.to_thread(self._write, digest, entry, ttl)
+
+    def _read(self, digest: str) -> Optional[Dict[str, Any]]:
+        path = self.directory / f"{digest}.json"
+        try:
+            with open(path) as f:
+                stored = json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError):
+            return None
+        if stored.get("expires_at", 0) < time.time():
+            path.unlink(missing_ok=True)
+            return None
+        # Mark as recently used for eviction
+        os.utime(path)
+        return stored["entry"]
+
+    def _write(self, digest: str, entry: Dict[str, Any], ttl: int):
+        path = self.directory / f"{digest}.json"
+        tmp_path = path.with_suffix(".tmp")
+        with open(tmp_path, "w") as f:
+            json.dump({"expires_at": time.time() + ttl, "entry": entry}, f, default=str)
+        os.replace(tmp_path, path)
+
+        # Listing the directory is O(entries), so only check the bound periodically
+        self._writes_since_evict += 1
+        if self._writes_since_evict >= max(1, self.max_entries // 20):
+            self._writes_since_evict = 0
+            self._evict()
+
+    def _evict(self):
+        files = list(self.directory.glob("*.json"))
+        excess = len(files) - self.max_entries
+        if excess <= 0:
+            return
+        files.sort(key=lambda path: path.stat().st_mtime)
+        for path in files[:excess]:
+            path.unlink(missing_ok=True)
+
+
+# ===== CACHE =====
+
+class LLMResponseCache:
+    """Read-through cache for deterministic chat completion calls"""
+
+    def __init__(
+        self,
+        backend: Optional[str] = None,
+        ttl: Optional[int] = None,
+        max_temperature: Optional[float] = None,
+        max_entry_bytes: Optional[int] = None
+    ):
+        """
+        Args:
+            backend: redis or disk (default: LLM_CACHE_BACKEND or redis)
+            ttl: Seconds entries live (default: LLM_CACHE_TTL or 7 days)
+            max_temperature: Highest temperature treated as deterministic (default: LLM_CACHE_MAX_TEMPERATURE or 0.1)
+            max_entry_bytes: Larger responses are not stored (default: LLM_CACHE_MAX_ENTRY_BYTES or 256 KB)
+        """
+        self.enabled = os.getenv("LLM_CACHE_ENABLED", "true").lower() == "true"
+        backend = backend or os.getenv("LLM_CACHE_BACKEND", "redis")
+        if backend == "disk":
+            self.backend = DiskLLMCacheBackend(
+                os.getenv("LLM_CACHE_DIR", "/tmp/document_storage/llm_cache"),
+                int(os.getenv("LLM_CACHE_MAX_ENTRIES", "10000"))
+            )
+        else:
+            self.backend = RedisLLMCacheBackend()
+        self.ttl = ttl or int(os.getenv("LLM_CACHE_TTL", "604800"))
+        self.max_temperature = (
+            max_temperature if max_temperature is not None
+            else float(os.getenv("LLM_CACHE_MAX_TEMPERATURE", "0.1"))
+        )
+        self.max_entry_bytes = max_entry_bytes or int(os.getenv("LLM_CACHE_MAX_ENTRY_BYTES", "262144"))
+
+        self._inflight: Dict[str, asyncio.Future] = {}
+        self._tasks = set()
+        # Bypasses not yet added to the shared counters
+        self._pending_bypasses = 0
+        self.stats = {
+            "hits": 0,
+            "misses": 0,
+            "bypassed": 0,
+            "coalesced": 0,
+            "tokens_saved": 0,
+            "cost_saved_usd": 0.0,
+            "latency_saved_ms": 0.0,
+        }
+
+    def is_cacheable(self, params: Dict[str, Any]) -> bool:
+        """Whether a request is deterministic enough to cache"""
+        temperature = params.get("temperature")
+        return (
+            self.enabled
+            and temperature is not None
+            and temperature <= self.max_temperature
+            and not params.get("stream")
+            and params.get("n", 1) == 1
+        )
+
+    async def get_or_call(
+        self,
+        model: str,
+        params: Dict[str, Any],
+        call: Callable[[], Awaitable[Any]],
+        serialize: Callable[[Any], Dict[str, Any]],
+        deserialize: Callable[[Dict[str, Any]], Any]
+    ) -> Any:
+        """
+        Return a cached response for the request, or make the call and cache it
+
+        Args:
+            model: Model or deployment name
+            params: Request parameters (messages, temperature, max_tokens, ...)
+            call: Coroutine function making the real request
+            serialize: Response object -> JSON-serializable dict
+            deserialize: Dict -> response object
+        """
+        if not self.is_cacheable(params):
+            self.stats["bypassed"] += 1
+            if self.enabled:
+                self._pending_bypasses += 1
+            return await call()
+
+        digest = request_key(model, params)
+        start = time.perf_counter()
+        try:
+            entry = await self.backend.get(digest)
+        except Exception as e:
+            logger.warning(f"LLM cache read failed: {str(e)}")
+            entry = None
+
+        if entry is not None:
+            try:
+                response = deserialize(entry["response"])
+            except Exception as e:
+                logger.warning(f"Discarding unreadable LLM cache entry: {str(e)}")
+            else:
+                self._count_hit(entry, (time.perf_counter() - start) * 1000)
+                return response
+
+        # Identical requests in flight on this replica share one call
+        inflight = self._inflight.get(digest)
+        if inflight is not None:
+            self.stats["coalesced"] += 1
+            return deserialize(await asyncio.shield(inflight))
+
+        future = asyncio.get_running_loop().create_future()
+        self._inflight[digest] = future
+        try:
+            call_start = time.perf_counter()
+            response = await call()
+            latency_ms = (time.perf_counter() - call_start) * 1000
+            data = serialize(response)
+            future.set_result(data)
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except Exception as e:
+            future.set_exception(e)
+            # Mark retrieved so waiter-less failures aren't logged as unhandled
+            future.exception()
+            raise
+        finally:
+            self._inflight.pop(digest, None)
+
+        self.stats["misses"] += 1
+        self._record({"misses": 1})
+        await self._store(digest, model, data, latency_ms)
+        return response
+
+    async def _store(self, digest: str, model: str, data: Dict[str, Any], latency_ms: float):
+        usage = data.get("usage") or {}
+        prompt_tokens = usage.get("prompt_tokens", 0)
+        completion_tokens = usage.get("completion_tokens", 0)
+        entry = {
+            "response": data,
+            "model": model,
+            "latency_ms": round(latency_ms, 1),
+            "tokens": prompt_tokens + completion_tokens,
+            "cost_usd": estimate_cost(model, prompt_tokens, completion_tokens),
+            "created_at": time.time()
+        }
+        if len(json.dumps(entry, default=str)) > self.max_entry_bytes:
+            return
+        try:
+            await self.backend.set(digest, entry, self.ttl)
+        except Exception as e:
+            logger.warning(f"LLM cache write failed: {str(e)}")
+
+    def _count_hit(self, entry: Dict[str, Any], hit_latency_ms: float):
+        saved = {
+            "hits": 1,
+            "tokens_saved": entry.get("tokens", 0),
+            "cost_saved_usd": entry.get("cost_usd", 0.0),
+            "latency_saved_ms": max(0.0, entry.get("latency_ms", 0.0) - hit_latency_ms),
+        }
+        for field, amount in saved.items():
+            self.stats[field] += amount
+        self._record(saved)
+
+    def _record(self, amounts: Dict[str, float]):
+        """Add to the shared counters in the background so calls don't wait on Redis"""
+        if self._pending_bypasses:
+            amounts = {**amounts, "bypassed": self._pending_bypasses}
+            self._pending_bypasses = 0
+        task = asyncio.ensure_future(cache_service.increment_counters(CacheKeys.LLM_CACHE_STATS, amounts))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get this replica's cache statistics"""
+        lookups = self.stats["hits"] + self.stats["misses"]
+        return {
+            "enabled": self.enabled,
+            "backend": self.backend.name,
+            **{k: round(v, 4) if isinstance(v, float) else v for k, v in self.stats.items()},
+            "hit_rate": round(self.stats["hits"] / lookups, 4) if lookups else 0.0
+        }
+
+
+async def get_llm_cache_savings() -> Dict[str, Any]:
+    """Cache savings across all replicas (for the analytics cost-savings view)"""
+    counters = await cache_service.get_counters(CacheKeys.LLM_CACHE_STATS)
+    hits = int(counters.get("hits", 0))
+    misses = int(counters.get("misses", 0))
+    return {
+        "hits": hits,
+        "misses": misses,
+        "bypassed": int(counters.get("bypassed", 0)),
+        "hit_rate": round(hits / (hits + misses), 4) if hits + misses else 0.0,
+        "tokens_saved": int(counters.get("tokens_saved", 0)),
+        "cost_saved_usd": round(counters.get("cost_saved_usd", 0.0), 2),
+        "latency_saved_seconds": round(counters.get("latency_saved_ms", 0.0) / 1000, 1)
+    }
@@ -0,0 +1,103 @@
+"""
+In-Process Cache
+Size- and TTL-bounded LRU used as the L1 tier in front of Redis
+"""
+
+import time
+from collections import OrderedDict
+from fnmatch import fnmatchcase
+from typing import Any, Dict, Optional, Tuple
+
+# Returned by LocalCache.get on a miss (None is a valid cached value)
+MISSING = object()
+
+
+class LocalCache:
+    """
+    Size- and TTL-bounded in-process LRU cache
+
+    Entries expire at min(ttl, max_ttl) so a replica that misses an
+    invalidation message serves stale data for at most max_ttl seconds.
+    Values are stored by reference; callers must treat them as read-only.
+    Not thread-safe: meant to be used from the event loop only.
+    """
+
+    def __init__(self, max_size: int = 10000, max_ttl: float = 30.0):
+        self.max_size = max_size
+        self.max_ttl = max_ttl
+        # key -> (value, expires_at); most recently used on the right
+        self._data: "OrderedDict[str, Tuple[Any, float]]" = OrderedDict()
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        self.invalidations = 0
+
+    def get(self, key: str) -> Any:
+        """Get a value, or MISSING if absent/expired"""
+        entry = self._data.get(key)
+        if entry is None:
+            self.misses += 1
+            return MISSING
+
+        value, expires_at = entry
+        if expires_at <= time.monotonic():
+            del self._data[key]
+            self.expirations += 1
+            self.misses += 1
+            return MISSING
+
+        self._data.move_to_end(key)
+        self.hits += 1
+        return value
+
+    def set(self, key: str, value: Any, ttl: Optional[float] = None):
+        """Store a value for min(ttl, max_ttl) seconds"""
+        ttl = self.max_ttl if ttl is None else min(ttl, self.max_ttl)
+        if ttl <= 0:
+            self._data.pop(key, None)
+            return
+
+        self._data[key] = (value, time.monotonic() + ttl)
+        self._data.move_to_end(key)
+        while len(self._data) > self.max_size:
+            self._data.popitem(last=False)
+            self.evictions += 1
+
+    def delete(self, *keys: str) -> int:
+        """Remove keys; returns number removed"""
+        removed = 0
+        for key in keys:
+            if self._data.pop(key, None) is not None:
+                removed += 1
+        self.invalidations += removed
+        return removed
+
+    def delete_pattern(self, pattern: str) -> int:
+        """Remove keys matching a Redis-style glob pattern"""
+        matched = [key for key in self._data if fnmatchcase(key, pattern)]
+        return self.delete(*matched)
+
+    def clear(self):
+        """Remove all entries"""
+        self.invalidations += len(self._data)
+        self._data.clear()
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get hit/miss statistics"""
+        lookups = self.hits + self.misses
+        return {
+            "size": len(self._data),
+            "max_size": self.max_size,
+            "max_ttl": self.max_ttl,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+            "evictions": self.evictions,
+            "expirations": self.expirations,
+            "invalidations": self.invalidations
+        }
@@ -1,16 +1,71 @@
 """
 Redis Caching Service
 High-performance caching for improved API response times
+
+Two tiers:
+- L1: optional in-process LRU (see local_cache.py), bounded by size and TTL
+- L2: Redis, shared by all replicas
+
+Writes and deletes are published on a Redis pub/sub channel so other
+replicas drop their L1 copies. Each replica listens on its own connection
+(no socket timeout, so idle periods are fine) and reconnects after errors.
+
+get_or_set / cache_result protect expensive fetches from stampedes:
+- single-flight: concurrent misses for a key share one in-process fetch, and
+  replicas coordinate through a short-lived Redis lock
+- stale-while-revalidate: entries stay readable for stale_ttl seconds past
+  their TTL while one caller refreshes them in the background
+- early probabilistic refresh (XFetch): hot entries are refreshed shortly
+  before they expire, weighted by how long the fetch took
+
+Multi-key operations (mget/mset/mdelete) use pipelines, and concurrent
+single-key gets are coalesced into one MGET (see batching.py).
+
+Values are encoded with the codec profile mapped to their key prefix in
+CacheKeys.CODECS (see codecs.py); reads detect the codec from the value.
+
+Invalidation never uses KEYS: patterns are resolved with incremental SCAN and
+deleted with batched UNLINK, and entries written with tags (see cache_result)
+can be dropped by tag through a per-tag key index without scanning at all.
 """
 
 import asyncio
+import hashlib
+import inspect
 import json
 import logging
+import math
 import os
-from typing import Any, Optional, Dict, List
+import random
+import time
+import uuid
+from typing import Any, Callable, Optional, Dict, List
 from datetime import datetime, timedelta
 import redis.asyncio as redis
 from ..config.settings import config_manager
+from .local_cache import LocalCache, MISSING
+from .codecs import CacheCodec, decode_value, get_codec
+from .batching import GetBatcher
+
+# Pub/sub channel used to propagate invalidations to other replicas' L1 caches
+INVALIDATION_CHANNEL = "cache:invalidations"
+
+# Prefix of the cross-replica single-flight locks
+LOCK_PREFIX = "cache:lock:"
+
+# Prefix of the tag index sets (tag -> cache keys written with that tag)
+TAG_PREFIX = "cache:tag:"
+
+# Marker of entries written by get_or_set (value + freshness metadata)
+ENTRY_MARKER = "__cache_entry__"
+
+# Compare-and-delete so a replica only releases a lock it still owns
+_RELEASE_LOCK_SCRIPT = """
+if redis.call('get', KEYS[1]) == ARGV[1] then
+    return redis.call('del', KEYS[1])
+end
+return 0
+"""
 
 class RedisCacheService:
     """High-performance Redis caching service"""
@@ -21,6 +76,56 @@ class RedisCacheService:
         self.redis_client = None
         self.default_ttl = 3600  # 1 hour default TTL
         
+        # L1 in-process cache in front of Redis
+        self.l1: Optional[LocalCache] = None
+        if os.getenv('CACHE_L1_ENABLED', 'true').lower() == 'true':
+            self.l1 = LocalCache(
+                max_size=int(os.getenv('PERF_CACHE_MAX_SIZE', '10000')),
+                max_ttl=float(os.getenv('CACHE_L1_MAX_TTL', '30'))
+            )
+        self.instance_id = uuid.uuid4().hex
+        self._pubsub = None
+        self._pubsub_client = None
+        self._connection_kwargs: Dict[str, Any] = {}
+        self.invalidation_retry_delay = float(os.getenv('CACHE_INVALIDATION_RETRY_DELAY', '1'))
+        self._invalidation_task: Optional[asyncio.Task] = None
+        self._l2_hits = 0
+        self._l2_misses = 0
+        
+        # Stampede protection for get_or_set / cache_result
+        self.default_stale_ttl = int(os.getenv('CACHE_STALE_TTL', '0'))
+        self.early_refresh_beta = float(os.getenv('CACHE_EARLY_REFRESH_BETA', '1.0'))
+        self.lock_ttl = int(os.getenv('CACHE_LOCK_TTL', '30'))
+        self.lock_wait = float(os.getenv('CACHE_LOCK_WAIT', '5'))
+        self.lock_poll_interval = 0.05
+        
+        # Invalidation: SCAN page size, UNLINK batch size, minimum tag index TTL
+        self.scan_count = int(os.getenv('CACHE_SCAN_COUNT', '1000'))
+        self.unlink_batch_size = int(os.getenv('CACHE_UNLINK_BATCH_SIZE', '500'))
+        self.tag_ttl = int(os.getenv('CACHE_TAG_TTL', '86400'))
+        
+        # Codec for keys whose prefix has no entry in CacheKeys.CODECS
+        self.default_codec = get_codec(os.getenv('CACHE_CODEC', 'compact'))
+        
+        # Coalesce concurrent get() calls into one MGET
+        self._get_batcher: Optional[GetBatcher] = None
+        if os.getenv('CACHE_GET_BATCHING', 'true').lower() == 'true':
+            self._get_batcher = GetBatcher(
+                self._fetch_l2,
+                window=float(os.getenv('CACHE_GET_BATCH_WINDOW_MS', '0')) / 1000,
+                max_batch_size=int(os.getenv('CACHE_GET_BATCH_MAX_SIZE', '100'))
+            )
+        self._inflight: Dict[str, asyncio.Task] = {}
+        self._fetch_stats = {
+            "executed": 0,
+            "coalesced": 0,
+            "coalesced_remote": 0,
+            "stale_served": 0,
+            "early_refreshes": 0,
+            "lock_timeouts": 0,
+            "errors": 0
+        }
+        
     async def initialize(self):
         """Initialize Redis connection"""
         try:
@@ -30,71 +135,314 @@ class RedisCacheService:
             redis_db = int(os.getenv('REDIS_DB', '0'))
             redis_password = os.getenv('REDIS_PASSWORD', None)
             
+            self._connection_kwargs = {
+                "host": redis_host,
+                "port": redis_port,
+                "db": redis_db,
+                "password": redis_password,
+                "decode_responses": False,  # values are binary (see codecs.py)
+                "socket_connect_timeout": 5
+            }
             self.redis_client = redis.Redis(
-                host=redis_host,
-                port=redis_port,
-                db=redis_db,
-                password=redis_password,
-                decode_responses=True,
-                socket_connect_timeout=5,
+                **self._connection_kwargs,
                 socket_timeout=5,
                 retry_on_timeout=True
             )
             
             # Test connection
             await self.redis_client.ping()
+            
+            if self.l1 is not None and self._invalidation_task is None:
+                self._start_invalidation_listener()
+            
             self.logger.info("Redis cache service initialized successfully")
             
         except Exception as e:
             self.logger.error(f"Failed to initialize Redis cache: {str(e)}")
             raise
     
+    def _start_invalidation_listener(self):
+        """Subscribe to invalidations published by other replicas"""
+        # Own connection without socket_timeout: a subscription is idle until
+        # another replica writes, which must not count as a failure
+        self._pubsub_client = redis.Redis(**self._connection_kwargs, socket_timeout=None, socket_keepalive=True)
+        self._invalidation_task = asyncio.create_task(self._listen_for_invalidations())
+    
+    async def _listen_for_invalidations(self):
+        """Apply invalidation messages to the local L1 cache, resubscribing after errors"""
+        connected = True
+        while True:
+            try:
+                self._pubsub = self._pubsub_client.pubsub(ignore_subscribe_messages=True)
+                await self._pubsub.subscribe(INVALIDATION_CHANNEL)
+                if not connected:
+                    self.logger.info("Cache invalidation listener resubscribed")
+                connected = True
+                async for message in self._pubsub.listen():
+                    self._apply_invalidation(message)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                if connected:
+                    # Messages published until we resubscribe are missed. Drop L1
+                    # once; entries cached meanwhile live at most LocalCache.max_ttl
+                    self.logger.warning(f"Cache invalidation listener disconnected, clearing L1 cache: {str(e)}")
+                    self.l1.clear()
+                    connected = False
+                await self._close_pubsub()
+                await asyncio.sleep(self.invalidation_retry_delay)
+    
+    def _apply_invalidation(self, message: Dict[str, Any]):
+        if message.get("type") != "message":
+            return
+        try:
+            payload = json.loads(message["data"])
+        except (TypeError, ValueError):
+            return
+        if payload.get("origin") == self.instance_id:
+            return
+        if payload.get("keys"):
+            self.l1.delete(*payload["keys"])
+        if payload.get("pattern"):
+            self.l1.delete_pattern(payload["pattern"])
+    
+    async def _close_pubsub(self):
+        if self._pubsub is not None:
+            try:
+                await self._pubsub.close()
+            except Exception:
+                pass
+            self._pubsub = None
+    
+    def _invalidation_message(self, keys: Optional[List[str]] = None, pattern: Optional[str] = None) -> str:
+        return json.dumps({"origin": self.instance_id, "keys": keys or [], "pattern": pattern})
+    
+    async def close(self):
+        """Stop the invalidation listener and close the Redis connection"""
+        if self._invalidation_task:
+            self._invalidation_task.cancel()
+            try:
+                await self._invalidation_task
+            except (asyncio.CancelledError, Exception):
+                pass
+            self._invalidation_task = None
+        await self._close_pubsub()
+        if self._pubsub_client:
+            await self._pubsub_client.close()
+            self._pubsub_client = None
+        if self.redis_client:
+            await self.redis_client.close()
+            self.redis_client = None
+    
     async def get(self, key: str) -> Optional[Any]:
-        """Get value from cache"""
+        """Get value from cache (L1 first, then Redis)"""
+        return self._unwrap_entry(await self._get_raw(key))[0]
+    
+    async def _get_raw(self, key: str) -> Optional[Any]:
+        """Get the stored object, including get_or_set freshness metadata"""
+        if self.l1 is not None:
+            value = self.l1.get(key)
+            if value is not MISSING:
+                return value
+        
+        if self._get_batcher is not None:
+            return await self._get_batcher.load(key)
+        return (await self._fetch_l2([key])).get(key)
+    
+    async def _fetch_l2(self, keys: List[str]) -> Dict[str, Any]:
+        """Load keys from Redis in one round-trip and populate L1"""
         try:
             if not self.redis_client:
                 await self.initialize()
             
-            value = await self.redis_client.get(key)
-            if value:
-                return json.loads(value)
-            return None
-            
+            if self.l1 is not None:
+                # Fetch values and remaining TTLs together so L1 expires with Redis
+                async with self.redis_client.pipeline(transaction=False) as pipe:
+                    pipe.mget(keys)
+                    for key in keys:
+                        pipe.pttl(key)
+                    values, *ttls = await pipe.execute()
+            else:
+                values, ttls = await self.redis_client.mget(keys), [None] * len(keys)
         except Exception as e:
-            self.logger.error(f"Error getting cache key {key}: {str(e)}")
-            return None
+            self.logger.error(f"Error getting cache keys {keys[:5]}: {str(e)}")
+            return {}
+        
+        results = {}
+        for key, value, ttl_ms in zip(keys, values, ttls):
+            if not value:
+                self._l2_misses += 1
+                continue
+            try:
+                result = decode_value(value)
+            except Exception as e:
+                self.logger.error(f"Error decoding cache key {key}: {str(e)}")
+                self._l2_misses += 1
+                continue
+            self._l2_hits += 1
+            if self.l1 is not None and ttl_ms and ttl_ms > 0:
+                self.l1.set(key, result, ttl_ms / 1000)
+            results[key] = result
+        return results
+    
+    async def mget(self, keys: List[str]) -> Dict[str, Any]:
+        """
+        Get many values in one round-trip
+        
+        Returns:
+            {key: value} for every requested key; None for misses
+        """
+        results: Dict[str, Any] = {}
+        missing = []
+        for key in dict.fromkeys(keys):
+            value = self.l1.get(key) if self.l1 is not None else MISSING
+            if value is MISSING:
+                missing.append(key)
+            else:
+                results[key] = self._unwrap_entry(value)[0]
+        
+        if missing:
+            fetched = await self._fetch_l2(missing)
+            for key in missing:
+                results[key] = self._unwrap_entry(fetched.get(key))[0]
+        return results
     
-    async def set(self, key: str, value: Any, ttl: Optional[int] = None) -> bool:
-        """Set value in cache"""
+    async def set(
+        self,
+        key: str,
+        value: Any,
+        ttl: Optional[int] = None,
+        tags: Optional[List[str]] = None
+    ) -> bool:
+        """
+        Set value in cache
+        
+        Args:
+            key: Cache key
+            value: JSON-serializable value
+            ttl: Seconds until expiry (default: default_ttl)
+            tags: Tags to index the key under for invalidate_tags()
+        """
         try:
             if not self.redis_client:
                 await self.initialize()
             
             ttl = ttl or self.default_ttl
-            serialized_value = json.dumps(value, default=str)
+            serialized_value = self._codec_for(key).encode(value)
+            
+            async with self.redis_client.pipeline(transaction=False) as pipe:
+                pipe.setex(key, ttl, serialized_value)
+                for tag in tags or ():
+                    # The index must outlive its entries; dead members are harmless
+                    pipe.sadd(self._tag_key(tag), key)
+                    pipe.expire(self._tag_key(tag), max(ttl, self.tag_ttl))
+                if self.l1 is not None:
+                    # Other replicas may hold the previous value in their L1
+                    pipe.publish(INVALIDATION_CHANNEL, self._invalidation_message(keys=[key]))
+                await pipe.execute()
             
-            await self.redis_client.setex(key, ttl, serialized_value)
+            if self.l1 is not None:
+                # Store the decoded form so L1 hits return the same types as Redis hits
+                self.l1.set(key, decode_value(serialized_value), ttl)
             return True
             
         except Exception as e:
             self.logger.error(f"Error setting cache key {key}: {str(e)}")
+            if self.l1 is not None:
+                self.l1.delete(key)
             return False
     
     async def delete(self, key: str) -> bool:
         """Delete key from cache"""
+        if self.l1 is not None:
+            self.l1.delete(key)
+        
         try:
             if not self.redis_client:
                 await self.initialize()
             
-            result = await self.redis_client.delete(key)
+            if self.l1 is not None:
+                async with self.redis_client.pipeline(transaction=False) as pipe:
+                    pipe.delete(key)
+                    pipe.publish(INVALIDATION_CHANNEL, self._invalidation_message(keys=[key]))
+                    result, _ = await pipe.execute()
+            else:
+                result = await self.redis_client.delete(key)
             return result > 0
             
         except Exception as e:
             self.logger.error(f"Error deleting cache key {key}: {str(e)}")
             return False
     
+    async def mset(
+        self,
+        items: Dict[str, Any],
+        ttl: Optional[int] = None,
+        ttls: Optional[Dict[str, int]] = None
+    ) -> bool:
+        """
+        Set many values in one pipelined round-trip
+        
+        Args:
+            items: {key: value}
+            ttl: Seconds until expiry for keys without an entry in ttls (default: default_ttl)
+            ttls: Per-key TTL overrides
+        """
+        if not items:
+            return True
+        ttls = ttls or {}
+        default_ttl = ttl or self.default_ttl
+        
+        try:
+            if not self.redis_client:
+                await self.initialize()
+            
+            encoded = {key: self._codec_for(key).encode(value) for key, value in items.items()}
+            async with self.redis_client.pipeline(transaction=False) as pipe:
+                for key, serialized_value in encoded.items():
+                    pipe.setex(key, ttls.get(key, default_ttl), serialized_value)
+                if self.l1 is not None:
+                    pipe.publish(INVALIDATION_CHANNEL, self._invalidation_message(keys=list(encoded)))
+                await pipe.execute()
+            
+            if self.l1 is not None:
+                for key, serialized_value in encoded.items():
+                    self.l1.set(key, decode_value(serialized_value), ttls.get(key, default_ttl))
+            return True
+            
+        except Exception as e:
+            self.logger.error(f"Error setting {len(items)} cache keys: {str(e)}")
+            if self.l1 is not None:
+                self.l1.delete(*items)
+            return False
+    
+    async def mdelete(self, keys: List[str]) -> int:
+        """Delete many keys in one round-trip; returns number deleted"""
+        if not keys:
+            return 0
+        if self.l1 is not None:
+            self.l1.delete(*keys)
+        
+        try:
+            if not self.redis_client:
+                await self.initialize()
+            
+            async with self.redis_client.pipeline(transaction=False) as pipe:
+                pipe.delete(*keys)
+                if self.l1 is not None:
+                    pipe.publish(INVALIDATION_CHANNEL, self._invalidation_message(keys=list(keys)))
+                results = await pipe.execute()
+            return results[0]
+            
+        except Exception as e:
+            self.logger.error(f"Error deleting {len(keys)} cache keys: {str(e)}")
+            return 0
+    
     async def exists(self, key: str) -> bool:
         """Check if key exists in cache"""
+        if self.l1 is not None and self.l1.get(key) is not MISSING:
+            return True
+        
         try:
             if not self.redis_client:
                 await self.initialize()
@@ -105,41 +453,277 @@ class RedisCacheService:
             self.logger.error(f"Error checking cache key {key}: {str(e)}")
             return False
     
-    async def get_or_set(self, key: str, fetch_func, ttl: Optional[int] = None) -> Any:
-        """Get from cache or fetch and set"""
+    async def increment_counters(self, key: str, amounts: Dict[str, float]) -> bool:
+        """Atomically add to numeric fields of a hash (counters shared across replicas)"""
         try:
-            # Try to get from cache first
-            cached_value = await self.get(key)
-            if cached_value is not None:
-                return cached_value
+            if not self.redis_client:
+                await self.initialize()
             
-            # Fetch from source
-            value = await fetch_func() if asyncio.iscoroutinefunction(fetch_func) else fetch_func()
+            async with self.redis_client.pipeline(transaction=False) as pipe:
+                for field, amount in amounts.items():
+                    pipe.hincrbyfloat(key, field, amount)
+                await pipe.execute()
+            return True
             
-            # Set in cache
-            await self.set(key, value, ttl)
+        except Exception as e:
+            self.logger.error(f"Error incrementing counters {key}: {str(e)}")
+            return False
+    
+    async def get_counters(self, key: str) -> Dict[str, float]:
+        """Read a counters hash written by increment_counters"""
+        try:
+            if not self.redis_client:
+                await self.initialize()
+            
+            values = await self.redis_client.hgetall(key)
+            return {
+                (field.decode() if isinstance(field, bytes) else field): float(value)
+                for field, value in values.items()
+            }
+            
+        except Exception as e:
+            self.logger.error(f"Error reading counters {key}: {str(e)}")
+            return {}
+    
+    async def get_or_set(
+        self,
+        key: str,
+        fetch_func,
+        ttl: Optional[int] = None,
+        stale_ttl: Optional[int] = None,
+        early_refresh_beta: Optional[float] = None,
+        tags: Optional[List[str]] = None,
+        ttl_for: Optional[Callable[[Any], Optional[int]]] = None
+    ) -> Any:
+        """
+        Get from cache or fetch and set, with stampede protection
+        
+        Args:
+            key: Cache key
+            fetch_func: Sync or async callable producing the value
+            ttl: Seconds the value is fresh (default: default_ttl)
+            stale_ttl: Seconds a stale value may still be served while it is
+                refreshed in the background (default: CACHE_STALE_TTL)
+            early_refresh_beta: XFetch weight; > 1 refreshes earlier, 0 disables
+                (default: CACHE_EARLY_REFRESH_BETA)
+            tags: Tags to index the key under for invalidate_tags()
+            ttl_for: Called with each fetched value; a returned TTL replaces ttl
+                for that value and also caps its stale window (e.g. a short TTL
+                for empty results)
+        """
+        ttl = ttl or self.default_ttl
+        stale_ttl = self.default_stale_ttl if stale_ttl is None else stale_ttl
+        beta = self.early_refresh_beta if early_refresh_beta is None else early_refresh_beta
+        
+        value, fresh_until, delta = self._unwrap_entry(await self._get_raw(key))
+        if fresh_until is not None:
+            now = time.time()
+            if now >= fresh_until:
+                # Past its TTL but inside the stale window
+                self._fetch_stats["stale_served"] += 1
+                self._start_fetch(key, fetch_func, ttl, stale_ttl, tags, ttl_for, background=True)
+            elif beta > 0 and delta and now - delta * beta * math.log(1.0 - random.random()) >= fresh_until:
+                self._fetch_stats["early_refreshes"] += 1
+                self._start_fetch(key, fetch_func, ttl, stale_ttl, tags, ttl_for, background=True)
+            return value
+        if value is not None:
+            # Plain entry written by set()
             return value
+        
+        return await asyncio.shield(self._start_fetch(key, fetch_func, ttl, stale_ttl, tags, ttl_for))
+    
+    def _start_fetch(
+        self,
+        key: str,
+        fetch_func,
+        ttl: int,
+        stale_ttl: int,
+        tags: Optional[List[str]] = None,
+        ttl_for: Optional[Callable[[Any], Optional[int]]] = None,
+        background: bool = False
+    ) -> asyncio.Task:
+        """Start a fetch for key, or join the one already in flight in this process"""
+        task = self._inflight.get(key)
+        if task is not None:
+            if not background:
+                self._fetch_stats["coalesced"] += 1
+            return task
+        
+        task = asyncio.create_task(self._fetch_and_store(key, fetch_func, ttl, stale_ttl, tags, ttl_for, background))
+        self._inflight[key] = task
+        task.add_done_callback(lambda t: self._fetch_done(key, t))
+        return task
+    
+    def _fetch_done(self, key: str, task: asyncio.Task):
+        if self._inflight.get(key) is task:
+            del self._inflight[key]
+        # Retrieve the exception so background refresh failures are logged, not lost
+        if not task.cancelled() and task.exception() is not None:
+            self._fetch_stats["errors"] += 1
+            self.logger.error(f"Error fetching value for cache key {key}: {str(task.exception())}")
+    
+    async def _fetch_and_store(
+        self,
+        key: str,
+        fetch_func,
+        ttl: int,
+        stale_ttl: int,
+        tags: Optional[List[str]],
+        ttl_for: Optional[Callable[[Any], Optional[int]]],
+        background: bool
+    ) -> Any:
+        """Run fetch_func under the cross-replica lock and cache the result"""
+        lock_key = f"{LOCK_PREFIX}{key}"
+        token = uuid.uuid4().hex
+        locked = await self._acquire_lock(lock_key, token)
+        
+        if not locked:
+            if background:
+                # Another replica is already refreshing this entry
+                return None
+            value = await self._wait_for_peer(key)
+            if value is not MISSING:
+                self._fetch_stats["coalesced_remote"] += 1
+                return value
+            self._fetch_stats["lock_timeouts"] += 1
+        
+        try:
+            start = time.monotonic()
+            value = fetch_func()
+            if inspect.isawaitable(value):
+                value = await value
+            delta = time.monotonic() - start
+            self._fetch_stats["executed"] += 1
             
+            value_ttl = ttl_for(value) if ttl_for else None
+            if value_ttl:
+                ttl, stale_ttl = value_ttl, min(stale_ttl, value_ttl)
+            entry = {ENTRY_MARKER: 1, "value": value, "fresh_until": time.time() + ttl, "delta": delta}
+            await self.set(key, entry, ttl + stale_ttl, tags=tags)
+            return value
+        finally:
+            if locked:
+                await self._release_lock(lock_key, token)
+    
+    async def _acquire_lock(self, lock_key: str, token: str) -> bool:
+        """Take the single-flight lock; fails open if Redis is unavailable"""
+        try:
+            if not self.redis_client:
+                await self.initialize()
+            return bool(await self.redis_client.set(lock_key, token, nx=True, ex=self.lock_ttl))
         except Exception as e:
-            self.logger.error(f"Error in get_or_set for key {key}: {str(e)}")
-            # Fallback to direct fetch
-            return await fetch_func() if asyncio.iscoroutinefunction(fetch_func) else fetch_func()
+            self.logger.warning(f"Error acquiring cache lock {lock_key}: {str(e)}")
+            return True
+    
+    async def _release_lock(self, lock_key: str, token: str):
+        try:
+            await self.redis_client.eval(_RELEASE_LOCK_SCRIPT, 1, lock_key, token)
+        except Exception as e:
+            self.logger.warning(f"Error releasing cache lock {lock_key}: {str(e)}")
+    
+    async def _wait_for_peer(self, key: str) -> Any:
+        """Poll for the value another replica is computing; MISSING on timeout"""
+        deadline = time.monotonic() + self.lock_wait
+        while time.monotonic() < deadline:
+            await asyncio.sleep(self.lock_poll_interval)
+            value, fresh_until, _ = self._unwrap_entry(await self._get_raw(key))
+            if fresh_until is not None and time.time() < fresh_until:
+                return value
+        return MISSING
+    
+    @staticmethod
+    def _unwrap_entry(raw: Any):
+        """Split a stored object into (value, fresh_until, fetch_seconds)"""
+        if isinstance(raw, dict) and raw.get(ENTRY_MARKER) == 1:
+            return raw.get("value"), raw.get("fresh_until"), raw.get("delta")
+        return raw, None, None
     
     async def invalidate_pattern(self, pattern: str) -> int:
-        """Invalidate all keys matching pattern"""
+        """
+        Invalidate all keys matching pattern
+        
+        Walks the keyspace with SCAN and deletes matches with UNLINK in batches,
+        so Redis is never blocked for the whole keyspace the way KEYS blocks it.
+        """
+        if self.l1 is not None:
+            self.l1.delete_pattern(pattern)
+        
         try:
             if not self.redis_client:
                 await self.initialize()
             
-            keys = await self.redis_client.keys(pattern)
-            if keys:
-                return await self.redis_client.delete(*keys)
-            return 0
+            if self.l1 is not None:
+                await self.redis_client.publish(
+                    INVALIDATION_CHANNEL, self._invalidation_message(pattern=pattern)
+                )
+            
+            deleted = 0
+            batch: List[str] = []
+            async for key in self.redis_client.scan_iter(match=pattern, count=self.scan_count):
+                batch.append(key)
+                if len(batch) >= self.unlink_batch_size:
+                    deleted += await self.redis_client.unlink(*batch)
+                    batch = []
+            if batch:
+                deleted += await self.redis_client.unlink(*batch)
+            return deleted
             
         except Exception as e:
             self.logger.error(f"Error invalidating pattern {pattern}: {str(e)}")
             return 0
     
+    async def invalidate_tags(self, *tags: str) -> int:
+        """
+        Invalidate all keys written with any of the given tags
+        
+        Reads each tag's key index with SSCAN and UNLINKs members in batches;
+        no keyspace scan is involved.
+        """
+        if not tags:
+            return 0
+        
+        try:
+            if not self.redis_client:
+                await self.initialize()
+            
+            deleted = 0
+            for tag in tags:
+                tag_key = self._tag_key(tag)
+                batch: List[str] = []
+                async for key in self.redis_client.sscan_iter(tag_key, count=self.scan_count):
+                    batch.append(key.decode() if isinstance(key, bytes) else key)
+                    if len(batch) >= self.unlink_batch_size:
+                        deleted += await self._unlink_keys(batch)
+                        batch = []
+                if batch:
+                    deleted += await self._unlink_keys(batch)
+                await self.redis_client.unlink(tag_key)
+            return deleted
+            
+        except Exception as e:
+            self.logger.error(f"Error invalidating tags {tags}: {str(e)}")
+            return 0
+    
+    async def _unlink_keys(self, keys: List[str]) -> int:
+        """UNLINK keys and drop them from every replica's L1"""
+        if self.l1 is not None:
+            self.l1.delete(*keys)
+            async with self.redis_client.pipeline(transaction=False) as pipe:
+                pipe.unlink(*keys)
+                pipe.publish(INVALIDATION_CHANNEL, self._invalidation_message(keys=keys))
+                deleted, _ = await pipe.execute()
+            return deleted
+        return await self.redis_client.unlink(*keys)
+    
+    def _codec_for(self, key: str) -> CacheCodec:
+        """Codec profile for a key, chosen by its prefix (text before the first ':')"""
+        profile = CacheKeys.CODECS.get(key.split(":", 1)[0])
+        return get_codec(profile) if profile else self.default_codec
+    
+    @staticmethod
+    def _tag_key(tag: str) -> str:
+        return f"{TAG_PREFIX}{tag}"
+    
     async def get_stats(self) -> Dict[str, Any]:
         """Get cache statistics"""
         try:
@@ -147,12 +731,23 @@ class RedisCacheService:
                 await self.initialize()
             
             info = await self.redis_client.info()
+            l2_lookups = self._l2_hits + self._l2_misses
             return {
                 "connected_clients": info.get("connected_clients", 0),
                 "used_memory": info.get("used_memory_human", "0B"),
                 "keyspace_hits": info.get("keyspace_hits", 0),
                 "keyspace_misses": info.get("keyspace_misses", 0),
-                "total_commands_processed": info.get("total_commands_processed", 0)
+                "total_commands_processed": info.get("total_commands_processed", 0),
+                "fetches": dict(self._fetch_stats, in_flight=len(self._inflight)),
+                "get_batching": self._get_batcher.get_stats() if self._get_batcher else {"enabled": False},
+                "tiers": {
+                    "l1": self.l1.get_stats() if self.l1 is not None else {"enabled": False},
+                    "l2": {
+                        "hits": self._l2_hits,
+                        "misses": self._l2_misses,
+                        "hit_rate": round(self._l2_hits / l2_lookups, 4) if l2_lookups else 0.0
+                    }
+                }
             }
             
         except Exception as e:
@@ -160,33 +755,56 @@ class RedisCacheService:
             return {}
 
 # Cache decorators
-def cache_result(ttl: int = 3600, key_prefix: str = ""):
-    """Decorator to cache function results"""
+def _format_tags(tags: Optional[List[str]], func, args, kwargs) -> List[str]:
+    """Fill tag templates such as "user_documents:{user_id}" from the call's arguments"""
+    if not tags:
+        return []
+    try:
+        bound = inspect.signature(func).bind_partial(*args, **kwargs)
+        bound.apply_defaults()
+        return [tag.format(**bound.arguments) for tag in tags]
+    except (KeyError, IndexError, TypeError) as e:
+        logging.getLogger(__name__).warning(f"Could not format cache tags {tags} for {func.__name__}: {str(e)}")
+        return []
+
+def cache_result(
+    ttl: int = 3600,
+    key_prefix: str = "",
+    stale_ttl: Optional[int] = None,
+    tags: Optional[List[str]] = None
+):
+    """
+    Decorator to cache function results (single-flight, see get_or_set)
+    
+    Args:
+        ttl: Seconds the result is fresh
+        key_prefix: Cache key prefix
+        stale_ttl: Seconds a stale result may be served while refreshing
+        tags: Tag templates formatted with the call's arguments, e.g.
+            [CacheKeys.USER_DOCUMENTS] -> "user_documents:<user_id>"
+    """
     def decorator(func):
         from functools import wraps
         
         @wraps(func)
         async def wrapper(*args, **kwargs):
-            # Generate cache key
-            cache_key = f"{key_prefix}:{func.__name__}:{hash(str(args) + str(kwargs))}"
-            
-            # Try to get from cache
-            cached_result = await cache_service.get(cache_key)
-            if cached_result is not None:
-                return cached_result
-            
-            # Execute function
-            result = await func(*args, **kwargs) if asyncio.iscoroutinefunction(func) else func(*args, **kwargs)
+            # Generate cache key; stable across processes so replicas share entries and locks
+            arg_digest = hashlib.sha1((str(args) + str(kwargs)).encode()).hexdigest()
+            cache_key = f"{key_prefix}:{func.__name__}:{arg_digest}"
             
-            # Cache result
-            await cache_service.set(cache_key, result, ttl)
-            return result
+            return await cache_service.get_or_set(
+                cache_key,
+                lambda: func(*args, **kwargs),
+                ttl=ttl,
+                stale_ttl=stale_ttl,
+                tags=_format_tags(tags, func, args, kwargs)
+            )
         
         return wrapper
     return decorator
 
-def cache_invalidate(pattern: str):
-    """Decorator to invalidate cache on function execution"""
+def cache_invalidate(pattern: Optional[str] = None, tags: Optional[List[str]] = None):
+    """Decorator to invalidate cache by pattern and/or tag templates on function execution"""
     def decorator(func):
         from functools import wraps
         
@@ -196,7 +814,10 @@ def cache_invalidate(pattern: str):
             result = await func(*args, **kwargs) if asyncio.iscoroutinefunction(func) else func(*args, **kwargs)
             
             # Invalidate cache
-            await cache_service.invalidate_pattern(pattern)
+            if tags:
+                await cache_service.invalidate_tags(*_format_tags(tags, func, args, kwargs))
+            if pattern:
+                await cache_service.invalidate_pattern(pattern)
             return result
         
         return wrapper
@@ -214,4 +835,27 @@ class CacheKeys:
     CONVERSATION_HISTORY = "conversation_history:{conversation_id}"
     USER_CONVERSATIONS = "user_conversations:{user_id}"
     SYSTEM_HEALTH = "system_health"
-    PROCESSING_JOBS = "processing_jobs:{user_id}"
\ No newline at end of file
+    PROCESSING_JOBS = "processing_jobs:{user_id}"
+    FORM_RECOGNIZER_RESULT = "form_recognizer:{model}:{content_hash}"
+    LLM_RESPONSE = "llm_response:{digest}"
+    LLM_CACHE_STATS = "llm_cache:stats"
+    ETL_CHECKPOINT = "etl_checkpoint:{execution_id}"
+    ETL_NORMALIZATION_STATS = "etl_normalization:{pipeline_name}:{step_id}"
+    ETL_WATERMARK = "etl_watermark:{pipeline_name}:{step_id}"
+    
+    # Codec profile per key prefix (see codecs.py); unlisted prefixes use CACHE_CODEC
+    CODECS = {
+        "user_documents": "compact",
+        "document_metadata": "compact",
+        "analytics_metrics": "compact",
+        "automation_metrics": "compact",
+        "conversation_history": "compact",
+        "user_conversations": "compact",
+        "system_health": "fast",
+        "processing_jobs": "fast",
+        "form_recognizer": "compact",
+        "llm_response": "compact",
+        "etl_checkpoint": "fast",
+        "etl_normalization": "compact",
+        "etl_watermark": "fast",
+    }
\ No newline at end of file
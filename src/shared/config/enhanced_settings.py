@@ -515,8 +515,10 @@ class DatabaseSettings(BaseSettings):
     """Database configuration"""
     connection_string: str
     pool_size: int = 10
+    pool_min_size: int = 1
     max_overflow: int = 20
     pool_timeout: int = 30
+    pool_idle_timeout: int = 300
     pool_recycle: int = 3600
     echo_sql: bool = False
     
@@ -169,6 +169,43 @@ class APIConfig:
     enable_response_caching: bool = True
     cache_ttl_seconds: int = 300
 
+@dataclass
+class HeuristicsConfig:
+    """Keyword dictionaries for heuristic document classification and routing"""
+    # Document type -> keywords whose presence votes for that type
+    document_type_keywords: Dict[str, List[str]] = field(default_factory=lambda: {
+        "invoice": [
+            "invoice", "bill to", "invoice number", "invoice date",
+            "amount due", "total amount", "subtotal", "tax amount",
+            "payment terms", "due date", "remittance", "vendor"
+        ],
+        "receipt": [
+            "receipt", "thank you for your purchase", "cashier",
+            "transaction", "payment method", "card ending", "merchant",
+            "store #", "terminal", "cash"
+        ],
+        "business_card": [
+            "tel:", "phone:", "mobile:", "email:", "fax:",
+            "linkedin", "twitter", "website:", "www.",
+            "ceo", "manager", "director", "president", "vp"
+        ],
+        "id_document": [
+            "driver license", "driver's license", "passport",
+            "identification", "id number", "date of birth", "dob",
+            "nationality", "issued by", "expiration date", "expires"
+        ],
+        "tax_document": [
+            "w-2", "w2", "form 1099", "1099", "tax year",
+            "employer identification", "ein", "social security",
+            "federal income", "state income", "irs"
+        ]
+    })
+    
+    # Vendors with standard formats (routed to traditional processing)
+    known_vendors: List[str] = field(default_factory=lambda: [
+        "amazon", "microsoft", "oracle", "salesforce", "adobe", "google", "ibm"
+    ])
+
 class ConfigManager:
     """Centralized configuration management"""
     
@@ -179,6 +216,7 @@ class ConfigManager:
         self._security_config: Optional[SecurityConfig] = None
         self._monitoring_config: Optional[MonitoringConfig] = None
         self._api_config: Optional[APIConfig] = None
+        self._heuristics_config: Optional[HeuristicsConfig] = None
         
         # Initialize Key Vault client if in production
         if environment == Environment.PRODUCTION:
@@ -219,6 +257,12 @@ class ConfigManager:
             self._api_config = APIConfig()
         return self._api_config
     
+    def get_heuristics_config(self) -> HeuristicsConfig:
+        """Get keyword dictionaries for heuristic classification"""
+        if self._heuristics_config is None:
+            self._heuristics_config = self._load_heuristics_config()
+        return self._heuristics_config
+    
     def _load_azure_config(self) -> AzureConfig:
         """Load Azure configuration from environment or Key Vault"""
         if self.environment == Environment.PRODUCTION and self._key_vault_client:
@@ -387,6 +431,14 @@ class ConfigManager:
             allowed_headers=json.loads(os.getenv("ALLOWED_HEADERS", '["*"]'))
         )
     
+    def _load_heuristics_config(self) -> HeuristicsConfig:
+        """Load keyword dictionaries; DOCUMENT_TYPE_KEYWORDS replaces the lists of the types it names"""
+        config = HeuristicsConfig()
+        config.document_type_keywords.update(json.loads(os.getenv("DOCUMENT_TYPE_KEYWORDS", "{}")))
+        if os.getenv("KNOWN_VENDORS"):
+            config.known_vendors = json.loads(os.getenv("KNOWN_VENDORS"))
+        return config
+    
     def get_secret(self, secret_name: str) -> str:
         """Get secret from Key Vault or environment"""
         if self.environment == Environment.PRODUCTION and self._key_vault_client:
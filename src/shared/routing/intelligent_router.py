@@ -453,7 +453,9 @@ import asyncio
 from typing import Dict, Any, Optional, Literal, List
 from datetime import datetime
 from enum import Enum
-import re
+
+from src.shared.config.settings import config_manager
+from src.shared.utils.keyword_matcher import KeywordMatcher
 
 logger = logging.getLogger(__name__)
 
@@ -486,16 +488,9 @@ class DocumentComplexityAnalyzer:
     def __init__(self):
         self.logger = logging.getLogger(__name__)
         
-        # Known vendor patterns (simple to process)
-        self.known_vendor_patterns = [
-            r"amazon",
-            r"microsoft",
-            r"oracle",
-            r"salesforce",
-            r"adobe",
-            r"google",
-            r"ibm"
-        ]
+        # Known vendors (simple to process), matched in a single pass
+        self.known_vendors = config_manager.get_heuristics_config().known_vendors
+        self.vendor_matcher = KeywordMatcher({"vendor": self.known_vendors})
         
         # Standard invoice field patterns
         self.standard_fields = [
@@ -719,15 +714,11 @@ class DocumentComplexityAnalyzer:
             content += " " + vendor
         
         # Check if it's a known vendor
-        is_known_vendor = False
-        for pattern in self.known_vendor_patterns:
-            if re.search(pattern, content, re.IGNORECASE):
-                is_known_vendor = True
-                score -= 10  # Known vendor = simpler
-                reasons.append(f"Known vendor detected: {pattern}")
-                break
-        
-        if not is_known_vendor:
+        vendor_match = self.vendor_matcher.first_match(content, "vendor")
+        if vendor_match:
+            score -= 10  # Known vendor = simpler
+            reasons.append(f"Known vendor detected: {vendor_match}")
+        else:
             score += 10
             reasons.append("Unknown vendor format")
         
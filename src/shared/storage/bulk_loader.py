@@ -0,0 +1,184 @@
+"""
+Bulk Loading Helpers
+Statement parsing and encoding used by SQLService bulk loads
+
+SQLService.execute_batch / bulk_load pick a load strategy per driver:
+- copy:        PostgreSQL COPY ... FROM STDIN (CSV), one round-trip per chunk
+- values:      multi-row INSERT ... VALUES (...), (...) statements
+- executemany: psycopg2.extras.execute_batch / pyodbc fast_executemany
+
+COPY and multi-row VALUES only apply to plain INSERT statements whose VALUES
+list is made up of ? placeholders; anything else falls back to executemany.
+That includes the upserts built by upsert_statement (INSERT ... ON CONFLICT
+on PostgreSQL, MERGE on SQL Server).
+"""
+
+import io
+import json
+import re
+from dataclasses import dataclass, field
+from datetime import date, datetime, time
+from decimal import Decimal
+from typing import Any, Dict, Iterator, List, Optional, Sequence
+
+BULK_MODES = ("auto", "copy", "values", "executemany")
+
+# SQL Server caps a VALUES list at 1000 rows and a statement at 2100 parameters
+SQLSERVER_MAX_VALUES_ROWS = 1000
+SQLSERVER_MAX_PARAMS = 2100
+
+_INSERT_PATTERN = re.compile(
+    r"^\s*INSERT\s+INTO\s+(?P<table>[\w.\[\]\"]+)\s*"
+    r"\((?P<columns>[^)]*)\)\s*"
+    r"VALUES\s*\((?P<values>\s*\?(?:\s*,\s*\?)*\s*)\)\s*;?\s*$",
+    re.IGNORECASE | re.DOTALL
+)
+
+
+class BulkLoadError(Exception):
+    """Raised when a chunk of a bulk load fails and the load is aborted"""
+
+    def __init__(self, message: str, report: "BulkLoadReport"):
+        super().__init__(message)
+        self.report = report
+
+
+@dataclass
+class InsertStatement:
+    """Parsed plain INSERT ... VALUES (?, ...) statement"""
+    table: str
+    columns: List[str]
+
+    @property
+    def column_list(self) -> str:
+        return ", ".join(self.columns)
+
+
+@dataclass
+class BulkLoadReport:
+    """Outcome of a chunked bulk load"""
+    mode: str
+    total_rows: int
+    chunk_size: int
+    rows_loaded: int = 0
+    chunks_loaded: int = 0
+    failed_chunks: List[Dict[str, Any]] = field(default_factory=list)
+    elapsed_seconds: float = 0.0
+
+    @property
+    def rows_per_second(self) -> float:
+        return self.rows_loaded / self.elapsed_seconds if self.elapsed_seconds > 0 else 0.0
+
+    def record_failure(self, chunk_index: int, start_row: int, rows: int, error: Exception):
+        self.failed_chunks.append({
+            "chunk_index": chunk_index,
+            "start_row": start_row,
+            "rows": rows,
+            "error": str(error)
+        })
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "mode": self.mode,
+            "total_rows": self.total_rows,
+            "chunk_size": self.chunk_size,
+            "rows_loaded": self.rows_loaded,
+            "chunks_loaded": self.chunks_loaded,
+            "failed_chunks": self.failed_chunks,
+            "elapsed_seconds": round(self.elapsed_seconds, 4),
+            "rows_per_second": round(self.rows_per_second, 1)
+        }
+
+
+def parse_insert(query: str) -> Optional[InsertStatement]:
+    """Parse a plain INSERT INTO t (cols) VALUES (?, ...); None if not eligible for COPY/VALUES"""
+    match = _INSERT_PATTERN.match(query)
+    if not match:
+        return None
+    columns = [col.strip() for col in match.group("columns").split(",") if col.strip()]
+    placeholders = match.group("values").count("?")
+    if not columns or len(columns) != placeholders:
+        return None
+    return InsertStatement(table=match.group("table"), columns=columns)
+
+
+def iter_chunks(rows: Sequence[Any], chunk_size: int) -> Iterator[tuple]:
+    """Yield (chunk_index, start_row, chunk) tuples"""
+    for index, start in enumerate(range(0, len(rows), chunk_size)):
+        yield index, start, rows[start:start + chunk_size]
+
+
+def _csv_field(value: Any) -> str:
+    """Encode a value for COPY ... WITH (FORMAT csv): unquoted empty is NULL"""
+    if value is None:
+        return ""
+    if isinstance(value, bool):
+        return "true" if value else "false"
+    if isinstance(value, (int, float, Decimal)):
+        return str(value)
+    if isinstance(value, (datetime, date, time)):
+        text = value.isoformat()
+    elif isinstance(value, (dict, list)):
+        text = json.dumps(value, default=str)
+    elif isinstance(value, (bytes, bytearray, memoryview)):
+        text = "\\x" + bytes(value).hex()
+    else:
+        text = str(value)
+    return '"' + text.replace('"', '""') + '"'
+
+
+def encode_copy_csv(rows: Sequence[Sequence[Any]]) -> io.StringIO:
+    """Encode rows as an in-memory CSV buffer for COPY FROM STDIN"""
+    buffer = io.StringIO()
+    buffer.writelines(",".join(_csv_field(value) for value in row) + "\n" for row in rows)
+    buffer.seek(0)
+    return buffer
+
+
+def multi_row_insert(statement: InsertStatement, row_count: int) -> str:
+    """Build INSERT ... VALUES (?, ...), (?, ...) for row_count rows"""
+    row = "(" + ", ".join("?" for _ in statement.columns) + ")"
+    return f"INSERT INTO {statement.table} ({statement.column_list}) VALUES " + ", ".join([row] * row_count)
+
+
+def sqlserver_values_rows(column_count: int) -> int:
+    """Max rows per multi-row VALUES statement on SQL Server"""
+    return max(1, min(SQLSERVER_MAX_VALUES_ROWS, (SQLSERVER_MAX_PARAMS - 1) // max(column_count, 1)))
+
+
+def upsert_statement(table: str, columns: Sequence[str], key_columns: Sequence[str],
+                     postgres: bool = False) -> str:
+    """
+    Build a one-row insert-or-update statement with ? placeholders
+
+    PostgreSQL uses INSERT ... ON CONFLICT, which needs a unique index or
+    constraint on key_columns; SQL Server uses MERGE.
+    """
+    missing = [key for key in key_columns if key not in columns]
+    if not key_columns or missing:
+        raise ValueError(f"Upsert key columns {missing or key_columns} must be among the loaded columns")
+    updates = [col for col in columns if col not in key_columns]
+    placeholders = ", ".join("?" for _ in columns)
+
+    if postgres:
+        action = (
+            "DO UPDATE SET " + ", ".join(f"{col} = EXCLUDED.{col}" for col in updates)
+            if updates else "DO NOTHING"
+        )
+        return (
+            f"INSERT INTO {table} ({', '.join(columns)}) VALUES ({placeholders}) "
+            f"ON CONFLICT ({', '.join(key_columns)}) {action}"
+        )
+
+    matched = (
+        " WHEN MATCHED THEN UPDATE SET " + ", ".join(f"target.{col} = source.{col}" for col in updates)
+        if updates else ""
+    )
+    return (
+        f"MERGE INTO {table} WITH (HOLDLOCK) AS target "
+        f"USING (SELECT {', '.join(f'? AS {col}' for col in columns)}) AS source "
+        f"ON {' AND '.join(f'target.{key} = source.{key}' for key in key_columns)}"
+        f"{matched} "
+        f"WHEN NOT MATCHED THEN INSERT ({', '.join(columns)}) "
+        f"VALUES ({', '.join(f'source.{col}' for col in columns)});"
+    )
@@ -0,0 +1,494 @@
+"""
+SQL Connection Pool
+Bounded, thread-safe DB-API connection pool used by SQLService
+
+Every SQLService instance pointing at the same database shares one pool, so
+the dozens of services that build their own SQLService still reuse a small
+set of warm connections instead of paying TCP + auth handshake per query.
+
+Features:
+- min/max pool size (min_size connections are kept warm once created)
+- wait queue with timeout when all connections are checked out
+- health check on checkout (closed flag + SELECT 1 after idle period)
+- idle reaping and max-lifetime recycling
+- statistics (checked-out, waiting, wait-time histogram)
+- per-event-loop registry for native async driver pools (asyncpg)
+
+Usage:
+    pool = get_sql_pool("postgresql://db:5432/documentintelligence", factory)
+    with pool.connection() as conn:
+        cursor = conn.cursor()
+        cursor.execute("SELECT 1")
+"""
+
+import asyncio
+import logging
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from typing import Any, Awaitable, Callable, Deque, Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Upper bounds (milliseconds) of the wait-time histogram buckets
+WAIT_TIME_BUCKETS_MS = (1, 5, 10, 50, 100, 500, 1000, 5000, float("inf"))
+
+
+class PoolTimeoutError(TimeoutError):
+    """Raised when no connection becomes available within the pool timeout"""
+    pass
+
+
+class SQLConnectionPool:
+    """Bounded, thread-safe pool of DB-API connections"""
+
+    def __init__(
+        self,
+        name: str,
+        factory: Callable[[], Any],
+        min_size: int = 1,
+        max_size: int = 10,
+        timeout: float = 30.0,
+        idle_timeout: float = 300.0,
+        max_lifetime: float = 3600.0,
+        validate_after: float = 30.0
+    ):
+        """
+        Args:
+            name: Pool label used in logs and stats (must not contain secrets)
+            factory: Callable returning a new DB-API connection
+            min_size: Connections kept open when reaping idle ones
+            max_size: Maximum number of open connections
+            timeout: Seconds to wait for a free connection before failing
+            idle_timeout: Seconds after which idle connections above min_size are closed
+            max_lifetime: Seconds after which a connection is recycled
+            validate_after: Idle seconds after which checkout runs SELECT 1
+        """
+        if max_size < 1:
+            raise ValueError("max_size must be at least 1")
+
+        self.name = name
+        self.factory = factory
+        self.min_size = max(0, min(min_size, max_size))
+        self.max_size = max_size
+        self.timeout = timeout
+        self.idle_timeout = idle_timeout
+        self.max_lifetime = max_lifetime
+        self.validate_after = validate_after
+
+        self._cond = threading.Condition(threading.Lock())
+        # Idle connections as (connection, created_at, last_used); most recently used on the right
+        self._idle: Deque[Tuple[Any, float, float]] = deque()
+        # id(connection) -> created_at for checked-out connections
+        self._in_use: Dict[int, float] = {}
+        self._total = 0
+        self._waiting = 0
+        self._closed = False
+
+        self._stats = {
+            "acquisitions": 0,
+            "timeouts": 0,
+            "connections_created": 0,
+            "connections_closed": 0,
+            "failed_health_checks": 0,
+            "peak_waiting": 0,
+            "peak_checked_out": 0,
+            "total_wait_ms": 0.0,
+        }
+        self._wait_histogram: List[int] = [0] * len(WAIT_TIME_BUCKETS_MS)
+
+    # ===== CHECKOUT / CHECKIN =====
+
+    def acquire(self, timeout: Optional[float] = None) -> Any:
+        """
+        Check a connection out of the pool
+
+        Args:
+            timeout: Seconds to wait for a free connection (default: pool timeout)
+
+        Returns:
+            A healthy DB-API connection
+
+        Raises:
+            PoolTimeoutError: If no connection became available in time
+        """
+        timeout = self.timeout if timeout is None else timeout
+        start = time.monotonic()
+        deadline = start + timeout
+
+        while True:
+            to_close: List[Any] = []
+            candidate = None
+            create = False
+
+            with self._cond:
+                if self._closed:
+                    raise RuntimeError(f"SQL pool '{self.name}' is closed")
+
+                to_close.extend(self._reap_locked(time.monotonic()))
+
+                if self._idle:
+                    candidate = self._idle.pop()
+                elif self._total < self.max_size:
+                    self._total += 1
+                    create = True
+                else:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        self._stats["timeouts"] += 1
+                        raise PoolTimeoutError(
+                            f"Timeout waiting for available connection from pool '{self.name}' "
+                            f"({self.max_size} checked out, waited {timeout:.1f}s)"
+                        )
+                    self._waiting += 1
+                    self._stats["peak_waiting"] = max(self._stats["peak_waiting"], self._waiting)
+                    try:
+                        self._cond.wait(remaining)
+                    finally:
+                        self._waiting -= 1
+
+            self._close_connections(to_close)
+
+            if create:
+                try:
+                    conn = self.factory()
+                except Exception:
+                    with self._cond:
+                        self._total -= 1
+                        self._cond.notify()
+                    raise
+                created_at = time.monotonic()
+                with self._cond:
+                    self._stats["connections_created"] += 1
+                return self._checkout(conn, created_at, start)
+
+            if candidate is not None:
+                conn, created_at, last_used = candidate
+                if self._is_healthy(conn, last_used):
+                    return self._checkout(conn, created_at, start)
+
+                # Stale connection: drop it and try again
+                with self._cond:
+                    self._total -= 1
+                    self._stats["failed_health_checks"] += 1
+                    self._cond.notify()
+                self._close_connections([conn])
+
+    def release(self, conn: Any, discard: bool = False):
+        """
+        Return a connection to the pool
+
+        Any open transaction is rolled back so the next borrower starts clean.
+
+        Args:
+            conn: Connection previously returned by acquire()
+            discard: Close the connection instead of returning it (e.g. after a connection error)
+        """
+        if conn is None:
+            return
+
+        if not discard:
+            try:
+                conn.rollback()
+            except Exception as e:
+                logger.debug(f"Discarding connection from pool '{self.name}' after failed rollback: {str(e)}")
+                discard = True
+
+        now = time.monotonic()
+        with self._cond:
+            created_at = self._in_use.pop(id(conn), now)
+            expired = self.max_lifetime and now - created_at > self.max_lifetime
+            if discard or expired or self._closed:
+                self._total -= 1
+                keep = False
+            else:
+                self._idle.append((conn, created_at, now))
+                keep = True
+            self._cond.notify()
+
+        if not keep:
+            self._close_connections([conn])
+
+    @contextmanager
+    def connection(self, timeout: Optional[float] = None):
+        """Context manager that checks a connection out and returns it afterwards"""
+        conn = self.acquire(timeout)
+        discard = False
+        try:
+            yield conn
+        except Exception:
+            discard = not self._is_open(conn)
+            raise
+        finally:
+            self.release(conn, discard=discard)
+
+    # ===== MAINTENANCE =====
+
+    def reap(self) -> int:
+        """Close idle connections past idle_timeout/max_lifetime; returns number closed"""
+        with self._cond:
+            to_close = self._reap_locked(time.monotonic())
+        self._close_connections(to_close)
+        return len(to_close)
+
+    def close(self):
+        """Close all idle connections; checked-out connections are closed on release"""
+        with self._cond:
+            self._closed = True
+            to_close = [conn for conn, _, _ in self._idle]
+            self._total -= len(to_close)
+            self._idle.clear()
+            self._cond.notify_all()
+        self._close_connections(to_close)
+        logger.info(f"SQL pool '{self.name}' closed")
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get pool statistics"""
+        with self._cond:
+            acquisitions = self._stats["acquisitions"]
+            histogram = {}
+            for bound, count in zip(WAIT_TIME_BUCKETS_MS, self._wait_histogram):
+                label = "+Inf" if bound == float("inf") else f"{bound}ms"
+                histogram[label] = count
+
+            return {
+                "name": self.name,
+                "min_size": self.min_size,
+                "max_size": self.max_size,
+                "total_connections": self._total,
+                "checked_out": len(self._in_use),
+                "idle": len(self._idle),
+                "waiting": self._waiting,
+                "exhausted": len(self._in_use) >= self.max_size,
+                "acquisitions": acquisitions,
+                "timeouts": self._stats["timeouts"],
+                "connections_created": self._stats["connections_created"],
+                "connections_closed": self._stats["connections_closed"],
+                "failed_health_checks": self._stats["failed_health_checks"],
+                "peak_waiting": self._stats["peak_waiting"],
+                "peak_checked_out": self._stats["peak_checked_out"],
+                "avg_wait_ms": round(self._stats["total_wait_ms"] / acquisitions, 3) if acquisitions else 0.0,
+                "wait_time_histogram": histogram,
+            }
+
+    # ===== INTERNALS =====
+
+    def _checkout(self, conn: Any, created_at: float, start: float) -> Any:
+        """Record a successful checkout"""
+        wait_ms = (time.monotonic() - start) * 1000
+        with self._cond:
+            self._in_use[id(conn)] = created_at
+            self._stats["acquisitions"] += 1
+            self._stats["total_wait_ms"] += wait_ms
+            self._stats["peak_checked_out"] = max(self._stats["peak_checked_out"], len(self._in_use))
+            for i, bound in enumerate(WAIT_TIME_BUCKETS_MS):
+                if wait_ms <= bound:
+                    self._wait_histogram[i] += 1
+                    break
+        return conn
+
+    def _reap_locked(self, now: float) -> List[Any]:
+        """Pop idle connections that should be closed (caller holds the lock)"""
+        to_close = []
+        kept: Deque[Tuple[Any, float, float]] = deque()
+        # Oldest-used connections are on the left; reap those first
+        while self._idle:
+            conn, created_at, last_used = self._idle.popleft()
+            expired = self.max_lifetime and now - created_at > self.max_lifetime
+            idle_too_long = (
+                self.idle_timeout
+                and now - last_used > self.idle_timeout
+                and self._total - len(to_close) > self.min_size
+            )
+            if expired or idle_too_long:
+                to_close.append(conn)
+            else:
+                kept.append((conn, created_at, last_used))
+        self._idle = kept
+        self._total -= len(to_close)
+        return to_close
+
+    def _is_healthy(self, conn: Any, last_used: float) -> bool:
+        """Check a connection on checkout"""
+        if not self._is_open(conn):
+            return False
+        if time.monotonic() - last_used < self.validate_after:
+            return True
+        try:
+            cursor = conn.cursor()
+            cursor.execute("SELECT 1")
+            cursor.fetchone()
+            cursor.close()
+            conn.rollback()
+            return True
+        except Exception as e:
+            logger.warning(f"Health check failed for pooled connection in '{self.name}': {str(e)}")
+            return False
+
+    @staticmethod
+    def _is_open(conn: Any) -> bool:
+        """Both psycopg2 and pyodbc expose a truthy `closed` attribute once closed"""
+        return not getattr(conn, "closed", False)
+
+    def _close_connections(self, connections: List[Any]):
+        """Close connections outside the lock"""
+        for conn in connections:
+            try:
+                conn.close()
+            except Exception as e:
+                logger.debug(f"Error closing pooled connection in '{self.name}': {str(e)}")
+        if connections:
+            with self._cond:
+                self._stats["connections_closed"] += len(connections)
+
+
+# Shared pools keyed by database identity
+_pools: Dict[str, SQLConnectionPool] = {}
+_pools_lock = threading.Lock()
+
+
+def get_sql_pool(key: str, factory: Callable[[], Any], name: Optional[str] = None, **pool_kwargs) -> SQLConnectionPool:
+    """
+    Get or create the shared pool for a database
+
+    Args:
+        key: Identity of the database (connection parameters); pools are shared per key
+        factory: Callable returning a new DB-API connection
+        name: Pool label for stats (defaults to key; pass one without credentials)
+        **pool_kwargs: SQLConnectionPool options used when the pool is created
+
+    Returns:
+        SQLConnectionPool: Shared pool instance
+    """
+    with _pools_lock:
+        pool = _pools.get(key)
+        if pool is None or pool._closed:
+            pool = SQLConnectionPool(name or key, factory, **pool_kwargs)
+            _pools[key] = pool
+            logger.info(
+                f"SQL connection pool '{pool.name}' initialized: "
+                f"min_size={pool.min_size}, max_size={pool.max_size}, timeout={pool.timeout}s"
+            )
+        return pool
+
+
+def close_sql_pools():
+    """Close all shared SQL connection pools"""
+    with _pools_lock:
+        pools = list(_pools.values())
+        _pools.clear()
+    for pool in pools:
+        pool.close()
+
+
+# Native async driver pools (e.g. asyncpg), keyed by (database identity, event loop).
+# Async pools are bound to the loop that created them, so each loop gets its own.
+# The loop itself is kept in _async_pool_loops: holding a reference stops its id
+# from being reused by a new loop, and closed loops' entries are dropped.
+_async_pools: Dict[Tuple[str, int], Any] = {}
+_async_pool_names: Dict[Tuple[str, int], str] = {}
+_async_pool_locks: Dict[Tuple[str, int], asyncio.Lock] = {}
+_async_pool_loops: Dict[Tuple[str, int], asyncio.AbstractEventLoop] = {}
+
+
+def _drop_closed_loop_pools():
+    """Forget pools whose event loop has closed (they can't be used or awaited anymore)"""
+    for pool_key in [k for k, loop in _async_pool_loops.items() if loop.is_closed()]:
+        _async_pool_loops.pop(pool_key, None)
+        _async_pools.pop(pool_key, None)
+        _async_pool_names.pop(pool_key, None)
+        _async_pool_locks.pop(pool_key, None)
+        logger.info(f"Dropped async SQL pool of a closed event loop ({pool_key[0]})")
+
+
+async def get_async_sql_pool(
+    key: str,
+    create_pool: Callable[[], Awaitable[Any]],
+    name: Optional[str] = None
+) -> Any:
+    """
+    Get or create the shared native async pool for a database on the running loop
+
+    Args:
+        key: Identity of the database (connection parameters)
+        create_pool: Coroutine function creating the driver pool (e.g. asyncpg.create_pool)
+        name: Pool label for stats (pass one without credentials)
+
+    Returns:
+        Driver pool instance
+    """
+    loop = asyncio.get_running_loop()
+    _drop_closed_loop_pools()
+    pool_key = (key, id(loop))
+    pool = _async_pools.get(pool_key)
+    if pool is not None:
+        return pool
+
+    _async_pool_loops[pool_key] = loop
+    lock = _async_pool_locks.setdefault(pool_key, asyncio.Lock())
+    async with lock:
+        pool = _async_pools.get(pool_key)
+        if pool is None:
+            pool = await create_pool()
+            _async_pools[pool_key] = pool
+            _async_pool_names[pool_key] = name or key
+            logger.info(f"Async SQL pool '{name or key}' initialized")
+    return pool
+
+
+async def close_async_sql_pools():
+    """Close native async pools created on the running event loop"""
+    loop_id = id(asyncio.get_running_loop())
+    for pool_key in [k for k in _async_pools if k[1] == loop_id]:
+        pool = _async_pools.pop(pool_key)
+        _async_pool_names.pop(pool_key, None)
+        _async_pool_locks.pop(pool_key, None)
+        _async_pool_loops.pop(pool_key, None)
+        try:
+            await pool.close()
+        except Exception as e:
+            logger.error(f"Error closing async SQL pool: {str(e)}")
+
+
+def _async_pool_stats(pool: Any) -> Dict[str, Any]:
+    """Stats for asyncpg-style pools (size/idle accessors)"""
+    size = pool.get_size()
+    idle = pool.get_idle_size()
+    return {
+        "min_size": pool.get_min_size(),
+        "max_size": pool.get_max_size(),
+        "total_connections": size,
+        "checked_out": size - idle,
+        "idle": idle,
+    }
+
+
+# Health check for SQL connection pools
+async def check_sql_pool_health() -> Dict[str, Any]:
+    """Check SQL connection pool health"""
+    try:
+        with _pools_lock:
+            pools = list(_pools.values())
+        stats = {}
+        for pool in pools:
+            pool.reap()
+            stats[pool.name] = pool.get_stats()
+        _drop_closed_loop_pools()
+        async_stats = {
+            _async_pool_names[pool_key]: _async_pool_stats(pool)
+            for pool_key, pool in list(_async_pools.items())
+        }
+        return {
+            "status": "healthy",
+            "pool_count": len(stats),
+            "checked_out": sum(s["checked_out"] for s in stats.values()),
+            "waiting": sum(s["waiting"] for s in stats.values()),
+            "pools": stats,
+            "async_pools": async_stats
+        }
+    except Exception as e:
+        return {
+            "status": "unhealthy",
+            "error": str(e)
+        }
@@ -84,6 +84,7 @@ Architecture:
 │                                                          │
 │  ┌────────────── Async Support ────────────────────┐   │
 │  │                                                  │   │
+│  │  asyncpg (PostgreSQL) - Native async driver    │   │
 │  │  asyncio.to_thread() - Run sync DB in threads  │   │
 │  │  - Prevents blocking event loop                │   │
 │  │  - Maintains async APIs                         │   │
@@ -281,11 +282,14 @@ Connection Pool Size: 10-50 connections
 - Too large: Database overload, memory waste
 - Optimal: 10-20 for typical workload
 
-Configuration:
-- Min connections: 5 (always ready)
-- Max connections: 50 (prevent overload)
-- Connection timeout: 30s
-- Idle timeout: 300s (5 minutes)
+Configuration (environment variables, see sql_pool.py):
+- DB_POOL_MIN_SIZE: 1 (kept warm once opened)
+- DB_POOL_SIZE: 10 (max connections, prevent overload)
+- DB_POOL_TIMEOUT: 30s (wait for a free connection)
+- DB_POOL_IDLE_TIMEOUT: 300s (5 minutes)
+- DB_POOL_RECYCLE: 3600s (max connection lifetime)
+
+Pool stats: sql_service.get_pool_stats() / check_sql_pool_health()
 ```
 
 Best Practices:
@@ -456,9 +460,13 @@ Database: Azure SQL Database
 """
 
 import os
+import re
+import time
+import uuid
 import logging
 import asyncio
-from typing import List, Dict, Any, Optional
+from functools import lru_cache
+from typing import List, Dict, Any, Optional, Iterator, AsyncIterator
 from contextlib import contextmanager, asynccontextmanager
 
 # Try to import both database drivers
@@ -470,14 +478,108 @@ except ImportError:
 
 try:
     import psycopg2
+    from psycopg2 import extras as psycopg2_extras
     PSYCOPG2_AVAILABLE = True
 except ImportError:
     PSYCOPG2_AVAILABLE = False
 
+# Native async driver for PostgreSQL (optional)
+try:
+    import asyncpg
+    ASYNCPG_AVAILABLE = True
+except ImportError:
+    ASYNCPG_AVAILABLE = False
+
+# pandas is only needed for DataFrame batches from iter_query/stream_query_async
 try:
-    from .connection_pool import connection_pool
+    import pandas as pd
+    PANDAS_AVAILABLE = True
 except ImportError:
-    connection_pool = None
+    PANDAS_AVAILABLE = False
+
+from .sql_pool import get_sql_pool, get_async_sql_pool, SQLConnectionPool
+from .bulk_loader import (
+    BULK_MODES,
+    BulkLoadError,
+    BulkLoadReport,
+    InsertStatement,
+    encode_copy_csv,
+    iter_chunks,
+    multi_row_insert,
+    parse_insert,
+    sqlserver_values_rows,
+    upsert_statement
+)
+
+# SQL Server -> PostgreSQL translation
+# ------------------------------------
+# The application issues a few dozen distinct SQL strings, so each one is
+# translated once (single regex pass) and then served from an LRU cache.
+
+QUERY_TRANSLATION_CACHE_SIZE = int(os.getenv('DB_QUERY_CACHE_SIZE', '512'))
+
+_POSTGRES_REPLACEMENTS = {
+    'GETUTCDATE()': "NOW() AT TIME ZONE 'UTC'",
+    'NEWID()': 'gen_random_uuid()',
+    'DATETIME2': 'TIMESTAMP',
+    'NVARCHAR': 'VARCHAR',
+    'BIT': 'BOOLEAN',
+}
+
+# One alternation, tried left to right at each position:
+#   literal  - quoted strings/identifiers are copied untouched
+#   dateadd  - DATEADD(hour, <n | ? | -?>, GETUTCDATE())
+#   param    - ? placeholder
+#   percent  - literal % (must be doubled for psycopg2 format style)
+#   word     - SQL Server function/type names
+_TRANSLATION_PATTERN = re.compile(
+    r"(?P<literal>'(?:[^']|'')*'|\"[^\"]*\")"
+    r"|(?P<dateadd>DATEADD\(\s*hour\s*,\s*(?P<sign>-?)\s*(?P<amount>\d+|\?)\s*,\s*GETUTCDATE\(\)\s*\))"
+    r"|(?P<param>\?)"
+    r"|(?P<percent>%)"
+    r"|(?P<word>GETUTCDATE\(\)|NEWID\(\)|\b(?:DATETIME2|NVARCHAR|BIT)\b)"
+)
+
+
+@lru_cache(maxsize=QUERY_TRANSLATION_CACHE_SIZE)
+def _translate_postgres_query(query: str, paramstyle: str = "format") -> str:
+    """
+    Translate a SQL Server query to PostgreSQL in a single pass
+    
+    Args:
+        query: Query text with ? placeholders
+        paramstyle: "format" emits %s (psycopg2), "numeric" emits $1, $2, ... (asyncpg)
+    
+    Returns:
+        Translated query text
+    """
+    numeric = paramstyle == "numeric"
+    counter = 0
+    
+    def placeholder() -> str:
+        nonlocal counter
+        counter += 1
+        return f"${counter}" if numeric else "%s"
+    
+    def replace(match) -> str:
+        kind = match.lastgroup
+        if kind == "literal":
+            text = match.group(0)
+            return text if numeric else text.replace('%', '%%')
+        if kind == "dateadd":
+            operator = '-' if match.group('sign') else '+'
+            amount = match.group('amount')
+            if amount == '?':
+                return f"(NOW() AT TIME ZONE 'UTC' {operator} {placeholder()} * INTERVAL '1 hour')"
+            return f"(NOW() AT TIME ZONE 'UTC' {operator} INTERVAL '{amount} hours')"
+        if kind == "param":
+            return placeholder()
+        if kind == "percent":
+            return '%' if numeric else '%%'
+        return _POSTGRES_REPLACEMENTS[match.group(0)]
+    
+    return _TRANSLATION_PATTERN.sub(replace, query)
+
 
 class SQLService:
     """
@@ -537,34 +639,132 @@ class SQLService:
             self.enabled = False
         else:
             self.logger.info("SQL Service initialized with SQL Server")
+        
+        self._pool: Optional[SQLConnectionPool] = None
+        
+        # Native async backend (asyncpg) for PostgreSQL mode; falls back to
+        # running the sync driver in threads when unavailable or disabled
+        self.use_native_async = (
+            self.use_postgres
+            and ASYNCPG_AVAILABLE
+            and os.getenv('DB_NATIVE_ASYNC', 'true').lower() == 'true'
+        )
+        if self.use_postgres and not self.use_native_async:
+            self.logger.info("Native async driver not in use, *_async methods run in thread pool")
+    
+    def _connect(self):
+        """Open a new raw database connection"""
+        if self.use_postgres:
+            return psycopg2.connect(**self.postgres_config, connect_timeout=5)
+        return pyodbc.connect(self.connection_string)
+    
+    @property
+    def pool(self) -> SQLConnectionPool:
+        """Shared connection pool for this database (created on first use)"""
+        if self._pool is None:
+            if self.use_postgres:
+                cfg = self.postgres_config
+                name = f"postgresql://{cfg['host']}:{cfg['port']}/{cfg['database']}"
+                key = f"{name}?user={cfg['user']}"
+            else:
+                name = "sqlserver"
+                key = self.connection_string
+            self._pool = get_sql_pool(
+                key,
+                self._connect,
+                name=name,
+                min_size=int(os.getenv('DB_POOL_MIN_SIZE', '1')),
+                max_size=int(os.getenv('DB_POOL_SIZE', '10')),
+                timeout=float(os.getenv('DB_POOL_TIMEOUT', '30')),
+                idle_timeout=float(os.getenv('DB_POOL_IDLE_TIMEOUT', '300')),
+                max_lifetime=float(os.getenv('DB_POOL_RECYCLE', '3600'))
+            )
+        return self._pool
     
     @contextmanager
     def get_connection(self):
-        """Context manager for database connections"""
+        """
+        Context manager for pooled database connections
+        
+        The connection is checked out of the shared pool and returned on exit;
+        uncommitted work is rolled back when it is returned.
+        """
         if not self.enabled and not self.use_postgres:
             self.logger.debug("SQL Service not enabled, returning None connection")
             yield None
             return
         
-        conn = None
         try:
-            if self.use_postgres:
-                conn = psycopg2.connect(**self.postgres_config, connect_timeout=5)
-            else:
-                conn = pyodbc.connect(self.connection_string)
-            yield conn
+            conn = self.pool.acquire()
         except Exception as e:
             self.logger.error(f"Database connection error: {str(e)}")
             raise
+        
+        discard = False
+        try:
+            yield conn
+        except Exception:
+            discard = bool(getattr(conn, 'closed', False))
+            raise
         finally:
-            if conn:
-                conn.close()
+            self.pool.release(conn, discard=discard)
     
     @asynccontextmanager
     async def get_pooled_connection(self):
-        """Get database connection from pool"""
-        async with connection_pool.get_sql_connection() as conn:
+        """Get database connection from pool without blocking the event loop"""
+        if not self.enabled and not self.use_postgres:
+            yield None
+            return
+        
+        conn = await asyncio.to_thread(self.pool.acquire)
+        discard = False
+        try:
             yield conn
+        except Exception:
+            discard = bool(getattr(conn, 'closed', False))
+            raise
+        finally:
+            await asyncio.to_thread(self.pool.release, conn, discard)
+    
+    async def _get_async_pool(self):
+        """Shared asyncpg pool for this database on the running event loop"""
+        cfg = self.postgres_config
+        name = f"postgresql://{cfg['host']}:{cfg['port']}/{cfg['database']}"
+        
+        async def create_pool():
+            min_size = int(os.getenv('PERF_ASYNC_SQL_POOL_SIZE', '10'))
+            max_overflow = int(os.getenv('PERF_ASYNC_SQL_MAX_OVERFLOW', '20'))
+            return await asyncpg.create_pool(
+                host=cfg['host'],
+                port=cfg['port'],
+                database=cfg['database'],
+                user=cfg['user'],
+                password=cfg['password'],
+                min_size=min_size,
+                max_size=min_size + max_overflow,
+                timeout=5,
+                command_timeout=float(os.getenv('DB_POOL_TIMEOUT', '30')),
+                # Per-connection LRU of prepared statements; the app issues a
+                # few dozen distinct statements so they are prepared once
+                statement_cache_size=int(os.getenv('DB_STATEMENT_CACHE_SIZE', '256')),
+                max_inactive_connection_lifetime=float(os.getenv('DB_POOL_IDLE_TIMEOUT', '300'))
+            )
+        
+        return await get_async_sql_pool(f"{name}?user={cfg['user']}", create_pool, name=name)
+    
+    @staticmethod
+    def _parse_command_status(status: str) -> int:
+        """Affected row count from an asyncpg command status (e.g. 'INSERT 0 3')"""
+        try:
+            return int(status.rsplit(' ', 1)[-1])
+        except (AttributeError, ValueError):
+            return -1
+    
+    def get_pool_stats(self) -> Dict[str, Any]:
+        """Get connection pool statistics (checked-out, waiting, wait-time histogram)"""
+        if not self.enabled and not self.use_postgres:
+            return {"enabled": False}
+        return self.pool.get_stats()
     
     def create_tables(self):
         """Create necessary tables for the application"""
@@ -765,40 +965,34 @@ class SQLService:
             self.logger.error(f"Failed to create tables: {str(e)}")
             raise
     
-    def _translate_query_for_postgres(self, query: str, params: tuple) -> tuple:
-        """Translate SQL Server query syntax to PostgreSQL"""
+    def _translate_query_for_postgres(self, query: str, params: tuple, paramstyle: str = "format") -> tuple:
+        """
+        Translate SQL Server query syntax to PostgreSQL
+        
+        Translations are cached per distinct query text (see _translate_postgres_query).
+        
+        Args:
+            query: SQL Server style query with ? placeholders
+            params: Query parameters (returned unchanged)
+            paramstyle: "format" (%s, psycopg2) or "numeric" ($1, asyncpg)
+        """
         if not self.use_postgres:
             return query, params
         
-        import re
-        
-        # Replace ? placeholders with $1, $2, etc for PostgreSQL
-        param_count = query.count('?')
-        for i in range(param_count, 0, -1):
-            query = query.replace('?', f'${i}', 1)
-        
-        # Reverse to get correct order
-        for i in range(1, param_count + 1):
-            query = query.replace(f'${param_count - i + 1}', f'${i}', 1)
-        
-        # Replace SQL Server specific functions with PostgreSQL equivalents
-        replacements = {
-            'GETUTCDATE()': 'NOW() AT TIME ZONE \'UTC\'',
-            'DATEADD(hour,': 'NOW() AT TIME ZONE \'UTC\' - INTERVAL \'',
-            'NEWID()': 'gen_random_uuid()',
-            'DATETIME2': 'TIMESTAMP',
-            'NVARCHAR': 'VARCHAR',
-            'BIT': 'BOOLEAN',
+        return _translate_postgres_query(query, paramstyle), params
+    
+    @staticmethod
+    def get_query_cache_stats() -> Dict[str, Any]:
+        """Get PostgreSQL query translation cache statistics"""
+        info = _translate_postgres_query.cache_info()
+        lookups = info.hits + info.misses
+        return {
+            "hits": info.hits,
+            "misses": info.misses,
+            "hit_rate": round(info.hits / lookups, 4) if lookups else 0.0,
+            "size": info.currsize,
+            "max_size": info.maxsize
         }
-        
-        for old, new in replacements.items():
-            query = query.replace(old, new)
-        
-        # Fix DATEADD translations
-        query = re.sub(r"NOW\(\) AT TIME ZONE 'UTC' - INTERVAL '(-?\d+), NOW\(\) AT TIME ZONE 'UTC'\)", 
-                      r"NOW() AT TIME ZONE 'UTC' - INTERVAL '\1 hours'", query)
-        
-        return query, params
     
     def execute_query(self, query: str, params: tuple = ()) -> List[Dict[str, Any]]:
         """Execute a SELECT query and return results"""
@@ -836,14 +1030,23 @@ class SQLService:
             self.logger.error(f"Non-query execution failed: {str(e)}")
             raise
     
-    def execute_batch(self, query: str, params_list: List[tuple]) -> int:
+    def execute_batch(self, query: str, params_list: List[tuple], mode: str = "auto",
+                      chunk_size: Optional[int] = None) -> int:
         """
         Execute batch INSERT/UPDATE/DELETE and return total affected rows
         100x more efficient than individual execute_non_query calls
         
+        Rows are sent in chunks using the fastest strategy the driver
+        supports (see bulk_loader.py). All chunks run in one transaction;
+        if a chunk fails everything is rolled back and BulkLoadError is
+        raised with the failing chunk in its report.
+        
         Args:
             query: SQL query with placeholders
             params_list: List of parameter tuples
+            mode: "auto", "copy" (PostgreSQL COPY), "values" (multi-row VALUES)
+                  or "executemany" (psycopg2 execute_batch / pyodbc fast_executemany)
+            chunk_size: Rows per chunk (default DB_BULK_CHUNK_SIZE, 10000)
             
         Returns:
             Total number of affected rows
@@ -853,23 +1056,318 @@ class SQLService:
             return 0
         
         try:
-            with self.get_connection() as conn:
-                cursor = conn.cursor()
-                
-                # Use executemany for batch execution
-                cursor.executemany(query, params_list)
-                conn.commit()
-                
-                total_rows = cursor.rowcount
-                self.logger.info(f"Batch executed {len(params_list)} statements, {total_rows} rows affected")
-                return total_rows
+            report = self._run_bulk_load(query, params_list, mode, chunk_size, atomic=True)
+            self.logger.info(
+                f"Batch executed {len(params_list)} statements, {report.rows_loaded} rows affected "
+                f"(mode={report.mode}, {report.rows_per_second:.0f} rows/s)"
+            )
+            return report.rows_loaded
                 
         except Exception as e:
             self.logger.error(f"Batch execution failed: {str(e)}")
             raise
     
+    def bulk_load(self, query: str, params_list: List[tuple], mode: str = "auto",
+                  chunk_size: Optional[int] = None, continue_on_error: bool = True) -> Dict[str, Any]:
+        """
+        Bulk load rows chunk by chunk, committing each chunk separately
+        
+        Unlike execute_batch, a failing chunk is rolled back on its own and
+        reported, and (with continue_on_error) the remaining chunks are
+        still loaded.
+        
+        Args:
+            query: SQL INSERT with ? placeholders
+            params_list: List of parameter tuples
+            mode: "auto", "copy", "values" or "executemany"
+            chunk_size: Rows per chunk (default DB_BULK_CHUNK_SIZE, 10000)
+            continue_on_error: Keep loading after a failed chunk
+            
+        Returns:
+            Load report: rows_loaded, chunks_loaded, failed_chunks, rows_per_second
+        """
+        if not params_list:
+            return BulkLoadReport(mode=mode, total_rows=0, chunk_size=chunk_size or 0).to_dict()
+        
+        report = self._run_bulk_load(
+            query, params_list, mode, chunk_size,
+            atomic=False, continue_on_error=continue_on_error
+        )
+        if report.failed_chunks:
+            self.logger.warning(
+                f"Bulk load finished with {len(report.failed_chunks)} failed chunks: "
+                f"{report.rows_loaded}/{report.total_rows} rows loaded"
+            )
+        return report.to_dict()
+    
+    def upsert_query(self, table: str, columns: List[str], key_columns: List[str]) -> str:
+        """
+        Insert-or-update statement for execute_batch / execute_batch_async
+        
+        Rows whose key_columns match an existing row update it; others are
+        inserted. PostgreSQL needs a unique index on key_columns.
+        """
+        return upsert_statement(table, columns, key_columns, postgres=self.use_postgres)
+    
+    def _resolve_bulk_mode(self, mode: str, statement: Optional[InsertStatement]) -> str:
+        """Pick the load strategy supported by the driver and statement"""
+        if mode not in BULK_MODES:
+            raise ValueError(f"Unsupported bulk mode '{mode}', expected one of {BULK_MODES}")
+        if statement is None:
+            # Only plain INSERT ... VALUES (?, ...) can be rewritten
+            return "executemany"
+        if mode == "auto":
+            # fast_executemany already sends parameter arrays in one round-trip on SQL Server
+            return "copy" if self.use_postgres else "executemany"
+        if mode == "copy" and not self.use_postgres:
+            return "values"
+        return mode
+    
+    def _load_chunk(self, cursor, query: str, statement: Optional[InsertStatement],
+                    chunk: List[tuple], mode: str) -> int:
+        """
+        Send one chunk with the resolved strategy; returns affected rows
+        
+        Counts come from cursor.rowcount. On PostgreSQL, statements other than
+        plain INSERTs (UPDATE, DELETE, upserts) run through executemany, which
+        sums rowcount over all rows; psycopg2's execute_batch only reports its
+        last page.
+        """
+        if mode == "copy":
+            cursor.copy_expert(
+                f"COPY {statement.table} ({statement.column_list}) FROM STDIN WITH (FORMAT csv)",
+                encode_copy_csv(chunk)
+            )
+            return self._affected_rows(cursor, len(chunk))
+        
+        if mode == "values":
+            if self.use_postgres:
+                # One statement for the whole chunk, so rowcount covers all of it
+                psycopg2_extras.execute_values(
+                    cursor,
+                    f"INSERT INTO {statement.table} ({statement.column_list}) VALUES %s",
+                    chunk,
+                    page_size=len(chunk)
+                )
+                return self._affected_rows(cursor, len(chunk))
+            
+            rows_per_statement = sqlserver_values_rows(len(statement.columns))
+            affected = 0
+            for _, _, rows in iter_chunks(chunk, rows_per_statement):
+                cursor.execute(
+                    multi_row_insert(statement, len(rows)),
+                    [value for row in rows for value in row]
+                )
+                affected += cursor.rowcount if cursor.rowcount >= 0 else len(rows)
+            return affected
+        
+        if self.use_postgres:
+            if statement is None:
+                cursor.executemany(query, chunk)
+                return self._affected_rows(cursor, len(chunk))
+            # Plain INSERT: every row is one affected row. Sends page_size
+            # statements per round-trip instead of one per row
+            psycopg2_extras.execute_batch(cursor, query, chunk, page_size=min(len(chunk), 1000))
+            return len(chunk)
+        cursor.fast_executemany = True
+        cursor.executemany(query, chunk)
+        return self._affected_rows(cursor, len(chunk))
+    
+    @staticmethod
+    def _affected_rows(cursor, fallback: int) -> int:
+        """cursor.rowcount, or fallback when the driver reports -1 (unknown)"""
+        return cursor.rowcount if cursor.rowcount is not None and cursor.rowcount >= 0 else fallback
+    
+    def _run_bulk_load(self, query: str, params_list: List[tuple], mode: str,
+                       chunk_size: Optional[int], atomic: bool,
+                       continue_on_error: bool = False) -> BulkLoadReport:
+        """Chunked load shared by execute_batch (atomic) and bulk_load (commit per chunk)"""
+        chunk_size = chunk_size or int(os.getenv('DB_BULK_CHUNK_SIZE', '10000'))
+        statement = parse_insert(query)
+        resolved_mode = self._resolve_bulk_mode(mode, statement)
+        translated, _ = self._translate_query_for_postgres(query, ())
+        report = BulkLoadReport(mode=resolved_mode, total_rows=len(params_list), chunk_size=chunk_size)
+        
+        start = time.perf_counter()
+        with self.get_connection() as conn:
+            cursor = conn.cursor()
+            for chunk_index, start_row, chunk in iter_chunks(params_list, chunk_size):
+                try:
+                    affected = self._load_chunk(cursor, translated, statement, chunk, resolved_mode)
+                    if not atomic:
+                        conn.commit()
+                    report.rows_loaded += affected
+                    report.chunks_loaded += 1
+                except Exception as e:
+                    conn.rollback()
+                    report.record_failure(chunk_index, start_row, len(chunk), e)
+                    self.logger.error(
+                        f"Bulk load chunk {chunk_index} (rows {start_row}-{start_row + len(chunk) - 1}) "
+                        f"failed: {str(e)}"
+                    )
+                    if atomic:
+                        report.rows_loaded = 0
+                        report.chunks_loaded = 0
+                    if atomic or not continue_on_error:
+                        report.elapsed_seconds = time.perf_counter() - start
+                        raise BulkLoadError(
+                            f"Bulk load failed at chunk {chunk_index} (row {start_row}): {str(e)}",
+                            report
+                        ) from e
+            if atomic:
+                conn.commit()
+        report.elapsed_seconds = time.perf_counter() - start
+        return report
+    
+    # ===== STREAMING QUERIES =====
+    # Server-side cursors yielding fixed-size batches so large scans
+    # (30-day metric windows, ETL extracts) run in bounded memory.
+    
+    STREAM_OUTPUTS = ("rows", "columns", "dataframe")
+    
+    def _default_fetch_size(self) -> int:
+        return int(os.getenv('DB_FETCH_SIZE', '5000'))
+    
+    def _format_batch(self, columns: List[str], rows: List[Any], output: str) -> Any:
+        """
+        Shape a fetched batch
+        
+        - rows: list of dicts (same as execute_query)
+        - columns: dict of column name -> list of values
+        - dataframe: pandas DataFrame
+        """
+        if output == "rows":
+            return [dict(zip(columns, row)) for row in rows]
+        if output == "columns":
+            values = list(zip(*rows)) if rows else [()] * len(columns)
+            return {col: list(vals) for col, vals in zip(columns, values)}
+        return pd.DataFrame.from_records([tuple(row) for row in rows], columns=columns)
+    
+    def _validate_stream_output(self, output: str):
+        if output not in self.STREAM_OUTPUTS:
+            raise ValueError(f"Unsupported output '{output}', expected one of {self.STREAM_OUTPUTS}")
+        if output == "dataframe" and not PANDAS_AVAILABLE:
+            raise ImportError("pandas is required for output='dataframe'")
+    
+    def iter_query(
+        self,
+        query: str,
+        params: tuple = (),
+        fetch_size: Optional[int] = None,
+        output: str = "rows"
+    ) -> Iterator[Any]:
+        """
+        Execute a SELECT query and yield results in batches
+        
+        PostgreSQL uses a named (server-side) cursor; SQL Server uses a
+        forward-only cursor with fetchmany. Only one batch is held in memory
+        at a time. The pooled connection is held until the iterator is
+        exhausted or closed.
+        
+        Args:
+            query: SQL SELECT query
+            params: Query parameters
+            fetch_size: Rows per batch (default DB_FETCH_SIZE, 5000)
+            output: "rows" (list of dicts), "columns" (dict of lists) or "dataframe"
+            
+        Yields:
+            One batch per fetch, shaped according to output
+        """
+        self._validate_stream_output(output)
+        fetch_size = fetch_size or self._default_fetch_size()
+        query, params = self._translate_query_for_postgres(query, params)
+        
+        with self.get_connection() as conn:
+            if conn is None:
+                return
+            if self.use_postgres:
+                cursor = conn.cursor(name=f"sqlservice_stream_{uuid.uuid4().hex}")
+                cursor.itersize = fetch_size
+            else:
+                cursor = conn.cursor()
+                cursor.arraysize = fetch_size
+            
+            try:
+                cursor.execute(query, params)
+                columns = None
+                while True:
+                    rows = cursor.fetchmany(fetch_size)
+                    if not rows:
+                        break
+                    if columns is None:
+                        # Named cursors only expose description after the first fetch
+                        columns = [column[0] for column in cursor.description]
+                    yield self._format_batch(columns, rows, output)
+            except Exception as e:
+                self.logger.error(f"Streaming query failed: {str(e)}")
+                raise
+            finally:
+                try:
+                    cursor.close()
+                except Exception:
+                    pass
+    
+    async def stream_query_async(
+        self,
+        query: str,
+        params: tuple = (),
+        fetch_size: Optional[int] = None,
+        output: str = "rows"
+    ) -> AsyncIterator[Any]:
+        """
+        Execute a SELECT query asynchronously and yield results in batches
+        
+        Uses an asyncpg server-side cursor in PostgreSQL mode; otherwise
+        advances iter_query in the thread pool one batch at a time.
+        
+        Args:
+            query: SQL SELECT query
+            params: Query parameters
+            fetch_size: Rows per batch (default DB_FETCH_SIZE, 5000)
+            output: "rows" (list of dicts), "columns" (dict of lists) or "dataframe"
+            
+        Yields:
+            One batch per fetch, shaped according to output
+        """
+        self._validate_stream_output(output)
+        fetch_size = fetch_size or self._default_fetch_size()
+        
+        if not self.use_native_async:
+            iterator = self.iter_query(query, params, fetch_size, output)
+            done = object()
+            try:
+                while True:
+                    batch = await asyncio.to_thread(next, iterator, done)
+                    if batch is done:
+                        break
+                    yield batch
+            finally:
+                await asyncio.to_thread(iterator.close)
+            return
+        
+        try:
+            query, params = self._translate_query_for_postgres(query, params, paramstyle="numeric")
+            pool = await self._get_async_pool()
+            async with pool.acquire() as conn:
+                # asyncpg cursors must run inside a transaction
+                async with conn.transaction():
+                    statement = await conn.prepare(query)
+                    columns = [attr.name for attr in statement.get_attributes()]
+                    cursor = await statement.cursor(*params)
+                    while True:
+                        records = await cursor.fetch(fetch_size)
+                        if not records:
+                            break
+                        yield self._format_batch(columns, records, output)
+        except Exception as e:
+            self.logger.error(f"Streaming query failed: {str(e)}")
+            raise
+    
     # ===== ASYNC DATABASE OPERATIONS =====
-    # Non-blocking database operations for 10-20x throughput improvement
+    # Non-blocking database operations for 10-20x throughput improvement.
+    # In PostgreSQL mode these use asyncpg directly (no thread per query,
+    # prepared statements cached per connection); otherwise the sync driver
+    # runs in the default thread pool.
     
     async def execute_query_async(self, query: str, params: tuple = ()) -> List[Dict[str, Any]]:
         """
@@ -883,8 +1381,19 @@ class SQLService:
         Returns:
             List of result dictionaries
         """
-        # Run synchronous operation in thread pool
-        return await asyncio.to_thread(self.execute_query, query, params)
+        if not self.use_native_async:
+            # Run synchronous operation in thread pool
+            return await asyncio.to_thread(self.execute_query, query, params)
+        
+        try:
+            query, params = self._translate_query_for_postgres(query, params, paramstyle="numeric")
+            pool = await self._get_async_pool()
+            async with pool.acquire() as conn:
+                records = await conn.fetch(query, *params)
+            return [dict(record) for record in records]
+        except Exception as e:
+            self.logger.error(f"Query execution failed: {str(e)}")
+            raise
     
     async def execute_non_query_async(self, query: str, params: tuple = ()) -> int:
         """
@@ -897,21 +1406,80 @@ class SQLService:
         Returns:
             Number of affected rows
         """
-        return await asyncio.to_thread(self.execute_non_query, query, params)
+        if not self.use_native_async:
+            return await asyncio.to_thread(self.execute_non_query, query, params)
+        
+        try:
+            query, params = self._translate_query_for_postgres(query, params, paramstyle="numeric")
+            pool = await self._get_async_pool()
+            async with pool.acquire() as conn:
+                status = await conn.execute(query, *params)
+            return self._parse_command_status(status)
+        except Exception as e:
+            self.logger.error(f"Non-query execution failed: {str(e)}")
+            raise
     
-    async def execute_batch_async(self, query: str, params_list: List[tuple]) -> int:
+    async def execute_batch_async(self, query: str, params_list: List[tuple], mode: str = "auto",
+                                  chunk_size: Optional[int] = None) -> int:
         """
         Execute batch INSERT/UPDATE/DELETE asynchronously (non-blocking)
         Combines async + batch for maximum performance
         
+        With asyncpg plain INSERTs use binary COPY and are pipelined with
+        executemany otherwise; other statements (UPDATE, DELETE, upserts) run
+        through one prepared statement so each row's affected count is
+        known. All chunks run in a single transaction.
+        
         Args:
             query: SQL query with placeholders
             params_list: List of parameter tuples
+            mode: Bulk mode, see execute_batch
+            chunk_size: Rows per chunk (default DB_BULK_CHUNK_SIZE, 10000)
             
         Returns:
             Total number of affected rows
         """
-        return await asyncio.to_thread(self.execute_batch, query, params_list)
+        if not self.use_native_async:
+            return await asyncio.to_thread(self.execute_batch, query, params_list, mode, chunk_size)
+        
+        if not params_list:
+            self.logger.warning("Empty params_list for batch execution")
+            return 0
+        
+        chunk_size = chunk_size or int(os.getenv('DB_BULK_CHUNK_SIZE', '10000'))
+        try:
+            statement = parse_insert(query)
+            query, _ = self._translate_query_for_postgres(query, (), paramstyle="numeric")
+            pool = await self._get_async_pool()
+            affected = 0
+            async with pool.acquire() as conn:
+                async with conn.transaction():
+                    prepared = None if statement is not None else await conn.prepare(query)
+                    for _, _, chunk in iter_chunks(params_list, chunk_size):
+                        if statement is not None and mode in ("auto", "copy"):
+                            # Binary COPY straight from the parameter tuples
+                            schema, _, table = statement.table.rpartition('.')
+                            status = await conn.copy_records_to_table(
+                                table.strip('"'),
+                                records=chunk,
+                                columns=[col.strip('"') for col in statement.columns],
+                                schema_name=schema.strip('"') or None
+                            )
+                            copied = self._parse_command_status(status)
+                            affected += copied if copied >= 0 else len(chunk)
+                        elif statement is not None:
+                            # Plain INSERT: every row is one affected row
+                            await conn.executemany(query, chunk)
+                            affected += len(chunk)
+                        else:
+                            for params in chunk:
+                                await prepared.fetch(*params)
+                                affected += max(self._parse_command_status(prepared.get_statusmsg()), 0)
+            self.logger.info(f"Batch executed {len(params_list)} statements, {affected} rows affected (async)")
+            return affected
+        except Exception as e:
+            self.logger.error(f"Batch execution failed: {str(e)}")
+            raise
     
     async def store_processing_job_async(
         self,
@@ -945,7 +1513,11 @@ class SQLService:
     
     async def get_user_jobs_async(self, user_id: str, limit: int = 50) -> List[Dict[str, Any]]:
         """Get user's processing jobs asynchronously"""
-        return await asyncio.to_thread(self.get_user_jobs, user_id, limit)
+        try:
+            return await self.execute_query_async(self.USER_JOBS_QUERY, (limit, user_id))
+        except Exception as e:
+            self.logger.error(f"Failed to get user jobs: {str(e)}")
+            raise
     
     async def store_api_key_async(
         self,
@@ -971,17 +1543,22 @@ class SQLService:
         self,
         metric_name: str,
         metric_value: float,
-        timestamp: Any,
+        timestamp: Any = None,
         metadata: Optional[str] = None
-    ) -> str:
-        """Store analytics metric asynchronously"""
-        return await asyncio.to_thread(
-            self.store_metric,
-            metric_name,
-            metric_value,
-            timestamp,
-            metadata
-        )
+    ):
+        """Store analytics metric asynchronously (timestamp defaults to now)"""
+        try:
+            if timestamp is None:
+                await self.execute_non_query_async(
+                    self.STORE_METRIC_QUERY, (metric_name, metric_value, metadata)
+                )
+            else:
+                await self.execute_non_query_async(
+                    self.STORE_METRIC_AT_QUERY, (metric_name, metric_value, timestamp, metadata)
+                )
+        except Exception as e:
+            self.logger.error(f"Failed to store metric: {str(e)}")
+            raise
     
     async def get_metrics_async(
         self,
@@ -989,13 +1566,23 @@ class SQLService:
         start_time: Any,
         end_time: Any
     ) -> List[Dict[str, Any]]:
-        """Get analytics metrics asynchronously"""
-        return await asyncio.to_thread(
-            self.get_metrics,
-            metric_name,
-            start_time,
-            end_time
-        )
+        """Get analytics metrics in a time range asynchronously"""
+        # Skip if using PostgreSQL (table doesn't exist yet)
+        if self.use_postgres:
+            self.logger.info("Metrics not yet implemented for PostgreSQL")
+            return []
+        
+        query = """
+        SELECT metric_name, metric_value, metric_timestamp, metadata
+        FROM analytics_metrics 
+        WHERE metric_name = ? AND metric_timestamp >= ? AND metric_timestamp <= ?
+        ORDER BY metric_timestamp DESC
+        """
+        try:
+            return await self.execute_query_async(query, (metric_name, start_time, end_time))
+        except Exception as e:
+            self.logger.error(f"Failed to get metrics: {str(e)}")
+            raise
     
     # ===== END ASYNC OPERATIONS =====
     
@@ -1037,29 +1624,36 @@ class SQLService:
             self.logger.error(f"Failed to update job status: {str(e)}")
             raise
     
-    def get_user_jobs(self, user_id: str, limit: int = 50) -> List[Dict[str, Any]]:
-        """Get processing jobs for a user"""
-        query = """
+    USER_JOBS_QUERY = """
         SELECT TOP (?) id, document_name, document_path, status, 
                created_at, completed_at, error_message, processing_metadata
         FROM processing_jobs 
         WHERE user_id = ? 
         ORDER BY created_at DESC
         """
+    
+    STORE_METRIC_QUERY = """
+        INSERT INTO analytics_metrics (metric_name, metric_value, metadata)
+        VALUES (?, ?, ?)
+        """
+    
+    STORE_METRIC_AT_QUERY = """
+        INSERT INTO analytics_metrics (metric_name, metric_value, metric_timestamp, metadata)
+        VALUES (?, ?, ?, ?)
+        """
+    
+    def get_user_jobs(self, user_id: str, limit: int = 50) -> List[Dict[str, Any]]:
+        """Get processing jobs for a user"""
         try:
-            return self.execute_query(query, (limit, user_id))
+            return self.execute_query(self.USER_JOBS_QUERY, (limit, user_id))
         except Exception as e:
             self.logger.error(f"Failed to get user jobs: {str(e)}")
             raise
     
     def store_metric(self, metric_name: str, metric_value: float, metadata: str = None):
         """Store an analytics metric"""
-        query = """
-        INSERT INTO analytics_metrics (metric_name, metric_value, metadata)
-        VALUES (?, ?, ?)
-        """
         try:
-            self.execute_non_query(query, (metric_name, metric_value, metadata))
+            self.execute_non_query(self.STORE_METRIC_QUERY, (metric_name, metric_value, metadata))
         except Exception as e:
             self.logger.error(f"Failed to store metric: {str(e)}")
             raise
@@ -1127,17 +1721,10 @@ class SQLService:
     def get_document(self, document_id: str) -> Optional[Dict[str, Any]]:
         """Get document by ID"""
         try:
-            with self.get_connection() as conn:
-                cursor = conn.cursor()
-                cursor.execute("""
-                    SELECT * FROM documents WHERE document_id = ?
-                """, (document_id,))
-                
-                row = cursor.fetchone()
-                if row:
-                    columns = [column[0] for column in cursor.description]
-                    return dict(zip(columns, row))
-                return None
+            rows = self.execute_query("""
+                SELECT * FROM documents WHERE document_id = ?
+            """, (document_id,))
+            return rows[0] if rows else None
                 
         except Exception as e:
             self.logger.error(f"Error getting document: {str(e)}")
@@ -0,0 +1,127 @@
+"""
+Keyword Matcher
+Precompiled single-pass matching of keyword dictionaries against document text
+
+All keywords of all categories are folded into a prefix trie and compiled
+into one regular expression, e.g. ["invoice", "invoice date", "irs"] becomes
+i(?:nvoice(?: date)?|rs). The text is scanned once; after each match the
+search resumes one character later, so keywords that overlap or are
+contained in other keywords are found too - the same results as checking
+`keyword in text` for each keyword, without one scan per keyword.
+
+At a given position the trie regex returns the longest keyword; every
+shorter keyword starting there is a prefix of it, so those are looked up
+from a precomputed table instead of being matched again.
+
+For small dictionaries CPython's substring search (one C-level scan per
+keyword) is faster than a regex pass, so up to scan_threshold keywords the
+matcher scans per keyword instead. scripts/benchmark_keyword_matcher.py
+measures the crossover.
+
+Keywords are plain substrings (not regexes) and are matched lowercase;
+callers pass lowercased text.
+
+Usage:
+    matcher = KeywordMatcher({"invoice": ["invoice", "amount due"], "tax": ["w-2", "irs"]})
+    matcher.count(text)  # {"invoice": 2, "tax": 0}
+"""
+
+import re
+from typing import Dict, Iterable, List, Optional, Set
+
+
+def _trie_pattern(keywords: Iterable[str]) -> str:
+    """Regex alternation of keywords with shared prefixes factored out"""
+    trie: Dict[str, dict] = {}
+    for keyword in keywords:
+        node = trie
+        for char in keyword:
+            node = node.setdefault(char, {})
+        node[""] = {}
+
+    def build(node: Dict[str, dict]) -> str:
+        branches = [re.escape(char) + build(child) for char, child in sorted(node.items()) if char]
+        if not branches:
+            return ""
+        body = branches[0] if len(branches) == 1 else "(?:" + "|".join(branches) + ")"
+        # A keyword ends here: longer keywords through this node are optional (greedy)
+        if "" in node:
+            return f"(?:{body})?"
+        return body
+
+    return build(trie)
+
+
+class KeywordMatcher:
+    """Matches several keyword dictionaries against a text in one pass"""
+
+    # Keyword count above which the single-pass regex beats per-keyword scans
+    DEFAULT_SCAN_THRESHOLD = 64
+
+    def __init__(self, dictionaries: Dict[str, Iterable[str]], scan_threshold: Optional[int] = None):
+        """
+        Args:
+            dictionaries: Category name -> keywords (matched as lowercase substrings)
+            scan_threshold: Up to this many keywords, scan per keyword (default: 64)
+        """
+        self.dictionaries: Dict[str, List[str]] = {
+            category: list(dict.fromkeys(keyword.lower() for keyword in keywords if keyword))
+            for category, keywords in dictionaries.items()
+        }
+
+        # Keyword -> categories it belongs to
+        self._categories: Dict[str, List[str]] = {}
+        for category, keywords in self.dictionaries.items():
+            for keyword in keywords:
+                self._categories.setdefault(keyword, []).append(category)
+
+        # Keyword -> all keywords that are prefixes of it (itself included)
+        keywords = set(self._categories)
+        self._prefixes: Dict[str, List[str]] = {
+            keyword: [keyword[:i] for i in range(1, len(keyword) + 1) if keyword[:i] in keywords]
+            for keyword in keywords
+        }
+
+        if scan_threshold is None:
+            scan_threshold = self.DEFAULT_SCAN_THRESHOLD
+        self._pattern = (
+            re.compile(_trie_pattern(keywords)) if len(keywords) > scan_threshold else None
+        )
+
+    def find(self, text: str) -> Dict[str, Set[str]]:
+        """Keywords of each category that occur in text"""
+        found: Dict[str, Set[str]] = {category: set() for category in self.dictionaries}
+        if not text:
+            return found
+
+        if self._pattern is None:
+            for keyword, categories in self._categories.items():
+                if keyword in text:
+                    for category in categories:
+                        found[category].add(keyword)
+            return found
+
+        longest_matches = set()
+        search = self._pattern.search
+        match = search(text)
+        while match is not None:
+            longest_matches.add(match.group())
+            match = search(text, match.start() + 1)
+
+        for longest in longest_matches:
+            for keyword in self._prefixes[longest]:
+                for category in self._categories[keyword]:
+                    found[category].add(keyword)
+        return found
+
+    def count(self, text: str) -> Dict[str, int]:
+        """Number of distinct keywords of each category that occur in text"""
+        return {category: len(keywords) for category, keywords in self.find(text).items()}
+
+    def first_match(self, text: str, category: str) -> Optional[str]:
+        """First keyword of a category, in dictionary order, that occurs in text"""
+        found = self.find(text)[category]
+        for keyword in self.dictionaries[category]:
+            if keyword in found:
+                return keyword
+        return None
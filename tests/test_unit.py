@@ -87,6 +87,18 @@ class TestPythonSyntax:
             "src/microservices/ai-processing/langchain_orchestration.py",
             "src/microservices/ai-processing/llmops_automation.py",
             "src/microservices/analytics/automation_scoring.py",
+            "src/shared/storage/sql_pool.py",
+            "src/shared/storage/bulk_loader.py",
+            "src/shared/cache/local_cache.py",
+            "src/shared/cache/codecs.py",
+            "src/shared/cache/batching.py",
+            "src/shared/cache/llm_cache.py",
+            "src/microservices/ai-processing/ocr_pool.py",
+            "src/microservices/ai-processing/batch_jobs.py",
+            "src/microservices/ai-processing/text_chunking.py",
+            "src/microservices/ai-processing/model_registry.py",
+            "src/shared/utils/keyword_matcher.py",
+            "src/microservices/batch-processor/sql_expressions.py",
         ]
         
         for file_path in new_modules:
@@ -258,6 +270,691 @@ class TestConfigurationFiles:
             assert "__pycache__" in content or "*.pyc" in content
 
 
+class TestAsyncSQLPoolRegistry:
+    """Test the per-event-loop registry of native async SQL pools"""
+    
+    def test_closed_loop_pool_is_not_reused(self):
+        import asyncio
+        from src.shared.storage import sql_pool
+        
+        created = []
+        
+        async def create_pool():
+            created.append(asyncio.get_running_loop())
+            return object()
+        
+        async def get():
+            return await sql_pool.get_async_sql_pool("test-db", create_pool)
+        
+        first_loop = asyncio.new_event_loop()
+        first = first_loop.run_until_complete(get())
+        assert first_loop.run_until_complete(get()) is first
+        first_loop.close()
+        
+        second_loop = asyncio.new_event_loop()
+        try:
+            second = second_loop.run_until_complete(get())
+        finally:
+            second_loop.close()
+        
+        # Even if the new loop reuses the old loop's id, it gets its own pool
+        assert second is not first
+        assert created == [first_loop, second_loop]
+        assert first_loop not in sql_pool._async_pool_loops.values()
+
+
+class TestCacheGetOrSet:
+    """Test per-value TTLs in RedisCacheService.get_or_set"""
+    
+    def test_ttl_for_shortens_ttl_and_stale_window(self, monkeypatch):
+        import asyncio
+        pytest.importorskip("redis")
+        from src.shared.cache.redis_cache import RedisCacheService
+        
+        service = RedisCacheService()
+        stored = {}
+        
+        async def set_value(key, value, ttl=None, tags=None):
+            stored[key] = (value, ttl)
+            return True
+        
+        async def no_value(key):
+            return None
+        
+        async def acquire(lock_key, token):
+            return True
+        
+        async def release(lock_key, token):
+            pass
+        
+        monkeypatch.setattr(service, "set", set_value)
+        monkeypatch.setattr(service, "_get_raw", no_value)
+        monkeypatch.setattr(service, "_acquire_lock", acquire)
+        monkeypatch.setattr(service, "_release_lock", release)
+        
+        def ttl_for(metrics):
+            return 60 if not metrics["total_processed"] else None
+        
+        async def run():
+            await service.get_or_set("empty", lambda: {"total_processed": 0}, ttl=3600, stale_ttl=3600, ttl_for=ttl_for)
+            await service.get_or_set("full", lambda: {"total_processed": 5}, ttl=3600, stale_ttl=3600, ttl_for=ttl_for)
+        
+        asyncio.run(run())
+        
+        # Fresh for 60 s and at most 60 s stale, instead of 3600 + 3600
+        assert stored["empty"][1] == 120
+        assert stored["full"][1] == 7200
+
+
+class TestBulkLoadRowCounts:
+    """Test that batch loads report the driver's affected-row counts"""
+    
+    class FakeCursor:
+        def __init__(self, rowcount):
+            self.rowcount = rowcount
+            self.calls = []
+        
+        def executemany(self, query, rows):
+            self.calls.append((query, list(rows)))
+    
+    def _service(self, use_postgres):
+        from types import SimpleNamespace
+        from src.shared.storage.sql_service import SQLService
+        return SQLService, SimpleNamespace(use_postgres=use_postgres, _affected_rows=SQLService._affected_rows)
+    
+    def test_upsert_chunk_returns_rowcount(self):
+        """Conflicting rows that MERGE/ON CONFLICT skip are not counted"""
+        for use_postgres in (False, True):
+            SQLService, service = self._service(use_postgres)
+            cursor = self.FakeCursor(rowcount=2)
+            rows = [(1, "a"), (2, "b"), (3, "c")]
+            
+            affected = SQLService._load_chunk(service, cursor, "UPSERT", None, rows, "executemany")
+            
+            assert affected == 2
+            assert cursor.calls == [("UPSERT", rows)]
+    
+    def test_unknown_rowcount_falls_back_to_chunk_size(self):
+        SQLService, service = self._service(False)
+        cursor = self.FakeCursor(rowcount=-1)
+        
+        assert SQLService._load_chunk(service, cursor, "INSERT", None, [(1,), (2,)], "executemany") == 2
+
+
+class TestCacheInvalidationListener:
+    """Test the L1 invalidation listener of RedisCacheService"""
+    
+    class FakePubSub:
+        def __init__(self, messages, fail, gate=None):
+            self.messages, self.fail, self.gate = messages, fail, gate
+            self.subscribed = []
+        
+        async def subscribe(self, channel):
+            self.subscribed.append(channel)
+        
+        async def listen(self):
+            import asyncio
+            if self.gate is not None:
+                await self.gate.wait()
+            for message in self.messages:
+                yield message
+            if self.fail:
+                raise ConnectionError("connection reset")
+            await asyncio.Event().wait()
+        
+        async def close(self):
+            pass
+    
+    @staticmethod
+    def _message(**payload):
+        import json
+        data = {"origin": "other-replica", "keys": [], "pattern": None, **payload}
+        return {"type": "message", "data": json.dumps(data)}
+    
+    def test_listener_reconnects_and_keeps_l1(self, monkeypatch):
+        import asyncio
+        from types import SimpleNamespace
+        pytest.importorskip("redis")
+        monkeypatch.setenv("CACHE_L1_ENABLED", "true")
+        from src.shared.cache.redis_cache import RedisCacheService, INVALIDATION_CHANNEL
+        from src.shared.cache.local_cache import MISSING
+        
+        service = RedisCacheService()
+        service.invalidation_retry_delay = 0
+        
+        async def run():
+            gate = asyncio.Event()
+            first = self.FakePubSub([self._message(keys=["a"])], fail=True)
+            second = self.FakePubSub([self._message(pattern="doc:*")], fail=False, gate=gate)
+            subscriptions = [first, second]
+            service._pubsub_client = SimpleNamespace(pubsub=lambda **kwargs: subscriptions.pop(0))
+            
+            service.l1.set("a", 1, 30)
+            service.l1.set("b", 1, 30)
+            task = asyncio.create_task(service._listen_for_invalidations())
+            await asyncio.sleep(0.05)
+            
+            # The disconnect cleared L1 once; the listener resubscribed instead of disabling it
+            assert service.l1 is not None
+            assert service.l1.get("b") is MISSING
+            assert second.subscribed == [INVALIDATION_CHANNEL]
+            
+            service.l1.set("doc:1", 1, 30)
+            service.l1.set("kept", 1, 30)
+            gate.set()
+            await asyncio.sleep(0.05)
+            assert service.l1.get("doc:1") is MISSING
+            assert service.l1.get("kept") == 1
+            
+            task.cancel()
+            with pytest.raises(asyncio.CancelledError):
+                await task
+        
+        asyncio.run(run())
+
+
+class TestCacheCodecs:
+    """Test round-trips of the Redis cache codecs"""
+    
+    def _value(self):
+        from datetime import date, datetime
+        from decimal import Decimal
+        return {
+            "created_at": datetime(2024, 1, 15, 10, 30, 5, 120),
+            "due": date(2024, 2, 1),
+            "amount": Decimal("1234.50"),
+            "tags": {"invoice", "paid"},
+            "raw": b"\x00\xffdata",
+            "nested": [{"when": datetime(2023, 12, 31)}, 1, "text", None],
+        }
+    
+    @pytest.mark.parametrize("profile", ["fast", "compact"])
+    def test_profiles_preserve_types(self, profile):
+        from src.shared.cache.codecs import get_codec, decode_value
+        value = self._value()
+        
+        assert decode_value(get_codec(profile).encode(value)) == value
+    
+    def test_compression_above_threshold(self):
+        from src.shared.cache.codecs import CacheCodec, decode_value, HEADER_SIZE, COMPRESSOR_IDS
+        codec = CacheCodec("test", compression="zlib", compress_threshold=100)
+        value = {"text": "invoice " * 500}
+        
+        encoded = codec.encode(value)
+        assert encoded[2] == COMPRESSOR_IDS["zlib"]
+        assert len(encoded) - HEADER_SIZE < len("invoice " * 500)
+        assert decode_value(encoded) == value
+        # Small values are stored uncompressed
+        assert codec.encode({"a": 1})[2] == COMPRESSOR_IDS["none"]
+    
+    def test_wide_ints_fall_back_to_json(self):
+        from src.shared.cache.codecs import get_codec, decode_value
+        value = {"id": 2 ** 80, "negative": -(2 ** 70)}
+        
+        for profile in ("fast", "compact"):
+            assert decode_value(get_codec(profile).encode(value)) == value
+    
+    def test_uuid_round_trip_with_json_serializer(self):
+        from uuid import uuid4
+        from src.shared.cache.codecs import CacheCodec, decode_value
+        value = {"document_id": uuid4()}
+        
+        assert decode_value(CacheCodec("test", serializer="json").encode(value)) == value
+    
+    def test_legacy_and_json_profile_values(self):
+        """Plain JSON (pre-codec entries and the json profile) still decodes"""
+        from src.shared.cache.codecs import get_codec, decode_value
+        
+        assert decode_value(b'{"a": [1, 2]}') == {"a": [1, 2]}
+        assert decode_value('{"a": 1}') == {"a": 1}
+        assert decode_value(get_codec("json").encode({"a": 1})) == {"a": 1}
+
+
+class TestDocumentChunkBudget:
+    """Test map-reduce chunk planning and the per-document LLM budget"""
+    
+    @pytest.fixture(autouse=True)
+    def _service(self, monkeypatch):
+        pytest.importorskip("numpy")
+        pytest.importorskip("openai")
+        monkeypatch.setenv("USE_MOCK_SERVICES", "true")
+        monkeypatch.syspath_prepend("src/microservices/ai-processing")
+        import openai_service
+        self.module = openai_service
+        self.service = openai_service.OpenAIService()
+        self.service.chunk_tokens = 50
+        self.service.chunk_overlap_tokens = 0
+        self.service.document_token_budget = 400
+    
+    @staticmethod
+    def _pages(count):
+        return "\f".join(f"Page {i} " + "word " * 40 for i in range(count))
+    
+    def test_empty_text_gives_one_chunk(self):
+        budget = self.service.document_budget()
+        chunks, truncated = self.service._plan_chunks("", "gpt-4", budget)
+        
+        assert len(chunks) == 1 and chunks[0].text == ""
+        assert not truncated
+    
+    def test_operations_share_the_document_budget(self):
+        text = self._pages(20)
+        alone, alone_truncated = self.service._plan_chunks(text, "gpt-4", self.service.document_budget())
+        shared = self.service.document_budget(operations=2)
+        first, truncated = self.service._plan_chunks(text, "gpt-4", shared)
+        
+        # Both operations together map no more than the document budget
+        assert truncated and alone_truncated
+        assert 2 * sum(chunk.token_count for chunk in first) <= shared.tokens
+        assert len(first) < len(alone)
+        # The plan is computed once and reused by the second operation
+        assert self.service._plan_chunks(text, "gpt-4", shared)[0] is first
+    
+    def test_chunk_fan_out_is_bounded(self):
+        import asyncio
+        from types import SimpleNamespace
+        
+        self.service.client_type, self.service.client = "openai", object()
+        active, peak = 0, 0
+        
+        async def get_or_call(model, params, call, **kwargs):
+            nonlocal active, peak
+            active += 1
+            peak = max(peak, active)
+            await asyncio.sleep(0.01)
+            active -= 1
+            return SimpleNamespace(choices=[SimpleNamespace(message=SimpleNamespace(content="partial summary"))])
+        
+        self.service.response_cache.get_or_call = get_or_call
+        budget = self.service.document_budget(max_concurrent_calls=2)
+        result = asyncio.run(self.service.generate_summary(self._pages(6), budget=budget))
+        
+        assert result["chunks"] > 2
+        assert peak == 2
+    
+    def test_fused_fallback_runs_within_document_budget(self):
+        """Long documents fall back to separate calls that all share the caller's budget"""
+        import asyncio
+        from types import SimpleNamespace
+        
+        self.service.client_type, self.service.client = "openai", object()
+        active, peak, calls = 0, 0, 0
+        
+        async def get_or_call(model, params, call, **kwargs):
+            nonlocal active, peak, calls
+            active += 1
+            calls += 1
+            peak = max(peak, active)
+            await asyncio.sleep(0.01)
+            active -= 1
+            return SimpleNamespace(choices=[SimpleNamespace(message=SimpleNamespace(content="{}"))])
+        
+        self.service.response_cache.get_or_call = get_or_call
+        budget = self.service.document_budget(max_concurrent_calls=1, operations=2)
+        result = asyncio.run(self.service.analyze_document_fused(self._pages(6), budget=budget))
+        
+        assert result["fused"] is False
+        assert calls > 3
+        assert peak == 1
+
+
+class TestIncrementalExtraction:
+    """Test ETL watermarks and merge-key upserts"""
+    
+    class FakeCache:
+        def __init__(self):
+            self.values = {}
+        
+        async def get(self, key):
+            return self.values.get(key)
+        
+        async def set(self, key, value, ttl=None):
+            self.values[key] = value
+        
+        async def delete(self, key):
+            self.values.pop(key, None)
+    
+    @pytest.fixture(autouse=True)
+    def _pipeline(self, monkeypatch):
+        self.pd = pytest.importorskip("pandas")
+        pytest.importorskip("fastapi")
+        monkeypatch.syspath_prepend("src/microservices/batch-processor")
+        import etl_pipeline
+        self.etl = etl_pipeline
+        self.cache = self.FakeCache()
+        monkeypatch.setattr(etl_pipeline, "cache_service", self.cache)
+        self.pipeline = etl_pipeline.ETLPipeline()
+    
+    def _step(self, **overrides):
+        config = dict(
+            step_id="load_documents",
+            step_name="Load Documents",
+            transformation_type=self.etl.TransformationType.CLEAN,
+            source_query="SELECT * FROM documents",
+            target_table="staging_documents",
+            transformation_config={},
+            watermark_column="created_at",
+        )
+        config.update(overrides)
+        return self.etl.PipelineStep(**config)
+    
+    def test_source_query_reads_past_stored_watermark(self):
+        import asyncio
+        from datetime import datetime
+        step = self._step()
+        compiled = self.pipeline._compile_step("docs", step)
+        
+        # First execution reads everything
+        assert asyncio.run(self.pipeline._source_query("docs", step, compiled)) == ("SELECT * FROM documents", (), None)
+        
+        batch = self.pd.DataFrame({"created_at": self.pd.to_datetime(["2024-01-02", None, "2024-01-05"])})
+        high = self.pipeline._high_watermark(batch, step, datetime(2024, 1, 3))
+        assert high == datetime(2024, 1, 5) and type(high) is datetime
+        asyncio.run(self.pipeline._save_watermark("docs", step, high))
+        
+        query, params, watermark = asyncio.run(self.pipeline._source_query("docs", step, compiled))
+        assert query == "SELECT * FROM (SELECT * FROM documents) AS incremental WHERE created_at > ?"
+        assert params == (high,) and watermark == high
+        
+        # With merge keys, rows sharing the last value are re-read and upserted
+        merged = self._step(merge_keys=["id"])
+        query, _, _ = asyncio.run(self.pipeline._source_query("docs", merged, self.pipeline._compile_step("docs", merged)))
+        assert query.endswith("created_at >= ?")
+    
+    def test_changed_watermark_column_starts_over(self):
+        import asyncio
+        asyncio.run(self.pipeline._save_watermark("docs", self._step(), 5))
+        
+        assert asyncio.run(self.pipeline.load_watermark("docs", self._step())) == 5
+        assert asyncio.run(self.pipeline.load_watermark("docs", self._step(watermark_column="updated_at"))) is None
+        assert asyncio.run(self.pipeline.reset_watermarks("user_analytics")) == []
+    
+    def test_watermark_needs_row_wise_transformation(self):
+        step = self._step(
+            transformation_type=self.etl.TransformationType.AGGREGATE,
+            transformation_config={"aggregations": {"total": "COUNT(*)"}}
+        )
+        with pytest.raises(ValueError):
+            self.pipeline._compile_step("docs", step)
+    
+    def test_user_activity_is_fully_reread_and_upserted(self):
+        """Its derived columns change without updated_at moving"""
+        step = next(s for s in self.pipeline.pipelines["user_analytics"] if s.step_id == "enrich_user_activity")
+        
+        assert step.watermark_column is None
+        assert step.merge_keys == ["id"]
+        assert self.pipeline.sql_service.upsert_query("enriched_users", ["id", "user_tier"], ["id"]).startswith(
+            ("MERGE INTO enriched_users", "INSERT INTO enriched_users")
+        )
+
+
+class TestArrayForestClassifier:
+    """Test that flattened forests predict exactly like scikit-learn's"""
+    
+    @pytest.fixture(autouse=True)
+    def _module(self, monkeypatch):
+        pytest.importorskip("joblib")
+        self.np = pytest.importorskip("numpy")
+        self.sparse = pytest.importorskip("scipy.sparse")
+        self.ensemble = pytest.importorskip("sklearn.ensemble")
+        monkeypatch.syspath_prepend("src/microservices/ai-processing")
+        import model_registry
+        self.registry = model_registry
+    
+    def _forest(self):
+        rng = self.np.random.RandomState(0)
+        X = rng.rand(300, 12)
+        # Sparse like the TF-IDF features the forests are trained on
+        X[X < 0.6] = 0
+        y = (X[:, 0] + X[:, 3] > X[:, 5] + 0.4).astype(int) + (X[:, 7] > 0.8).astype(int)
+        forest = self.ensemble.RandomForestClassifier(n_estimators=15, max_depth=8, random_state=0).fit(X, y)
+        return forest, X
+    
+    def test_predict_proba_matches_random_forest(self):
+        forest, X = self._forest()
+        flat = self.registry.ArrayForestClassifier.from_forest(forest)
+        # A block size smaller than the batch also exercises the blocking
+        flat.block_size = 64
+        
+        self.np.testing.assert_allclose(flat.predict_proba(X), forest.predict_proba(X), rtol=1e-6, atol=1e-6)
+        self.np.testing.assert_allclose(
+            flat.predict_proba(self.sparse.csr_matrix(X)), forest.predict_proba(X), rtol=1e-6, atol=1e-6
+        )
+        assert (flat.predict(X) == forest.predict(X)).all()
+        assert list(flat.classes_) == list(forest.classes_)
+    
+    def test_memory_mapped_round_trip(self, tmp_path):
+        """A forest saved through the registry loads memory-mapped with the same predictions"""
+        forest, X = self._forest()
+        registry = self.registry.ModelRegistry(model_dir=str(tmp_path), mmap=True)
+        registry.save("forest", forest)
+        loaded = registry.load("forest")
+        
+        assert isinstance(loaded, self.registry.ArrayForestClassifier)
+        assert isinstance(loaded.proba_, self.np.memmap)
+        self.np.testing.assert_allclose(loaded.predict_proba(X), forest.predict_proba(X), rtol=1e-6, atol=1e-6)
+
+
+class TestKeywordMatcher:
+    """Test that single-pass keyword matching equals per-keyword substring checks"""
+    
+    DICTIONARIES = {
+        "invoice": ["Invoice", "invoice date", "invoice number", "amount due", "due"],
+        "tax": ["irs", "w-2", "tax", "tax return", "1099"],
+        "receipt": ["receipt", "total", "subtotal", "thank you"],
+    }
+    TEXTS = [
+        "",
+        "invoice number 42, invoice date 2024-01-01, amount due: $10",
+        "irs form w-2 and 1099 with tax return attached",
+        "subtotal 10 total 12 thank you",
+        "duedue invoicedate taxreturn",
+        "nothing relevant here",
+    ]
+    
+    def _expected(self, text):
+        return {
+            category: {keyword.lower() for keyword in keywords if keyword.lower() in text}
+            for category, keywords in self.DICTIONARIES.items()
+        }
+    
+    @pytest.mark.parametrize("scan_threshold", [0, 1000])
+    def test_find_matches_substring_checks(self, scan_threshold):
+        """Regex (threshold 0) and per-keyword scan paths both find overlapping and nested keywords"""
+        from src.shared.utils.keyword_matcher import KeywordMatcher
+        matcher = KeywordMatcher(self.DICTIONARIES, scan_threshold=scan_threshold)
+        
+        for text in self.TEXTS:
+            assert matcher.find(text) == self._expected(text), text
+            assert matcher.count(text) == {category: len(found) for category, found in self._expected(text).items()}
+    
+    def test_first_match_uses_dictionary_order(self):
+        from src.shared.utils.keyword_matcher import KeywordMatcher
+        matcher = KeywordMatcher(self.DICTIONARIES, scan_threshold=0)
+        
+        assert matcher.first_match("amount due on invoice", "invoice") == "invoice"
+        assert matcher.first_match("subtotal only", "receipt") == "total"
+        assert matcher.first_match("no match", "tax") is None
+
+
+class TestSQLExpressions:
+    """Test the ETL expression compiler against SQL Server semantics"""
+    
+    @pytest.fixture(autouse=True)
+    def _module(self, monkeypatch):
+        pd = pytest.importorskip("pandas")
+        monkeypatch.syspath_prepend("src/microservices/batch-processor")
+        import sql_expressions
+        self.pd = pd
+        self.sql = sql_expressions
+    
+    def test_default_enrich_expressions(self):
+        """CASE, SUBSTRING/CHARINDEX/LEN and DATEDIFF from the default pipelines"""
+        from datetime import datetime
+        df = self.pd.DataFrame({
+            "file_name": ["report.PDF", "scan.tiff", "README"],
+            "content_type": ["application/pdf", "image/png", "text/plain"],
+            "file_size": [1000, 2000000, 20000000],
+            "created_at": self.pd.to_datetime(["2024-01-30 23:00", "2023-12-01 08:00", None]),
+        })
+        plan = self.sql.EnrichPlan({
+            "file_extension": "SUBSTRING(file_name, CHARINDEX('.', file_name) + 1, LEN(file_name))",
+            "file_category": "CASE WHEN content_type LIKE '%pdf%' THEN 'document' WHEN content_type LIKE '%image%' THEN 'image' ELSE 'other' END",
+            "size_category": "CASE WHEN file_size < 1024000 THEN 'small' WHEN file_size < 10485760 THEN 'medium' ELSE 'large' END",
+            "days_since_created": "DATEDIFF(day, created_at, GETDATE())",
+            "is_recent_user": "CASE WHEN DATEDIFF(day, created_at, GETDATE()) < 30 THEN 1 ELSE 0 END",
+        })
+        result = plan.apply(df, now=datetime(2024, 2, 1, 1, 0))
+        
+        # CHARINDEX returns 0 when not found, so the whole name is kept
+        assert list(result["file_extension"]) == ["PDF", "tiff", "README"]
+        assert list(result["file_category"]) == ["document", "image", "other"]
+        assert list(result["size_category"]) == ["small", "medium", "large"]
+        # DATEDIFF counts day boundaries crossed, not elapsed 24h periods
+        assert result["days_since_created"].iloc[0] == 2
+        assert result["days_since_created"].iloc[1] == 62
+        assert self.pd.isna(result["days_since_created"].iloc[2])
+        # A NULL condition falls through to ELSE
+        assert list(result["is_recent_user"]) == [1, 0, 0]
+    
+    def test_null_three_valued_logic(self):
+        """NULL comparisons are unknown; AND/OR follow Kleene logic"""
+        df = self.pd.DataFrame({"a": [1, None, None, 5], "b": [None, None, 3, 5]})
+        result = self.sql.EnrichPlan({
+            "eq": "a = b",
+            "either": "a > 2 OR b > 2",
+            "both": "a > 2 AND b > 2",
+            "negated": "NOT (a = 1)",
+            "missing": "a IS NULL",
+        }).apply(df)
+        
+        assert result["eq"].isna().tolist() == [True, True, True, False]
+        assert result["eq"].iloc[3]
+        assert result["either"].tolist()[2:] == [True, True]
+        assert result["either"].isna().tolist()[:2] == [True, True]
+        # FALSE AND NULL is FALSE, not NULL
+        assert result["both"].iloc[0] == False
+        assert result["both"].isna().tolist()[1:3] == [True, True]
+        assert result["negated"].iloc[0] == False and self.pd.isna(result["negated"].iloc[1])
+        assert result["missing"].tolist() == [False, True, True, False]
+    
+    def test_string_comparisons_are_case_insensitive(self):
+        """=, IN and LIKE agree with SQL Server's default collation"""
+        df = self.pd.DataFrame({"name": ["AB", "ab", None, "x"]})
+        result = self.sql.EnrichPlan({
+            "eq": "name = 'ab'",
+            "listed": "name IN ('Ab', 'q')",
+            "like": "name LIKE 'a%'",
+        }).apply(df)
+        
+        for column in ("eq", "listed", "like"):
+            assert result[column].iloc[:2].tolist() == [True, True]
+            assert self.pd.isna(result[column].iloc[2])
+            assert result[column].iloc[3] == False
+    
+    def test_round_decimal_column_with_nulls(self):
+        """ROUND converts DECIMAL/MONEY values and keeps NULLs, rounding half away from zero"""
+        from decimal import Decimal
+        df = self.pd.DataFrame({"amount": [Decimal("1.25"), None, Decimal("-2.5")]})
+        result = self.sql.EnrichPlan({"rounded": "ROUND(amount, 1)", "whole": "ROUND(amount)"}).apply(df)
+        
+        assert result["rounded"].iloc[0] == pytest.approx(1.3)
+        assert self.pd.isna(result["rounded"].iloc[1])
+        assert result["whole"].iloc[2] == -3
+    
+    def test_arithmetic_on_decimal_columns_and_zero_divisors(self):
+        """DECIMAL mixes with float columns; / and % by zero are NULL; % truncates like SQL"""
+        from decimal import Decimal
+        df = self.pd.DataFrame({
+            "amount": [Decimal("1.5"), None, Decimal("3")],
+            "rate": [2.0, 1.0, 0.0],
+            "n": [7, -7, 5],
+            "d": [2, 3, 0],
+        })
+        result = self.sql.EnrichPlan({
+            "scaled": "amount * rate",
+            "per_rate": "amount / rate",
+            "shifted": "amount + 0.5",
+            "half": "n / d",
+            "remainder": "n % d",
+            "by_zero": "n / 0",
+        }).apply(df)
+        
+        assert result["scaled"].tolist()[::2] == [3.0, 0.0]
+        assert self.pd.isna(result["scaled"].iloc[1])
+        assert result["per_rate"].iloc[0] == 0.75
+        assert self.pd.isna(result["per_rate"].iloc[2])
+        assert result["shifted"].iloc[2] == 3.5
+        assert result["half"].iloc[0] == 3.5
+        assert self.pd.isna(result["half"].iloc[2])
+        assert result["remainder"].tolist()[:2] == [1, -1]
+        assert self.pd.isna(result["remainder"].iloc[2])
+        assert result["by_zero"].isna().all()
+        assert self.sql.compile_expression("1 / 0").evaluate(df, self.sql.EvaluationContext()) is None
+    
+    def test_aggregate_plan(self):
+        """Expression keys are named after their text; SUM over only NULLs is NULL"""
+        plan = self.sql.AggregatePlan(
+            ["metric_name", "DATE(metric_timestamp)"],
+            {"total": "SUM(metric_value)", "count": "COUNT(*)", "mean": "SUM(metric_value) / COUNT(*)"}
+        )
+        assert [name for name, _ in plan.keys] == ["metric_name", "date_metric_timestamp"]
+        
+        df = self.pd.DataFrame({
+            "metric_name": ["cpu", "cpu", "mem", "cpu"],
+            "metric_timestamp": self.pd.to_datetime(["2024-01-01 10:00", "2024-01-01 11:00", "2024-01-01 12:00", "2024-01-02 09:00"]),
+            "metric_value": [None, None, 4.0, 3.0],
+        })
+        result = plan.apply(df).set_index(["metric_name", "date_metric_timestamp"])
+        
+        first_day = self.pd.Timestamp("2024-01-01")
+        assert self.pd.isna(result.loc[("cpu", first_day), "total"])
+        assert result.loc[("cpu", first_day), "count"] == 2
+        assert result.loc[("mem", first_day), "mean"] == 4.0
+        assert result.loc[("cpu", self.pd.Timestamp("2024-01-02")), "total"] == 3.0
+    
+    def test_pushdown_dialects(self):
+        """The same plans render to SQL Server and PostgreSQL"""
+        enrich = self.sql.EnrichPlan({
+            "file_extension": "SUBSTRING(file_name, CHARINDEX('.', file_name) + 1, LEN(file_name))",
+            "is_pdf": "content_type = 'PDF'",
+            "days_since_created": "DATEDIFF(day, created_at, GETDATE())",
+        })
+        assert enrich.pushdown("SELECT * FROM documents", dialect="mssql") == (
+            "SELECT src.*, SUBSTRING(file_name, (CHARINDEX('.', file_name) + 1), LEN(file_name)) AS [file_extension], "
+            "CASE WHEN (content_type = 'PDF') THEN 1 WHEN NOT (content_type = 'PDF') THEN 0 END AS [is_pdf], "
+            "DATEDIFF(day, created_at, GETDATE()) AS [days_since_created] "
+            "FROM (SELECT * FROM documents) AS src"
+        )
+        assert enrich.pushdown("SELECT * FROM documents", dialect="postgres") == (
+            "SELECT src.*, SUBSTR(file_name, (STRPOS(LOWER(file_name), LOWER('.')) + 1), LENGTH(RTRIM(file_name))) AS \"file_extension\", "
+            "(LOWER(content_type) = LOWER('PDF')) AS \"is_pdf\", "
+            "(CAST(LOCALTIMESTAMP AS DATE) - CAST(created_at AS DATE)) AS \"days_since_created\" "
+            "FROM (SELECT * FROM documents) AS src"
+        )
+        
+        # True division and AVG as in pandas, and NULL for a zero divisor
+        ratio = self.sql.AggregatePlan([], {"ratio": "SUM(a) / COUNT(*)", "mean": "AVG(a)"})
+        assert ratio.pushdown("SELECT * FROM m", dialect="mssql") == (
+            "SELECT (CAST(SUM(a) AS FLOAT) / NULLIF(COUNT(*), 0)) AS [ratio], AVG(CAST(a AS FLOAT)) AS [mean] "
+            "FROM (SELECT * FROM m) AS src"
+        )
+        assert ratio.pushdown("SELECT * FROM m", dialect="postgres") == (
+            "SELECT (CAST(SUM(a) AS DOUBLE PRECISION) / NULLIF(COUNT(*), 0)) AS \"ratio\", AVG(a) AS \"mean\" "
+            "FROM (SELECT * FROM m) AS src"
+        )
+        
+        aggregate = self.sql.AggregatePlan(["DATE(metric_timestamp)"], {"std_value": "STDEV(metric_value)"})
+        assert aggregate.pushdown("SELECT * FROM m", dialect="postgres") == (
+            "SELECT CAST(metric_timestamp AS DATE) AS \"date_metric_timestamp\", "
+            "STDDEV_SAMP(metric_value) AS \"std_value\" "
+            "FROM (SELECT * FROM m) AS src GROUP BY CAST(metric_timestamp AS DATE)"
+        )
+        
+        with pytest.raises(self.sql.PushdownUnsupported):
+            self.sql.EnrichPlan({"months": "DATEDIFF(month, created_at, GETDATE())"}).pushdown("SELECT 1", dialect="postgres")
+
+
 # Test that can be run without services
 def test_basic_imports():
     """Test that basic imports work without errors"""